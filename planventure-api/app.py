@@ -1,173 +1,134 @@
-from flask import Flask, jsonify, request
-from flask_cors import CORS
-from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
-import os
-from dotenv import load_dotenv
-from database import db
-from models import User
-from datetime import timedelta
-from utils.jwt import generate_tokens
-from utils.validation import validate_email, validate_password
-from utils.auth_middleware import auth_required
-from blueprints.trips import trips
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Initialize Flask app
-app = Flask(__name__)
-
-# CORS Configuration
-CORS(
-    app,
-    resources={
-        r"/*": {
-            "origins": os.getenv("CORS_ORIGINS", "http://localhost:3000").split(","),
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
-            "expose_headers": ["Content-Range", "X-Content-Range"],
-            "supports_credentials": True,
-            "max_age": 600,
-        }
-    },
-)
-
-# Database configuration
-app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv(
-    "DATABASE_URL", "sqlite:///planventure.db"
-)
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-
-# Initialize SQLAlchemy with app
-db.init_app(app)
-
-# JWT Configuration
-app.config["JWT_SECRET_KEY"] = os.getenv(
-    "JWT_SECRET_KEY"
-)  # Remove default value for security
-app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
-app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=30)
-jwt = JWTManager(app)
-
-
-@app.route("/")
-def home():
-    return jsonify({"message": "Welcome to PlanVenture API"})
-
-
-@app.route("/health")
-def health_check():
-    return jsonify({"status": "healthy"})
-
-
-# JWT error handlers
-@jwt.expired_token_loader
-def expired_token_callback(jwt_header, jwt_data):
-    return jsonify({"message": "Token has expired"}), 401
-
-
-@jwt.invalid_token_loader
-def invalid_token_callback(error):
-    return jsonify({"message": "Invalid token"}), 401
-
-
-@jwt.unauthorized_loader
-def unauthorized_callback(error):
-    return jsonify({"message": "Missing Authorization Header"}), 401
-
-
-@jwt.needs_fresh_token_loader
-def token_not_fresh_callback(jwt_header, jwt_data):
-    return jsonify({"message": "Fresh token required"}), 401
-
-
-@app.route("/auth/login", methods=["POST"])
-def login():
-    try:
-        data = request.get_json()
-        if not data:
-            return jsonify({"message": "No input data provided"}), 400
-
-        email = data.get("email", "").lower().strip()
-        password = data.get("password", "")
-
-        if not email or not password:
-            return jsonify({"message": "Email and password are required"}), 400
-
-        user = User.query.filter_by(email=email).first()
-        if not user:
-            return jsonify({"message": "Invalid credentials"}), 401
-
-        if not user.check_password(password):
-            return jsonify({"message": "Invalid credentials"}), 401
-
-        tokens = generate_tokens(user.id)
-        return (
-            jsonify(
-                {
-                    "message": "Login successful",
-                    "user": {"id": user.id, "email": user.email},
-                    **tokens,
-                }
-            ),
-            200,
-        )
+from flask import Flask, Response, jsonify
+from config import load_config
+
+
+def create_app(config=None):
+    """Create and configure the Flask application.
+
+    Extensions, models and blueprints are imported here rather than at module
+    level, so importing this module stays cheap for scripts and tooling.
+    """
+    app = Flask(__name__)
+    app.config.from_mapping(load_config())
+    if config:
+        app.config.update(config)
+
+    proxies = app.config["TRUSTED_PROXY_COUNT"]
+    if proxies:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
+
+    init_extensions(app)
+    register_blueprints(app)
+    return app
+
+
+def init_extensions(app):
+    from flask_cors import CORS
+    from database import configure_engines, db, engine_options, replica_router
+    from utils.auth import HasherBusyError, hasher
+    from utils.compression import compression
+    from utils.jobs import job_runner
+    from utils.json_provider import provider_class
+    from utils.jwt import jwt
+    from utils.metrics import metrics
+    from utils.rate_limit import login_throttle
+    from utils.revocation import denylist
+    from utils.user_cache import user_cache
+
+    app.json = provider_class(app.config["JSON_PROVIDER"])(app)
+
+    # CORS Configuration
+    CORS(
+        app,
+        resources={
+            r"/*": {
+                "origins": app.config["CORS_ORIGINS"],
+                "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+                "allow_headers": [
+                    "Content-Type",
+                    "Content-Encoding",
+                    "Authorization",
+                    "If-Match",
+                    "If-None-Match",
+                    "If-Modified-Since",
+                ],
+                "expose_headers": [
+                    "Content-Range",
+                    "X-Content-Range",
+                    "X-Next-Cursor",
+                    "ETag",
+                    "Location",
+                ],
+                "supports_credentials": True,
+                "max_age": 600,
+            }
+        },
+    )
+
+    if "SQLALCHEMY_ENGINE_OPTIONS" not in app.config:
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
+    replica_router.init_app(app)
+    db.init_app(app)
+    configure_engines(app)
+    metrics.init_app(app)
+    compression.init_app(app)
+    hasher.init_app(app)
+    user_cache.init_app(app)
+    login_throttle.init_app(app)
+    jwt.init_app(app)
+    denylist.init_app(app)
+    job_runner.init_app(app)
+
+    @app.errorhandler(HasherBusyError)
+    def hasher_busy_callback(error):
+        response = jsonify({"message": "Server busy, please retry shortly"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+
+
+def register_blueprints(app):
+    from blueprints.auth import auth
+    from blueprints.jobs import jobs
+    from blueprints.trips import trips
+    from database import pool_status
+    from utils.metrics import render_metrics
+    from utils.user_cache import user_cache
+
+    @app.route("/")
+    def home():
+        return jsonify({"message": "Welcome to PlanVenture API"})
+
+    @app.route("/health")
+    def health_check():
+        return jsonify({"status": "healthy", "user_cache": user_cache.stats()})
+
+    @app.route("/health/db")
+    def db_health_check():
+        return jsonify({"engines": pool_status()})
+
+    if app.config["METRICS_ENABLED"]:
+
+        @app.route("/metrics")
+        def prometheus_metrics():
+            return Response(
+                render_metrics(), mimetype="text/plain; version=0.0.4; charset=utf-8"
+            )
+
+    app.register_blueprint(auth)
+    app.register_blueprint(trips, url_prefix="/api")
+    app.register_blueprint(jobs, url_prefix="/api")
+
+
+def __getattr__(name):
+    # Keep `from app import app` (and `flask run`) working without building
+    # the application as a side effect of importing this module
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    except Exception as e:
-        return jsonify({"message": "Login failed"}), 500
-
-
-@app.route("/auth/refresh", methods=["POST"])
-@jwt_required(refresh=True)
-def refresh():
-    identity = get_jwt_identity()
-    tokens = generate_tokens(identity)
-    return jsonify(tokens), 200
-
-
-@app.route("/auth/register", methods=["POST"])
-def register():
-    data = request.get_json()
-    email = data.get("email", "").lower().strip()
-    password = data.get("password", "")
-
-    # Validate email format
-    if not validate_email(email):
-        return jsonify({"message": "Invalid email format"}), 400
-
-    # Check if user already exists
-    if User.query.filter_by(email=email).first():
-        return jsonify({"message": "Email already registered"}), 409
-
-    # Validate password
-    is_valid, message = validate_password(password)
-    if not is_valid:
-        return jsonify({"message": message}), 400
-
-    # Create new user
-    try:
-        new_user = User(email=email)
-        new_user.set_password(password)
-        db.session.add(new_user)
-        db.session.commit()
-
-        # Generate tokens for automatic login
-        tokens = generate_tokens(new_user.id)
-        return jsonify({"message": "User registered successfully", **tokens}), 201
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"message": "Registration failed"}), 500
-
-
-# Protected route example
-@app.route("/api/me")
-@auth_required()
-def get_current_user(current_user):
-    return jsonify({"id": current_user.id, "email": current_user.email}), 200
-
-
-# Register blueprints
-app.register_blueprint(trips, url_prefix="/api")
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
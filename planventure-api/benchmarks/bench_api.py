@@ -0,0 +1,314 @@
+"""Benchmark the API end to end through the Flask test client.
+
+Seeds a throwaway SQLite database with N users x M trips carrying realistic
+itineraries, then measures throughput and p50/p99 latency of login, create,
+list, get, update and delete. Results are written as JSON. With
+``--baseline`` the run fails when an operation's p50 or p99 latency is more
+than ``--tolerance`` / ``--p99-tolerance`` slower than the stored baseline,
+and also more than ``--floor-ms`` / ``--p99-floor-ms`` slower. Operations
+take a few milliseconds, where a relative tolerance alone is less than the
+run-to-run noise of a shared host.
+
+Usage:
+    python benchmarks/bench_api.py --output results.json \\
+        --baseline benchmarks/baselines/api.json
+    python benchmarks/bench_api.py --update-baseline benchmarks/baselines/api.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+OPERATIONS = ("login", "create", "list", "get", "update", "delete")
+PASSWORD = "BenchPass123"
+
+ACTIVITIES = ("Museum", "Walking tour", "Market", "Cathedral", "Harbour cruise")
+PLACES = ("Old Town", "City Centre", "Riverside", "Hilltop", "Station")
+
+
+def make_itinerary(rng: random.Random, start: datetime, days: int) -> dict:
+    """Build an itinerary with a few activities, meals and notes per day."""
+    itinerary = {"days": {}, "notes": "Booked via agent", "estimated_budget": 0}
+    for offset in range(days):
+        day = (start + timedelta(days=offset)).strftime("%Y-%m-%d")
+        activities = [
+            {
+                "time": f"{9 + 3 * index:02d}:00",
+                "name": rng.choice(ACTIVITIES),
+                "location": rng.choice(PLACES),
+                "cost": rng.randrange(0, 80),
+            }
+            for index in range(rng.randint(2, 4))
+        ]
+        itinerary["estimated_budget"] += sum(a["cost"] for a in activities)
+        itinerary["days"][day] = {
+            "activities": activities,
+            "meals": {"breakfast": "Hotel", "lunch": "Cafe", "dinner": "Bistro"},
+            "accommodation": "Hotel Central",
+            "transportation": rng.choice(("Metro", "Walk", "Taxi")),
+            "notes": "",
+        }
+    return itinerary
+
+
+def make_trip(rng: random.Random) -> dict:
+    start = datetime(2025, 1, 1) + timedelta(days=rng.randrange(365))
+    days = rng.randint(3, 14)
+    return {
+        "destination": f"City {rng.randrange(1000)}",
+        "start_date": start.strftime("%Y-%m-%d"),
+        "end_date": (start + timedelta(days=days - 1)).strftime("%Y-%m-%d"),
+        "latitude": rng.uniform(-60, 70),
+        "longitude": rng.uniform(-180, 180),
+        "itinerary": make_itinerary(rng, start, days),
+    }
+
+
+def seed(app, users: int, trips: int, rng: random.Random) -> dict:
+    """Insert users and trips directly; return {email: [trip ids]}."""
+    from database import db
+    from models import Trip, User
+    from utils.auth import hash_password
+    from utils.validation import validate_trip_data
+
+    password_hash = hash_password(PASSWORD)
+    owned = {}
+    with app.app_context():
+        db.create_all()
+        for index in range(users):
+            user = User(email=f"bench{index}@example.com", password_hash=password_hash)
+            db.session.add(user)
+            db.session.flush()
+            rows = [validate_trip_data(make_trip(rng))[0] for _ in range(trips)]
+            owned[user.email] = Trip.bulk_insert(user.id, rows)
+        db.session.commit()
+    return owned
+
+
+def percentile(timings: list, fraction: float) -> float:
+    return timings[max(0, int(len(timings) * fraction) - 1)]
+
+
+def summarize(timings: list, elapsed: float) -> dict:
+    timings = sorted(timings)
+    return {
+        "requests": len(timings),
+        "throughput_rps": round(len(timings) / elapsed, 1),
+        "p50_ms": round(statistics.median(timings), 3),
+        "p99_ms": round(percentile(timings, 0.99), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+    }
+
+
+def run(app, owned: dict, requests: int, rounds: int, rng: random.Random) -> dict:
+    """Issue ``requests`` calls per operation in each of ``rounds`` rounds.
+
+    Like timeit, each metric keeps the best round (lowest latency, highest
+    throughput), so a noisy round does not trip the baseline comparison.
+    """
+    client = app.test_client()
+    emails = list(owned)
+    headers = {}
+    for email in emails:
+        response = client.post(
+            "/auth/login", json={"email": email, "password": PASSWORD}
+        )
+        token = response.get_json()["access_token"]
+        headers[email] = {"Authorization": f"Bearer {token}"}
+
+    created = []
+
+    def login():
+        email = rng.choice(emails)
+        return client.post("/auth/login", json={"email": email, "password": PASSWORD})
+
+    def create():
+        email = rng.choice(emails)
+        response = client.post(
+            "/api/trips", json=make_trip(rng), headers=headers[email]
+        )
+        created.append((email, response.get_json()["id"]))
+        return response
+
+    def list_trips():
+        email = rng.choice(emails)
+        return client.get("/api/trips?limit=50", headers=headers[email])
+
+    def get():
+        email = rng.choice(emails)
+        trip_id = rng.choice(owned[email])
+        return client.get(f"/api/trips/{trip_id}", headers=headers[email])
+
+    def update():
+        email = rng.choice(emails)
+        trip_id = rng.choice(owned[email])
+        return client.put(
+            f"/api/trips/{trip_id}",
+            json={"destination": f"City {rng.randrange(1000)}"},
+            headers=headers[email],
+        )
+
+    def delete():
+        email, trip_id = created.pop()
+        return client.delete(f"/api/trips/{trip_id}", headers=headers[email])
+
+    calls = {
+        "login": login,
+        "create": create,
+        "list": list_trips,
+        "get": get,
+        "update": update,
+        "delete": delete,
+    }
+    results = {}
+    for name in OPERATIONS:
+        call = calls[name]
+        # Warm up caches and compiled statements; the trips created during the
+        # create warm-up also cover the delete warm-up
+        for _ in range(min(10, requests)):
+            call()
+
+        summaries = []
+        for _ in range(rounds):
+            gc.collect()
+            timings = []
+            started = time.perf_counter()
+            for _ in range(requests):
+                request_started = time.perf_counter()
+                response = call()
+                timings.append((time.perf_counter() - request_started) * 1000)
+                if response.status_code >= 400:
+                    raise RuntimeError(f"{name} failed with {response.status_code}")
+            summaries.append(summarize(timings, time.perf_counter() - started))
+        results[name] = {
+            metric: (max if metric == "throughput_rps" else min)(
+                summary[metric] for summary in summaries
+            )
+            for metric in summaries[0]
+        }
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerances: dict, floors: dict) -> list[str]:
+    """Return a message for each metric that regressed beyond its tolerance.
+
+    A metric regresses when it is slower than the baseline by more than its
+    relative tolerance and by more than its absolute floor in milliseconds.
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get("results", {}).get(name)
+        if not expected:
+            continue
+        for metric, tolerance in tolerances.items():
+            limit = expected[metric] + max(
+                expected[metric] * tolerance, floors.get(metric, 0.0)
+            )
+            if result[metric] > limit:
+                regressions.append(
+                    f"{name} {metric}: {result[metric]:.3f} ms > "
+                    f"{limit:.3f} ms (baseline {expected[metric]:.3f} ms)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--trips", type=int, default=50, help="trips per user")
+    parser.add_argument("--requests", type=int, default=500, help="per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--bcrypt-rounds", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="for p50")
+    parser.add_argument("--p99-tolerance", type=float, default=0.6)
+    parser.add_argument("--floor-ms", type=float, default=1.5, help="for p50")
+    parser.add_argument("--p99-floor-ms", type=float, default=5.0)
+    parser.add_argument("--update-baseline", metavar="PATH")
+    args = parser.parse_args()
+
+    from app import create_app
+    from database import db
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(
+            {
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                "JWT_SECRET_KEY": "benchmark-secret-key-with-32-bytes",
+                "BCRYPT_LOG_ROUNDS": args.bcrypt_rounds,
+                # Every simulated client logs in from the same address
+                "LOGIN_THROTTLE_ENABLED": False,
+            }
+        )
+        started = time.perf_counter()
+        owned = seed(app, args.users, args.trips, rng)
+        print(
+            f"Seeded {args.users} users x {args.trips} trips "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        with app.app_context():
+            results = run(app, owned, args.requests, args.rounds, rng)
+            db.engine.dispose()
+
+    report = {
+        "meta": {
+            "users": args.users,
+            "trips_per_user": args.trips,
+            "requests": args.requests,
+            "rounds": args.rounds,
+            "bcrypt_rounds": args.bcrypt_rounds,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    for name, result in results.items():
+        print(
+            f"{name:8} {result['throughput_rps']:9.1f} req/s  "
+            f"p50={result['p50_ms']:8.3f} ms  p99={result['p99_ms']:8.3f} ms"
+        )
+
+    for path in filter(None, (args.output, args.update_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(
+            results,
+            baseline,
+            {"p50_ms": args.tolerance, "p99_ms": args.p99_tolerance},
+            {"p50_ms": args.floor_ms, "p99_ms": args.p99_floor_ms},
+        )
+        if baseline["meta"] != report["meta"]:
+            print(
+                "Note: the baseline was recorded with other settings or on another host"
+            )
+        if regressions:
+            print("Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(
+            f"No regressions beyond {args.tolerance:.0%} or {args.floor_ms} ms "
+            f"(p50) / {args.p99_tolerance:.0%} or {args.p99_floor_ms} ms (p99) "
+            "of the baseline"
+        )
+
+
+if __name__ == "__main__":
+    main()
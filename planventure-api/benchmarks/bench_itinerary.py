@@ -0,0 +1,77 @@
+"""Microbenchmark itinerary template generation and merging.
+
+Compares the current cached implementation in ``utils.itinerary`` with the
+original per-call strptime/strftime implementation for 1, 30 and 365 day
+trips.
+
+Usage:
+    python benchmarks/bench_itinerary.py
+"""
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.itinerary import generate_itinerary_template, merge_itinerary
+
+TRIPS = {1: "2024-01-01", 30: "2024-01-30", 365: "2024-12-30"}
+
+
+def legacy_template(start_date: str, end_date: str) -> dict:
+    """The template generator as it was before caching."""
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    itinerary = {"days": {}, "notes": "", "estimated_budget": 0}
+    for day in range((end - start).days + 1):
+        date_str = (start + timedelta(days=day)).strftime("%Y-%m-%d")
+        itinerary["days"][date_str] = {
+            "activities": [],
+            "meals": {"breakfast": "", "lunch": "", "dinner": ""},
+            "accommodation": "",
+            "transportation": "",
+            "notes": "",
+        }
+    return itinerary
+
+
+def stored_itinerary(start_date: str) -> dict:
+    """A stored itinerary that customizes the first three days."""
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    days = {}
+    for offset in range(3):
+        days[(start + timedelta(days=offset)).strftime("%Y-%m-%d")] = {
+            "activities": [{"time": "10:00", "name": "Museum"}],
+            "meals": {"dinner": "Bistro"},
+            "notes": "Bring tickets",
+        }
+    return {"days": days, "notes": "Trip notes", "estimated_budget": 1200}
+
+
+def bench(label: str, fn, number: int):
+    seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"  {label:28} {seconds * 1e6:10.1f} us/call")
+
+
+def main():
+    start = "2024-01-01"
+    for length, end in TRIPS.items():
+        number = max(10, 20000 // length)
+        stored = stored_itinerary(start)
+        print(f"{length}-day trip")
+        bench("legacy template", lambda: legacy_template(start, end), number)
+        bench(
+            "cached template",
+            lambda: generate_itinerary_template(start, end),
+            number,
+        )
+        bench(
+            "merge 3 stored days",
+            lambda: merge_itinerary(start, end, stored),
+            number,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Measure import time and cold start of the API.
+
+Each sample runs in a fresh interpreter and records how long it takes to
+import ``app``, to build the application with ``create_app()`` and to serve
+the first request. Exits non-zero when the median cold start (all three
+phases) exceeds ``--budget-ms``.
+
+Usage:
+    python benchmarks/bench_startup.py --samples 10 --budget-ms 1500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPET = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app(
+    {"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:", "JWT_SECRET_KEY": "bench"}
+)
+created = time.perf_counter()
+application.test_client().get("/health")
+served = time.perf_counter()
+print(json.dumps({
+    "import": imported - started,
+    "create_app": created - imported,
+    "first_request": served - created,
+}))
+"""
+
+PHASES = ("import", "create_app", "first_request")
+
+
+def sample() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", SNIPPET],
+        cwd=PROJECT_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    samples = [sample() for _ in range(args.samples)]
+    totals = [sum(s[phase] for phase in PHASES) * 1000 for s in samples]
+    for phase in PHASES:
+        median = statistics.median(s[phase] for s in samples) * 1000
+        print(f"{phase:14} {median:8.1f} ms (median of {args.samples})")
+    cold_start = statistics.median(totals)
+    print(f"{'cold start':14} {cold_start:8.1f} ms")
+
+    if args.budget_ms is not None and cold_start > args.budget_ms:
+        print(f"Cold start exceeds the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Benchmark the trips table indexes.
+
+Seeds a throwaway SQLite database with N trips spread over U users, then
+prints the query plan and latency of the hot trip queries before and after
+the indexes declared on ``Trip`` are created.
+
+Usage:
+    python benchmarks/bench_trip_indexes.py --trips 1000000 --users 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import MetaData, create_engine, insert, text
+
+from models import Trip, User
+from utils.geo import encode_geohash
+
+# Copies of the tables without the models' DDL listeners, which would also
+# create the destination search index and make every seeded row update it
+METADATA = MetaData()
+USERS = User.__table__.to_metadata(METADATA)
+TRIPS = Trip.__table__.to_metadata(METADATA)
+
+QUERIES = {
+    "list page": (
+        "SELECT id, destination, start_date FROM trips WHERE user_id = :user_id "
+        "ORDER BY start_date, id LIMIT 50"
+    ),
+    "keyset page": (
+        "SELECT id, destination, start_date FROM trips WHERE user_id = :user_id "
+        "AND (start_date > :start_date OR (start_date = :start_date AND id > :id)) "
+        "ORDER BY start_date, id LIMIT 50"
+    ),
+    "date window": (
+        "SELECT id, destination, start_date FROM trips WHERE user_id = :user_id "
+        "AND start_date <= :window_to AND end_date >= :window_from "
+        "ORDER BY start_date, id LIMIT 50"
+    ),
+    "get by id": "SELECT * FROM trips WHERE id = :id AND user_id = :user_id",
+    "nearby": (
+        "SELECT id, latitude, longitude FROM trips WHERE user_id = :user_id "
+        "AND geohash >= :cell AND geohash < :cell || '{'"
+    ),
+}
+
+
+def seed(engine, trips: int, users: int, batch: int = 50_000):
+    USERS.create(engine)
+    TRIPS.create(engine)
+    # Benchmark the "before" state without any secondary index
+    with engine.begin() as conn:
+        for index in TRIPS.indexes:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        conn.execute(
+            insert(USERS),
+            [
+                {"id": i, "email": f"user{i}@example.com", "password_hash": "x"}
+                for i in range(1, users + 1)
+            ],
+        )
+
+    base = datetime(2024, 1, 1)
+    rng = random.Random(42)
+    for offset in range(0, trips, batch):
+        rows = []
+        for _ in range(min(batch, trips - offset)):
+            start = base + timedelta(days=rng.randrange(730))
+            latitude = rng.uniform(-60, 70)
+            longitude = rng.uniform(-180, 180)
+            rows.append(
+                {
+                    "user_id": rng.randint(1, users),
+                    "destination": "Somewhere",
+                    "start_date": start,
+                    "end_date": start + timedelta(days=rng.randrange(1, 14)),
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "geohash": encode_geohash(latitude, longitude),
+                    "itinerary": {"days": {}, "notes": "", "estimated_budget": 0},
+                }
+            )
+        with engine.begin() as conn:
+            conn.execute(insert(TRIPS), rows)
+
+
+def measure(engine, users: int, samples: int) -> dict:
+    rng = random.Random(7)
+    params = [
+        {
+            "user_id": rng.randint(1, users),
+            "id": rng.randint(1, 1000),
+            "start_date": "2024-06-01 00:00:00.000000",
+            "window_from": "2024-06-01 00:00:00.000000",
+            "window_to": "2024-06-30 00:00:00.000000",
+            # A 4 character cell is roughly 40 x 20 km
+            "cell": encode_geohash(rng.uniform(-60, 70), rng.uniform(-180, 180), 4),
+        }
+        for _ in range(samples)
+    ]
+    results = {}
+    with engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            plan = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params[0]).all()
+            timings = []
+            for p in params:
+                started = time.perf_counter()
+                conn.execute(text(sql), p).all()
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[name] = {
+                "plan": " / ".join(row[-1] for row in plan),
+                "p50_ms": statistics.median(timings),
+                "p99_ms": timings[int(len(timings) * 0.99) - 1],
+            }
+    return results
+
+
+def report(title: str, results: dict):
+    print(f"\n== {title}")
+    for name, result in results.items():
+        print(
+            f"{name:12} p50={result['p50_ms']:8.3f} ms  "
+            f"p99={result['p99_ms']:8.3f} ms  plan: {result['plan']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trips", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        started = time.perf_counter()
+        seed(engine, args.trips, args.users)
+        print(
+            f"Seeded {args.trips} trips for {args.users} users "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        report("without indexes", measure(engine, args.users, args.samples))
+
+        started = time.perf_counter()
+        for index in TRIPS.indexes:
+            index.create(engine)
+        print(f"\nBuilt indexes in {time.perf_counter() - started:.1f}s")
+
+        report("with indexes", measure(engine, args.users, args.samples))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import math
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import decode_token, get_jwt, get_jwt_identity, jwt_required
+from jwt.exceptions import ExpiredSignatureError
+from database import db
+from models import User
+from utils.auth import HasherBusyError
+from utils.auth_middleware import auth_required
+from utils.jwt import generate_tokens
+from utils.rate_limit import login_throttle
+from utils.revocation import denylist
+from utils.validation import validate_email, validate_password
+
+auth = Blueprint("auth", __name__)
+
+
+@auth.route("/auth/login", methods=["POST"])
+def login():
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"message": "No input data provided"}), 400
+
+        email = data.get("email", "").lower().strip()
+        password = data.get("password", "")
+
+        if not email or not password:
+            return jsonify({"message": "Email and password are required"}), 400
+
+        # Reject floods before they cost a query and a bcrypt check
+        retry_after = login_throttle.hit(request.remote_addr, email)
+        if retry_after:
+            response = jsonify({"message": "Too many login attempts"})
+            response.headers["Retry-After"] = str(math.ceil(retry_after))
+            return response, 429
+
+        user = User.query.filter_by(email=email).first()
+        if not user:
+            return jsonify({"message": "Invalid credentials"}), 401
+
+        if not user.check_password(password):
+            return jsonify({"message": "Invalid credentials"}), 401
+
+        # Upgrade hashes made with an old work factor while we have the password
+        if user.password_needs_rehash():
+            try:
+                user.set_password(password)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+
+        tokens = generate_tokens(user.id)
+        return (
+            jsonify(
+                {
+                    "message": "Login successful",
+                    "user": {"id": user.id, "email": user.email},
+                    **tokens,
+                }
+            ),
+            200,
+        )
+
+    except HasherBusyError:
+        raise
+    except Exception as e:
+        return jsonify({"message": "Login failed"}), 500
+
+
+@auth.route("/auth/refresh", methods=["POST"])
+@jwt_required(refresh=True)
+def refresh():
+    # Rotate: each refresh token can be exchanged once
+    denylist.revoke(get_jwt())
+    identity = get_jwt_identity()
+    tokens = generate_tokens(identity)
+    return jsonify(tokens), 200
+
+
+@auth.route("/auth/logout", methods=["POST"])
+@jwt_required(verify_type=False)
+def logout():
+    """Revoke the presented token, and the refresh token in the body if any."""
+    revoked = [get_jwt()]
+    data = request.get_json(silent=True) or {}
+    if data.get("refresh_token"):
+        try:
+            refresh_token = decode_token(data["refresh_token"])
+        except ExpiredSignatureError:
+            refresh_token = None  # nothing left to revoke
+        except Exception:
+            return jsonify({"message": "Invalid refresh token"}), 400
+        if refresh_token is not None:
+            if str(refresh_token["sub"]) != str(get_jwt_identity()):
+                return jsonify({"message": "Invalid refresh token"}), 400
+            revoked.append(refresh_token)
+    denylist.revoke(*revoked)
+    return jsonify({"message": "Logged out"}), 200
+
+
+@auth.route("/auth/logout-all", methods=["POST"])
+@jwt_required()
+def logout_all():
+    """Revoke every token issued to the current user so far."""
+    denylist.revoke_all(
+        get_jwt_identity(), current_app.config["JWT_REFRESH_TOKEN_EXPIRES"]
+    )
+    return jsonify({"message": "Logged out everywhere"}), 200
+
+
+@auth.route("/auth/register", methods=["POST"])
+def register():
+    data = request.get_json()
+    email = data.get("email", "").lower().strip()
+    password = data.get("password", "")
+
+    # Validate email format
+    if not validate_email(email):
+        return jsonify({"message": "Invalid email format"}), 400
+
+    # Check if user already exists
+    if User.query.filter_by(email=email).first():
+        return jsonify({"message": "Email already registered"}), 409
+
+    # Validate password
+    is_valid, message = validate_password(password)
+    if not is_valid:
+        return jsonify({"message": message}), 400
+
+    # Create new user
+    try:
+        new_user = User(email=email)
+        new_user.set_password(password)
+        db.session.add(new_user)
+        db.session.commit()
+
+        # Generate tokens for automatic login
+        tokens = generate_tokens(new_user.id)
+        return jsonify({"message": "User registered successfully", **tokens}), 201
+    except HasherBusyError:
+        db.session.rollback()
+        raise
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": "Registration failed"}), 500
+
+
+# Protected route example
+@auth.route("/api/me")
+@auth_required()
+def get_current_user(current_user):
+    return jsonify({"id": current_user.id, "email": current_user.email}), 200
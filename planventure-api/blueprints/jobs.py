@@ -0,0 +1,163 @@
+from datetime import datetime
+from flask import Blueprint, current_app, jsonify, request, send_file, url_for
+from models import Job
+from database import db
+from utils.auth_middleware import auth_required
+from utils.jobs import job_runner
+
+jobs = Blueprint("jobs", __name__)
+
+
+def _job_json(job):
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "result": job.result,
+        "error": job.error,
+        "has_output": job.output_file is not None,
+        "cancel_requested": job.cancel_requested,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def _find_job(user_id, job_id):
+    """Load a user's job, first failing it if its process has stopped."""
+    job = Job.query.filter_by(id=job_id, user_id=user_id).first()
+    if job is not None and job_runner.is_stale(job):
+        job_runner.fail_stale(id=job.id)
+        db.session.commit()
+        db.session.refresh(job)
+    return job
+
+
+@jobs.route("/jobs", methods=["POST"])
+@auth_required()
+def create_job(current_user):
+    """Queue a background job; poll GET /api/jobs/<id> for the outcome.
+
+    The body is {"kind": ..., "params": {...}}. Each user may have
+    JOBS_MAX_ACTIVE_PER_USER jobs queued or running at once.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"message": "No input data provided"}), 400
+    kind = data.get("kind")
+    params = data.get("params", {})
+    if kind not in job_runner.kinds:
+        return (
+            jsonify({"message": f"kind must be one of: {', '.join(job_runner.kinds)}"}),
+            400,
+        )
+    if not isinstance(params, dict):
+        return jsonify({"message": "params must be an object"}), 400
+
+    try:
+        limit = current_app.config["JOBS_MAX_ACTIVE_PER_USER"]
+        if job_runner.active_count(current_user.id) >= limit:
+            response = jsonify({"message": "Too many active jobs"})
+            response.headers["Retry-After"] = "5"
+            return response, 429
+
+        job = job_runner.enqueue(current_user.id, kind, params)
+        response = jsonify(_job_json(job))
+        response.headers["Location"] = url_for("jobs.get_job", job_id=job.id)
+        return response, 202
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": "Failed to queue job"}), 500
+
+
+@jobs.route("/jobs/<int:job_id>", methods=["GET"])
+@auth_required()
+def get_job(current_user, job_id):
+    try:
+        job = _find_job(current_user.id, job_id)
+        if not job:
+            return jsonify({"message": "Job not found"}), 404
+        return jsonify(_job_json(job)), 200
+    except Exception as e:
+        return jsonify({"message": "Failed to fetch job"}), 500
+
+
+@jobs.route("/jobs/<int:job_id>/output", methods=["GET"])
+@auth_required()
+def get_job_output(current_user, job_id):
+    """Download the file a finished job produced, such as an export."""
+    try:
+        job = _find_job(current_user.id, job_id)
+        if not job:
+            return jsonify({"message": "Job not found"}), 404
+        if job.output_file is None:
+            return jsonify({"message": "Job has no output"}), 404
+        # Streamed from disk in blocks, like the synchronous export
+        return send_file(
+            job_runner.output_path(job.output_file),
+            mimetype=job.output_type,
+            as_attachment=True,
+            download_name=job.output_file,
+            conditional=False,
+        )
+    except FileNotFoundError:
+        return jsonify({"message": "Job output is no longer available"}), 410
+    except Exception as e:
+        return jsonify({"message": "Failed to fetch job output"}), 500
+
+
+@jobs.route("/jobs/<int:job_id>", methods=["DELETE"])
+@auth_required()
+def cancel_job(current_user, job_id):
+    """Cancel a job.
+
+    A queued job, or a running one whose process has stopped, is cancelled
+    at once (200). A live running one is asked to stop and ends as
+    "cancelled" at its next checkpoint (202). Finished jobs cannot be
+    cancelled (409).
+    """
+    try:
+        job = Job.query.filter_by(id=job_id, user_id=current_user.id).first()
+        if not job:
+            return jsonify({"message": "Job not found"}), 404
+
+        # Conditional updates, as the runner may claim the job meanwhile
+        if db.session.execute(
+            db.update(Job)
+            .where(
+                Job.id == job_id,
+                db.or_(
+                    Job.status == "queued",
+                    db.and_(
+                        Job.status == "running",
+                        db.or_(
+                            Job.heartbeat_at.is_(None),
+                            Job.heartbeat_at < job_runner.stale_before(),
+                        ),
+                    ),
+                ),
+            )
+            .values(
+                status="cancelled",
+                cancel_requested=True,
+                finished_at=datetime.utcnow(),
+            )
+        ).rowcount:
+            status = 200
+        elif db.session.execute(
+            db.update(Job)
+            .where(Job.id == job_id, Job.status == "running")
+            .values(cancel_requested=True)
+        ).rowcount:
+            status = 202
+        else:
+            db.session.rollback()
+            return jsonify({"message": f"Job already {job.status}"}), 409
+        db.session.commit()
+        job_runner.cancel(job_id)
+
+        db.session.refresh(job)
+        return jsonify(_job_json(job)), status
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": "Failed to cancel job"}), 500
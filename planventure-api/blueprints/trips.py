@@ -1,74 +1,94 @@
-from flask import Blueprint, jsonify, request
-from models import Trip
+import csv
+import io
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    make_response,
+    request,
+    stream_with_context,
+)
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer, load_only, undefer
+from werkzeug.exceptions import HTTPException
+from models import ItineraryDay, ItineraryRevision, Trip
 from database import db
 from utils.auth_middleware import auth_required
-from utils.itinerary import generate_itinerary_template
+from utils.conditional import (
+    has_conditional_headers,
+    is_not_modified,
+    make_etag,
+    set_validators,
+)
+from utils.search import search_backend, search_statement, search_terms
+from utils.geo import bounding_box, covering_prefixes, haversine_km
+from utils.itinerary import generate_itinerary_template, merge_itinerary
+from utils.jobs import job_runner
+from utils.validation import validate_trip_data
+from utils.patch import (
+    apply_json_patch,
+    apply_merge_patch,
+    json_patch_days,
+    merge_patch_days,
+)
+from utils.pagination import (
+    decode_cursor,
+    encode_cursor,
+    parse_fields,
+    parse_limit,
+    parse_window,
+)
 
 trips = Blueprint("trips", __name__)
 
+# Fields a client may request through the `fields` query parameter
+TRIP_FIELDS = (
+    "id",
+    "destination",
+    "start_date",
+    "end_date",
+    "latitude",
+    "longitude",
+    "itinerary",
+)
+
+# Stored as midnight datetimes; the API reads and writes them as YYYY-MM-DD
+DATE_FIELDS = ("start_date", "end_date")
+
+# Autocomplete only needs a handful of suggestions by default
+SEARCH_LIMIT = 10
+
+# Half the Earth's circumference; any larger radius covers the whole globe
+MAX_RADIUS_KM = 20016
+
 
 @trips.route("/trips", methods=["POST"])
 @auth_required()
 def create_trip(current_user):
-    data = request.get_json()
-
-    # Validate required fields
-    required_fields = ["destination", "start_date", "end_date"]
-    if not all(field in data for field in required_fields):
-        missing_fields = [field for field in required_fields if field not in data]
-        return (
-            jsonify(
-                {"message": "Missing required fields", "missing_fields": missing_fields}
-            ),
-            400,
-        )
+    trip_data, error = validate_trip_data(request.get_json(silent=True))
+    if error:
+        return jsonify(error), 400
 
     try:
-        # Convert string dates to datetime objects
-        from datetime import datetime
-
-        try:
-            start_date = datetime.strptime(data["start_date"], "%Y-%m-%d")
-            end_date = datetime.strptime(data["end_date"], "%Y-%m-%d")
-        except ValueError:
-            return jsonify({"message": "Invalid date format. Use YYYY-MM-DD"}), 400
-
-        # Validate date logic
-        if start_date > end_date:
-            return jsonify({"message": "Start date must be before end date"}), 400
-
-        # Validate and sanitize optional fields
-        latitude = data.get("latitude")
-        longitude = data.get("longitude")
-        if latitude is not None and not isinstance(latitude, (int, float)):
-            return jsonify({"message": "Latitude must be a number"}), 400
-        if longitude is not None and not isinstance(longitude, (int, float)):
-            return jsonify({"message": "Longitude must be a number"}), 400
-
-        # Generate default itinerary if none provided
-        itinerary = data.get("itinerary")
-        if not itinerary:
-            itinerary = generate_itinerary_template(
-                data["start_date"], data["end_date"]
-            )
-            if not itinerary:
-                return jsonify({"message": "Invalid date format"}), 400
-
+        itinerary = trip_data.pop("itinerary")
         new_trip = Trip(
             user_id=current_user.id,
-            destination=data["destination"].strip(),
-            start_date=start_date,
-            end_date=end_date,
-            latitude=latitude,
-            longitude=longitude,
-            itinerary=itinerary,
+            itinerary_normalized=current_app.config["ITINERARY_STORAGE"]
+            == "normalized",
+            **trip_data,
         )
 
         db.session.add(new_trip)
+        new_trip.set_itinerary(itinerary)
         db.session.commit()
 
         return jsonify({"message": "Trip created successfully", "id": new_trip.id}), 201
 
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"message": str(e)}), 400
     except Exception as e:
         db.session.rollback()
         # Log the actual error for debugging
@@ -76,53 +96,533 @@ def create_trip(current_user):
         return jsonify({"message": "Failed to create trip", "error": str(e)}), 500
 
 
+def _ndjson_rows(stream):
+    """Yield (row, error) pairs from a newline-delimited JSON stream."""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield current_app.json.loads(line), None
+        except ValueError:
+            yield None, {"message": "Invalid JSON"}
+
+
+def _normalizable(itinerary) -> bool:
+    """Check that an itinerary can be split into itinerary_days rows."""
+    if not isinstance(itinerary, dict) or not isinstance(
+        itinerary.get("days", {}), dict
+    ):
+        return False
+    try:
+        for day in itinerary.get("days", {}):
+            ItineraryDay.parse_key(day)
+    except ValueError:
+        return False
+    return True
+
+
+class _TooManyTrips(Exception):
+    pass
+
+
+def _import_trips(user_id, rows, atomic, report, checkpoint=None):
+    """Validate (row, error) pairs and insert the valid trips in chunks.
+
+    The last chunk is left for the caller to commit. ``report`` is a dict
+    with "created" and "errors", kept up to date as chunks are inserted so
+    the caller can still report them after a failure. ``checkpoint`` is
+    called before each chunk and may raise to stop the import.
+    """
+    chunk_size = current_app.config["TRIPS_BULK_CHUNK_SIZE"]
+    max_rows = current_app.config["TRIPS_BULK_MAX_ROWS"]
+    normalized = current_app.config["ITINERARY_STORAGE"] == "normalized"
+
+    chunk = []
+    for index, (row, error) in enumerate(rows):
+        if index >= max_rows:
+            raise _TooManyTrips(f"Too many trips, the limit is {max_rows}")
+        if error is None:
+            values, error = validate_trip_data(row)
+        if error is None and normalized and not _normalizable(values["itinerary"]):
+            error = {"message": "Itinerary days must be YYYY-MM-DD dates"}
+        if error is not None:
+            report["errors"].append({"row": index, **error})
+            continue
+
+        chunk.append(values)
+        if len(chunk) >= chunk_size:
+            if checkpoint is not None:
+                checkpoint()
+            report["created"] += len(Trip.bulk_insert(user_id, chunk, normalized))
+            chunk = []
+            if not atomic:
+                db.session.commit()
+
+    if chunk:
+        if checkpoint is not None:
+            checkpoint()
+        report["created"] += len(Trip.bulk_insert(user_id, chunk, normalized))
+
+
+@trips.route("/trips/bulk", methods=["POST"])
+@auth_required()
+def bulk_create_trips(current_user):
+    """Import many trips at once from a JSON array or NDJSON stream.
+
+    Rows are validated up front and inserted in executemany chunks. By
+    default everything is committed in one transaction; `?atomic=false`
+    commits after every chunk instead. Invalid rows are skipped and
+    reported by their zero-based index.
+    """
+    atomic = request.args.get("atomic", "true").lower() != "false"
+
+    if request.mimetype == "application/x-ndjson":
+        rows = _ndjson_rows(request.stream)
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, list):
+            return jsonify({"message": "Expected a JSON array of trips"}), 400
+        rows = ((row, None) for row in data)
+
+    report = {"created": 0, "errors": []}
+    try:
+        _import_trips(current_user.id, rows, atomic, report)
+        db.session.commit()
+    except _TooManyTrips as e:
+        db.session.rollback()
+        return jsonify({"message": str(e)}), 413
+    except HTTPException:
+        # e.g. a compressed body that inflates past the request size limit
+        db.session.rollback()
+        raise
+    except Exception as e:
+        db.session.rollback()
+        return (
+            jsonify(
+                {
+                    "message": "Failed to import trips",
+                    # Without atomic, chunks committed before the failure remain
+                    "created": 0 if atomic else report["created"],
+                    "errors": report["errors"],
+                }
+            ),
+            500,
+        )
+
+    created, errors = report["created"], report["errors"]
+
+    status = 201 if created else 400 if errors else 200
+    return (
+        jsonify(
+            {
+                "message": f"Imported {created} trips",
+                "created": created,
+                "failed": len(errors),
+                "errors": errors,
+            }
+        ),
+        status,
+    )
+
+
+@job_runner.handler("import")
+def import_trips_job(job):
+    """Background version of POST /trips/bulk: params {"trips": [...]}."""
+    data = job.params.get("trips")
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of trips")
+    report = {"created": 0, "errors": []}
+    _import_trips(
+        job.user_id,
+        ((row, None) for row in data),
+        job.params.get("atomic", True) is not False,
+        report,
+        checkpoint=job.check_cancelled,
+    )
+    db.session.commit()
+    return {
+        "created": report["created"],
+        "failed": len(report["errors"]),
+        "errors": report["errors"],
+    }
+
+
+def _page_query(user_id, cursor, columns, window=(None, None)):
+    """Build the keyset-ordered trips query loading only the given columns.
+
+    ``window`` is an optional (from, to) pair; trips whose dates overlap it
+    are kept.
+    """
+    query = Trip.query.filter_by(user_id=user_id).options(
+        load_only(*[getattr(Trip, column) for column in columns])
+    )
+    start, end = window
+    if end:
+        query = query.filter(Trip.start_date <= end)
+    if start:
+        query = query.filter(Trip.end_date >= start)
+    if cursor:
+        cursor_start, cursor_id = cursor
+        query = query.filter(
+            or_(
+                Trip.start_date > cursor_start,
+                and_(Trip.start_date == cursor_start, Trip.id > cursor_id),
+            )
+        )
+    return query.order_by(Trip.start_date, Trip.id)
+
+
+def _page_etag(fields, cursor, window, user_trips, has_more):
+    """ETag for a page: changes when any row on it is added, removed or updated."""
+    parts = [",".join(fields), cursor, window, has_more]
+    for trip in user_trips:
+        parts.extend((trip.id, trip.updated_at))
+    return make_etag(parts)
+
+
+def _field_value(trip, field, itineraries):
+    if field == "itinerary":
+        return itineraries[trip.id]
+    value = getattr(trip, field)
+    return value.date() if field in DATE_FIELDS else value
+
+
+def _list_trips(user_id, window):
+    """Respond with one page of trips, honouring the list query parameters."""
+    try:
+        limit = parse_limit(
+            request.args.get("limit"),
+            default=current_app.config["TRIPS_PAGE_SIZE"],
+            maximum=current_app.config["TRIPS_MAX_PAGE_SIZE"],
+        )
+        fields = parse_fields(request.args.get("fields"), TRIP_FIELDS)
+        cursor = decode_cursor(request.args.get("cursor"))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    try:
+        # The keyset and version columns are always needed
+        version_columns = {"id", "start_date", "updated_at"}
+
+        # Revalidate against a cheap version-only query before loading the page
+        if has_conditional_headers():
+            versions = _page_query(user_id, cursor, version_columns, window)
+            versions = versions.limit(limit + 1).all()
+            etag = _page_etag(
+                fields, cursor, window, versions[:limit], len(versions) > limit
+            )
+            if is_not_modified(etag):
+                return set_validators(make_response("", 304), etag)
+
+        columns = version_columns | set(fields)
+        if "itinerary" in fields:
+            # Read the stored JSON text so it is embedded without a round-trip
+            columns -= {"itinerary"}
+            columns |= {"itinerary_raw", "itinerary_normalized"}
+
+        # Fetch one extra row to know whether another page exists
+        query = _page_query(user_id, cursor, columns, window)
+        user_trips = query.limit(limit + 1).all()
+        has_more = len(user_trips) > limit
+        user_trips = user_trips[:limit]
+
+        itineraries = (
+            Trip.load_itineraries(user_trips, raw=True) if "itinerary" in fields else {}
+        )
+        response = jsonify(
+            [
+                {field: _field_value(trip, field, itineraries) for field in fields}
+                for trip in user_trips
+            ]
+        )
+        if has_more:
+            last = user_trips[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(last.start_date, last.id)
+        set_validators(
+            response, _page_etag(fields, cursor, window, user_trips, has_more)
+        )
+        return response, 200
+    except Exception as e:
+        return jsonify({"message": "Failed to fetch trips"}), 500
+
+
 @trips.route("/trips", methods=["GET"])
 @auth_required()
 def get_trips(current_user):
+    """List trips, optionally only those overlapping `from`..`to` (inclusive)."""
+    try:
+        window = parse_window(request.args.get("from"), request.args.get("to"))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    return _list_trips(current_user.id, window)
+
+
+@trips.route("/trips/upcoming", methods=["GET"])
+@auth_required()
+def get_upcoming_trips(current_user):
+    """List trips that have not ended yet, soonest first."""
+    from datetime import datetime
+
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    return _list_trips(current_user.id, (today, None))
+
+
+# Columns written by the CSV export, which leaves out the itinerary
+EXPORT_CSV_FIELDS = (
+    "id",
+    "destination",
+    "start_date",
+    "end_date",
+    "latitude",
+    "longitude",
+)
+
+EXPORT_MIMETYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _export_row(trip, itinerary=None):
+    row = {field: getattr(trip, field) for field in EXPORT_CSV_FIELDS}
+    row["start_date"] = trip.start_date.strftime("%Y-%m-%d")
+    row["end_date"] = trip.end_date.strftime("%Y-%m-%d")
+    if itinerary is not None:
+        row["itinerary"] = itinerary
+    return row
+
+
+def _export_chunks(user_id, export_format):
+    """Yield a user's trips as NDJSON or CSV text, one batch at a time."""
+    query = db.select(Trip).filter_by(user_id=user_id)
+    if export_format == "csv":
+        query = query.options(
+            load_only(*[getattr(Trip, field) for field in EXPORT_CSV_FIELDS])
+        )
+    else:
+        query = query.options(defer(Trip.itinerary), undefer(Trip.itinerary_raw))
+    query = query.order_by(Trip.start_date, Trip.id).execution_options(
+        yield_per=current_app.config["TRIPS_EXPORT_BATCH_SIZE"]
+    )
+
+    buffer = io.StringIO()
+    writer = None
+    if export_format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_FIELDS)
+        writer.writeheader()
+        # Send the header right away so the client sees progress
+        yield buffer.getvalue()
+
+    for partition in db.session.execute(query).scalars().partitions():
+        buffer.seek(0)
+        buffer.truncate()
+        if writer is not None:
+            writer.writerows(_export_row(trip) for trip in partition)
+        else:
+            itineraries = Trip.load_itineraries(partition, raw=True)
+            for trip in partition:
+                row = _export_row(trip, itineraries[trip.id])
+                buffer.write(current_app.json.dumps(row))
+                buffer.write("\n")
+        yield buffer.getvalue()
+
+
+@trips.route("/trips/export", methods=["GET"])
+@auth_required()
+def export_trips(current_user):
+    """Stream all of the user's trips as NDJSON (default) or CSV.
+
+    Trips are read with yield_per, which uses a server-side cursor where the
+    driver supports it, and written one batch at a time, so memory use does
+    not grow with the number of trips.
+    """
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in EXPORT_MIMETYPES:
+        return jsonify({"message": "Format must be ndjson or csv"}), 400
+
+    response = Response(
+        stream_with_context(_export_chunks(current_user.id, export_format)),
+        mimetype=EXPORT_MIMETYPES[export_format],
+    )
+    response.headers[
+        "Content-Disposition"
+    ] = f"attachment; filename=trips.{export_format}"
+    return response
+
+
+@job_runner.handler("export")
+def export_trips_job(job):
+    """Background export, downloaded from GET /api/jobs/<id>/output."""
+    export_format = job.params.get("format", "ndjson")
+    if export_format not in EXPORT_MIMETYPES:
+        raise ValueError("Format must be ndjson or csv")
+    with job.open_output(export_format, EXPORT_MIMETYPES[export_format]) as f:
+        for chunk in _export_chunks(job.user_id, export_format):
+            job.check_cancelled()
+            f.write(chunk)
+        size = f.tell()
+    return {"format": export_format, "size": size}
+
+
+@trips.route("/trips/nearby", methods=["GET"])
+@auth_required()
+def nearby_trips(current_user):
+    """Return trips within `radius_km` of (`lat`, `lon`), nearest first.
+
+    Candidates come from geohash prefix range scans over the bounding box
+    and are then checked with the exact haversine distance.
+    """
     try:
-        user_trips = Trip.query.filter_by(user_id=current_user.id).all()
+        latitude = float(request.args["lat"])
+        longitude = float(request.args["lon"])
+        radius_km = float(request.args.get("radius_km", 50))
+    except KeyError:
+        return jsonify({"message": "lat and lon are required"}), 400
+    except ValueError:
+        return jsonify({"message": "lat, lon and radius_km must be numbers"}), 400
+    try:
+        limit = parse_limit(
+            request.args.get("limit"),
+            default=current_app.config["TRIPS_PAGE_SIZE"],
+            maximum=current_app.config["TRIPS_MAX_PAGE_SIZE"],
+        )
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        return jsonify({"message": "Coordinates are out of range"}), 400
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        return (
+            jsonify({"message": f"radius_km must be between 0 and {MAX_RADIUS_KM}"}),
+            400,
+        )
+
+    try:
+        min_lat, max_lat, min_lon, max_lon = bounding_box(
+            latitude, longitude, radius_km
+        )
+        query = db.select(
+            Trip.id,
+            Trip.destination,
+            Trip.start_date,
+            Trip.end_date,
+            Trip.latitude,
+            Trip.longitude,
+        ).where(Trip.user_id == current_user.id, Trip.geohash.is_not(None))
+
+        prefixes = covering_prefixes(min_lat, max_lat, min_lon, max_lon)
+        if prefixes:
+            # "{" sorts right after "z", the last geohash character
+            query = query.where(
+                or_(
+                    *[
+                        and_(Trip.geohash >= prefix, Trip.geohash < prefix + "{")
+                        for prefix in prefixes
+                    ]
+                )
+            )
+        query = query.where(Trip.latitude.between(min_lat, max_lat))
+        if -180 <= min_lon and max_lon <= 180:
+            query = query.where(Trip.longitude.between(min_lon, max_lon))
+
+        matches = []
+        for row in db.session.execute(query):
+            distance = haversine_km(latitude, longitude, row.latitude, row.longitude)
+            if distance <= radius_km:
+                matches.append((distance, row))
+        matches.sort(key=lambda match: (match[0], match[1].id))
+
         return (
             jsonify(
                 [
                     {
-                        "id": trip.id,
-                        "destination": trip.destination,
-                        "start_date": trip.start_date,
-                        "end_date": trip.end_date,
-                        "latitude": trip.latitude,
-                        "longitude": trip.longitude,
-                        "itinerary": trip.itinerary,
+                        "id": row.id,
+                        "destination": row.destination,
+                        "start_date": row.start_date.date(),
+                        "end_date": row.end_date.date(),
+                        "latitude": row.latitude,
+                        "longitude": row.longitude,
+                        "distance_km": round(distance, 3),
                     }
-                    for trip in user_trips
+                    for distance, row in matches[:limit]
                 ]
             ),
             200,
         )
     except Exception as e:
-        return jsonify({"message": "Failed to fetch trips"}), 500
+        return jsonify({"message": "Failed to fetch nearby trips"}), 500
 
 
-@trips.route("/trips/<int:trip_id>", methods=["GET"])
+@trips.route("/trips/search", methods=["GET"])
 @auth_required()
-def get_trip(current_user, trip_id):
+def search_trips(current_user):
+    """Search the user's trips by destination, best matches first.
+
+    Each word of `q` matches as a prefix, so partial input works for
+    autocomplete ("par" finds "Paris, France").
+    """
+    terms = search_terms(request.args.get("q"))
+    if not terms:
+        return jsonify({"message": "q is required"}), 400
     try:
-        trip = Trip.query.filter_by(id=trip_id, user_id=current_user.id).first()
-        if not trip:
-            return jsonify({"message": "Trip not found"}), 404
+        limit = parse_limit(
+            request.args.get("limit"),
+            default=SEARCH_LIMIT,
+            maximum=current_app.config["TRIPS_MAX_PAGE_SIZE"],
+        )
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    try:
+        connection = db.session.connection()
+        statement, params = search_statement(
+            search_backend(connection), terms, current_user.id, limit
+        )
         return (
             jsonify(
-                {
-                    "id": trip.id,
-                    "destination": trip.destination,
-                    "start_date": trip.start_date,
-                    "end_date": trip.end_date,
-                    "latitude": trip.latitude,
-                    "longitude": trip.longitude,
-                    "itinerary": trip.itinerary,
-                }
+                [
+                    {
+                        "id": row.id,
+                        "destination": row.destination,
+                        "start_date": row.start_date.date(),
+                        "end_date": row.end_date.date(),
+                    }
+                    for row in connection.execute(statement, params)
+                ]
             ),
             200,
         )
+    except Exception as e:
+        return jsonify({"message": "Failed to search trips"}), 500
+
+
+@trips.route("/trips/<int:trip_id>", methods=["GET"])
+@auth_required()
+def get_trip(current_user, trip_id):
+    try:
+        # Revalidate against updated_at without loading the itinerary
+        if has_conditional_headers():
+            version = (
+                db.session.query(Trip.updated_at)
+                .filter_by(id=trip_id, user_id=current_user.id)
+                .first()
+            )
+            if not version:
+                return jsonify({"message": "Trip not found"}), 404
+            etag = make_etag((trip_id, version.updated_at))
+            if is_not_modified(etag, version.updated_at):
+                return set_validators(make_response("", 304), etag, version.updated_at)
+
+        trip = (
+            Trip.query.options(defer(Trip.itinerary), undefer(Trip.itinerary_raw))
+            .filter_by(id=trip_id, user_id=current_user.id)
+            .first()
+        )
+        if not trip:
+            return jsonify({"message": "Trip not found"}), 404
+        itineraries = Trip.load_itineraries([trip], raw=True)
+        response = jsonify(
+            {field: _field_value(trip, field, itineraries) for field in TRIP_FIELDS}
+        )
+        set_validators(response, make_etag((trip.id, trip.updated_at)), trip.updated_at)
+        return response, 200
     except Exception as e:
         return jsonify({"message": "Failed to fetch trip"}), 500
 
@@ -170,7 +670,10 @@ def update_trip(current_user, trip_id):
 
         # Update itinerary if provided
         if "itinerary" in data:
-            trip.itinerary = data["itinerary"]
+            ItineraryRevision.record(
+                trip, trip.get_itinerary(), data["itinerary"], "update"
+            )
+            trip.set_itinerary(data["itinerary"])
 
         db.session.commit()
         return (
@@ -180,11 +683,11 @@ def update_trip(current_user, trip_id):
                     "trip": {
                         "id": trip.id,
                         "destination": trip.destination,
-                        "start_date": trip.start_date.strftime("%Y-%m-%d"),
-                        "end_date": trip.end_date.strftime("%Y-%m-%d"),
+                        "start_date": trip.start_date.date(),
+                        "end_date": trip.end_date.date(),
                         "latitude": trip.latitude,
                         "longitude": trip.longitude,
-                        "itinerary": trip.itinerary,
+                        "itinerary": trip.get_itinerary(),
                     },
                 }
             ),
@@ -193,11 +696,268 @@ def update_trip(current_user, trip_id):
     except ValueError as e:
         db.session.rollback()
         return jsonify({"message": "Invalid date format. Use YYYY-MM-DD"}), 400
+    except IntegrityError:
+        # Another request saved a revision of this trip first
+        db.session.rollback()
+        return jsonify({"message": "Trip was modified concurrently"}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": f"Failed to update trip: {str(e)}"}), 500
 
 
+@trips.route("/trips/<int:trip_id>/itinerary", methods=["PATCH"])
+@auth_required()
+def patch_itinerary(current_user, trip_id):
+    """Apply a JSON Patch or a merge patch to a trip's itinerary.
+
+    ``application/json-patch+json`` bodies are RFC 6902 operation lists;
+    anything else is treated as an RFC 7386 merge patch. Only the days the
+    patch touches are returned.
+    """
+    patch = request.get_json(silent=True)
+    if patch is None:
+        return jsonify({"message": "Invalid JSON body"}), 400
+
+    try:
+        trip = Trip.query.filter_by(id=trip_id, user_id=current_user.id).first()
+        if not trip:
+            return jsonify({"message": "Trip not found"}), 404
+
+        # Optimistic concurrency: reject patches made against a stale version
+        etag = make_etag((trip.id, trip.updated_at))
+        if request.if_match and not request.if_match.contains(etag):
+            return jsonify({"message": "Trip has been modified"}), 412
+
+        if request.mimetype == "application/json-patch+json":
+            days = json_patch_days(patch)
+        elif isinstance(patch, dict):
+            days = merge_patch_days(patch)
+        else:
+            return jsonify({"message": "Merge patch must be a JSON object"}), 400
+
+        # Only load the days the patch references
+        current = stored = trip.get_itinerary(days)
+        if not current:
+            current = generate_itinerary_template(
+                trip.start_date.strftime("%Y-%m-%d"),
+                trip.end_date.strftime("%Y-%m-%d"),
+            )
+            days = None
+
+        if request.mimetype == "application/json-patch+json":
+            itinerary = apply_json_patch(current, patch)
+        else:
+            itinerary = apply_merge_patch(current, patch)
+
+        if not isinstance(itinerary, dict) or not isinstance(
+            itinerary.get("days", {}), dict
+        ):
+            return jsonify({"message": "Itinerary days must be an object"}), 400
+
+        # Skip the write entirely when the patch is a no-op
+        if itinerary != current:
+            ItineraryRevision.record(trip, stored, itinerary, "patch")
+            trip.set_itinerary(itinerary, days)
+            db.session.commit()
+
+        if days is None:
+            days = set(current.get("days", {})) | set(itinerary.get("days", {}))
+
+        response = jsonify(
+            {
+                "message": "Itinerary updated successfully",
+                "days": {
+                    day: itinerary.get("days", {}).get(day) for day in sorted(days)
+                },
+            }
+        )
+        set_validators(response, make_etag((trip.id, trip.updated_at)), trip.updated_at)
+        return response, 200
+    except ValueError as e:  # includes PatchError
+        db.session.rollback()
+        return jsonify({"message": str(e)}), 400
+    except IntegrityError:
+        # Another request saved a revision of this trip first
+        db.session.rollback()
+        return jsonify({"message": "Trip was modified concurrently"}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": "Failed to update itinerary"}), 500
+
+
+@trips.route("/trips/<int:trip_id>/days", methods=["GET"])
+@auth_required()
+def get_trip_days(current_user, trip_id):
+    """Return the itinerary days between `from` and `to` (inclusive)."""
+    from datetime import datetime
+
+    try:
+        start = request.args.get("from")
+        end = request.args.get("to")
+        start = datetime.strptime(start, "%Y-%m-%d").date() if start else None
+        end = datetime.strptime(end, "%Y-%m-%d").date() if end else None
+    except ValueError:
+        return jsonify({"message": "Invalid date format. Use YYYY-MM-DD"}), 400
+
+    try:
+        trip = Trip.query.filter_by(id=trip_id, user_id=current_user.id).first()
+        if not trip:
+            return jsonify({"message": "Trip not found"}), 404
+        return jsonify({"id": trip.id, "days": trip.get_days(start, end)}), 200
+    except Exception as e:
+        return jsonify({"message": "Failed to fetch itinerary days"}), 500
+
+
+@job_runner.handler("itinerary")
+def rebuild_itinerary_job(job):
+    """Refit a trip's itinerary to its dates: params {"trip_id": ...}.
+
+    Days added by a date change get an empty template and days outside
+    the trip are dropped. The change is saved as an itinerary revision.
+    """
+    trip = Trip.query.filter_by(
+        id=job.params.get("trip_id"), user_id=job.user_id
+    ).first()
+    if not trip:
+        raise LookupError("Trip not found")
+    current = trip.get_itinerary()
+    rebuilt = merge_itinerary(
+        trip.start_date.strftime("%Y-%m-%d"),
+        trip.end_date.strftime("%Y-%m-%d"),
+        current,
+    )
+    job.check_cancelled()
+    ItineraryRevision.record(trip, current, rebuilt, "rebuild")
+    trip.set_itinerary(rebuilt)
+    db.session.commit()
+    return {"trip_id": trip.id, "days": len(rebuilt["days"])}
+
+
+@trips.route("/trips/<int:trip_id>/revisions", methods=["GET"])
+@auth_required()
+def list_revisions(current_user, trip_id):
+    """List a trip's itinerary revisions, newest first.
+
+    Paginated like the trips list: pass `X-Next-Cursor` back as `cursor`.
+    """
+    try:
+        limit = parse_limit(
+            request.args.get("limit"),
+            default=current_app.config["TRIPS_PAGE_SIZE"],
+            maximum=current_app.config["TRIPS_MAX_PAGE_SIZE"],
+        )
+        cursor = request.args.get("cursor")
+        cursor = int(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    try:
+        if (
+            not db.session.query(Trip.id)
+            .filter_by(id=trip_id, user_id=current_user.id)
+            .first()
+        ):
+            return jsonify({"message": "Trip not found"}), 404
+
+        query = db.session.query(
+            ItineraryRevision.number,
+            ItineraryRevision.source,
+            ItineraryRevision.created_at,
+        ).filter(ItineraryRevision.trip_id == trip_id)
+        if cursor:
+            query = query.filter(ItineraryRevision.number < cursor)
+        rows = query.order_by(ItineraryRevision.number.desc()).limit(limit + 1).all()
+
+        response = jsonify(
+            [
+                {
+                    "number": row.number,
+                    "source": row.source,
+                    "created_at": row.created_at,
+                }
+                for row in rows[:limit]
+            ]
+        )
+        if len(rows) > limit:
+            response.headers["X-Next-Cursor"] = str(rows[limit - 1].number)
+        return response, 200
+    except Exception as e:
+        return jsonify({"message": "Failed to fetch revisions"}), 500
+
+
+def _get_revision(trip_id, number):
+    revision = ItineraryRevision.query.filter_by(trip_id=trip_id, number=number).first()
+    if revision is None:
+        return None, None
+    return revision, ItineraryRevision.itinerary_at(trip_id, number)
+
+
+@trips.route("/trips/<int:trip_id>/revisions/<int:number>", methods=["GET"])
+@auth_required()
+def get_revision(current_user, trip_id, number):
+    """Return the itinerary as it was at one revision."""
+    try:
+        trip = Trip.query.filter_by(id=trip_id, user_id=current_user.id).first()
+        if not trip:
+            return jsonify({"message": "Trip not found"}), 404
+        revision, itinerary = _get_revision(trip.id, number)
+        if revision is None:
+            return jsonify({"message": "Revision not found"}), 404
+        return (
+            jsonify(
+                {
+                    "number": revision.number,
+                    "source": revision.source,
+                    "created_at": revision.created_at,
+                    "itinerary": itinerary,
+                }
+            ),
+            200,
+        )
+    except Exception as e:
+        return jsonify({"message": "Failed to fetch revision"}), 500
+
+
+@trips.route("/trips/<int:trip_id>/revisions/<int:number>/restore", methods=["POST"])
+@auth_required()
+def restore_revision(current_user, trip_id, number):
+    """Make an earlier revision the current itinerary, as a new revision."""
+    try:
+        trip = Trip.query.filter_by(id=trip_id, user_id=current_user.id).first()
+        if not trip:
+            return jsonify({"message": "Trip not found"}), 404
+        revision, itinerary = _get_revision(trip.id, number)
+        if revision is None:
+            return jsonify({"message": "Revision not found"}), 404
+
+        restored = ItineraryRevision.record(
+            trip, trip.get_itinerary(), itinerary, "restore"
+        )
+        if restored is not None:
+            trip.set_itinerary(itinerary)
+            db.session.commit()
+        return (
+            jsonify(
+                {
+                    "message": f"Restored revision {number}",
+                    "revision": restored.number if restored else None,
+                    "itinerary": itinerary,
+                }
+            ),
+            200,
+        )
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"message": str(e)}), 400
+    except IntegrityError:
+        # Another request saved a revision of this trip first
+        db.session.rollback()
+        return jsonify({"message": "Trip was modified concurrently"}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": "Failed to restore revision"}), 500
+
+
 @trips.route("/trips/<int:trip_id>", methods=["DELETE"])
 @auth_required()
 def delete_trip(current_user, trip_id):
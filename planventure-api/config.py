@@ -0,0 +1,118 @@
+import os
+from datetime import timedelta
+
+from dotenv import load_dotenv
+
+
+def load_config() -> dict:
+    """Build the application configuration from the environment."""
+    # Load environment variables from .env file
+    load_dotenv()
+
+    return {
+        # Database configuration
+        "SQLALCHEMY_DATABASE_URI": os.getenv(
+            "DATABASE_URL", "sqlite:///planventure.db"
+        ),
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        # Optional read replica for GET requests and the auth lookup. Users
+        # read from the primary for DB_REPLICA_STICKY_SECONDS after a write
+        "SQLALCHEMY_REPLICA_URI": os.getenv("DATABASE_REPLICA_URL"),
+        "DB_REPLICA_STICKY_SECONDS": float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5")),
+        # Connection pool configuration (SQLALCHEMY_ENGINE_OPTIONS is derived
+        # from these in create_app unless set explicitly)
+        "DB_POOL_SIZE": int(os.getenv("DB_POOL_SIZE", "5")),
+        "DB_MAX_OVERFLOW": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "DB_POOL_TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "DB_POOL_RECYCLE": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "DB_POOL_PRE_PING": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+        "DB_SLOW_CHECKOUT_MS": float(os.getenv("DB_SLOW_CHECKOUT_MS", "100")),
+        # SQLite connection tuning, applied on connect to file databases
+        "SQLITE_SYNCHRONOUS": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "SQLITE_BUSY_TIMEOUT_MS": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "SQLITE_MMAP_SIZE": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        # JSON encoding: "auto" (orjson when installed), "orjson" or "stdlib"
+        "JSON_PROVIDER": os.getenv("JSON_PROVIDER", "auto"),
+        # CORS configuration
+        "CORS_ORIGINS": os.getenv("CORS_ORIGINS", "http://localhost:3000").split(","),
+        # Pagination configuration
+        "TRIPS_PAGE_SIZE": int(os.getenv("TRIPS_PAGE_SIZE", "50")),
+        "TRIPS_MAX_PAGE_SIZE": int(os.getenv("TRIPS_MAX_PAGE_SIZE", "200")),
+        # Bulk import and export configuration
+        "TRIPS_BULK_CHUNK_SIZE": int(os.getenv("TRIPS_BULK_CHUNK_SIZE", "1000")),
+        "TRIPS_BULK_MAX_ROWS": int(os.getenv("TRIPS_BULK_MAX_ROWS", "250000")),
+        "TRIPS_EXPORT_BATCH_SIZE": int(os.getenv("TRIPS_EXPORT_BATCH_SIZE", "500")),
+        # Itinerary storage for new trips: "json" (single column) or
+        # "normalized" (one itinerary_days row per day)
+        "ITINERARY_STORAGE": os.getenv("ITINERARY_STORAGE", "json"),
+        # Itinerary history stores a full copy every N revisions, diffs between
+        "ITINERARY_SNAPSHOT_INTERVAL": int(
+            os.getenv("ITINERARY_SNAPSHOT_INTERVAL", "20")
+        ),
+        # Password hashing configuration
+        "BCRYPT_LOG_ROUNDS": int(os.getenv("BCRYPT_LOG_ROUNDS", "12")),
+        "BCRYPT_MAX_WORKERS": int(os.getenv("BCRYPT_MAX_WORKERS", "0")) or None,
+        "BCRYPT_MAX_PENDING": int(os.getenv("BCRYPT_MAX_PENDING", "0")) or None,
+        # Authenticated user cache configuration
+        "AUTH_USER_CACHE_TTL": float(os.getenv("AUTH_USER_CACHE_TTL", "60")),
+        "AUTH_USER_CACHE_SIZE": int(os.getenv("AUTH_USER_CACHE_SIZE", "10000")),
+        "AUTH_DEFER_USER_LOOKUP": (
+            os.getenv("AUTH_DEFER_USER_LOOKUP", "false").lower() == "true"
+        ),
+        # Login throttling: token buckets per client IP and per email.
+        # LOGIN_THROTTLE_BACKEND is "memory" or a redis:// URL shared by workers
+        "LOGIN_THROTTLE_ENABLED": (
+            os.getenv("LOGIN_THROTTLE_ENABLED", "true").lower() == "true"
+        ),
+        "LOGIN_THROTTLE_BACKEND": os.getenv("LOGIN_THROTTLE_BACKEND", "memory"),
+        "LOGIN_THROTTLE_IP_BURST": int(os.getenv("LOGIN_THROTTLE_IP_BURST", "20")),
+        "LOGIN_THROTTLE_IP_PER_MINUTE": float(
+            os.getenv("LOGIN_THROTTLE_IP_PER_MINUTE", "10")
+        ),
+        "LOGIN_THROTTLE_EMAIL_BURST": int(os.getenv("LOGIN_THROTTLE_EMAIL_BURST", "5")),
+        "LOGIN_THROTTLE_EMAIL_PER_MINUTE": float(
+            os.getenv("LOGIN_THROTTLE_EMAIL_PER_MINUTE", "2")
+        ),
+        # Reverse proxies in front of the app whose X-Forwarded-For/-Proto
+        # headers are trusted. The per-IP bucket keys on the client address,
+        # which behind a proxy is the proxy's own unless this is set; 0 trusts
+        # none, so clients cannot pick their address with a spoofed header
+        "TRUSTED_PROXY_COUNT": int(os.getenv("TRUSTED_PROXY_COUNT", "0")),
+        # Instrumentation: per-endpoint latency, SQL counts and /metrics
+        "METRICS_ENABLED": os.getenv("METRICS_ENABLED", "true").lower() == "true",
+        "METRICS_SLOW_REQUEST_MS": float(os.getenv("METRICS_SLOW_REQUEST_MS", "500")),
+        "METRICS_SLOW_QUERY_MS": float(os.getenv("METRICS_SLOW_QUERY_MS", "100")),
+        "METRICS_N_PLUS_ONE_THRESHOLD": int(
+            os.getenv("METRICS_N_PLUS_ONE_THRESHOLD", "5")
+        ),
+        "METRICS_SERVER_TIMING": (
+            os.getenv("METRICS_SERVER_TIMING", "false").lower() == "true"
+        ),
+        # Response compression and compressed request bodies
+        "COMPRESS_ENABLED": os.getenv("COMPRESS_ENABLED", "true").lower() == "true",
+        "COMPRESS_MIN_SIZE": int(os.getenv("COMPRESS_MIN_SIZE", "1024")),
+        "COMPRESS_LEVEL": int(os.getenv("COMPRESS_LEVEL", "6")),
+        "COMPRESS_ZSTD_LEVEL": int(os.getenv("COMPRESS_ZSTD_LEVEL", "3")),
+        "COMPRESS_MAX_REQUEST_SIZE": int(
+            os.getenv("COMPRESS_MAX_REQUEST_SIZE", str(64 * 1024 * 1024))
+        ),
+        # Background jobs: thread pool size, per-user limits and how long
+        # finished jobs are kept. JOBS_EAGER runs jobs inside the request
+        "JOBS_WORKERS": int(os.getenv("JOBS_WORKERS", "4")),
+        "JOBS_MAX_RUNNING_PER_USER": int(os.getenv("JOBS_MAX_RUNNING_PER_USER", "2")),
+        "JOBS_MAX_ACTIVE_PER_USER": int(os.getenv("JOBS_MAX_ACTIVE_PER_USER", "20")),
+        "JOBS_RETENTION_HOURS": float(os.getenv("JOBS_RETENTION_HOURS", "24")),
+        "JOBS_EAGER": os.getenv("JOBS_EAGER", "false").lower() == "true",
+        # Job output files (exports); defaults to instance/job-output
+        "JOBS_OUTPUT_DIR": os.getenv("JOBS_OUTPUT_DIR"),
+        # Owned jobs are refreshed this often; without a refresh for
+        # JOBS_STALE_SECONDS a job is considered lost with its process
+        "JOBS_HEARTBEAT_SECONDS": float(os.getenv("JOBS_HEARTBEAT_SECONDS", "15")),
+        "JOBS_STALE_SECONDS": float(os.getenv("JOBS_STALE_SECONDS", "60")),
+        # JWT configuration (no default secret, for security)
+        "JWT_SECRET_KEY": os.getenv("JWT_SECRET_KEY"),
+        "JWT_ACCESS_TOKEN_EXPIRES": timedelta(hours=1),
+        "JWT_REFRESH_TOKEN_EXPIRES": timedelta(days=30),
+        # How often each worker picks up tokens revoked by other workers
+        "JWT_DENYLIST_SYNC_SECONDS": float(os.getenv("JWT_DENYLIST_SYNC_SECONDS", "5")),
+    }
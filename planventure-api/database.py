@@ -1,3 +1,281 @@
+import bisect
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+# Bind key of the read replica in SQLALCHEMY_BINDS
+REPLICA_BIND = "replica"
+
+
+def _is_write(clause) -> bool:
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip()[:6].upper() == "SELECT"
+    return False
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica when the request allows it.
+
+    ``info["replica"]`` marks a session whose reads may use the replica.
+    The first write (a flush or an INSERT/UPDATE/DELETE) goes to the
+    primary and pins every later read there too, so a request always
+    reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or _is_write(clause):
+                self.info["wrote"] = True
+            elif self.info.get("replica") and not self.info.get("wrote"):
+                replica = self._db.engines.get(REPLICA_BIND)
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+logger = logging.getLogger(__name__)
+
+
+class CheckoutStats:
+    """Histogram of how long requests waited for a pooled connection."""
+
+    BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(self.BUCKETS_MS) + 1)
+
+    def record(self, waited_ms: float):
+        with self._lock:
+            self.count += 1
+            self.total_ms += waited_ms
+            self.max_ms = max(self.max_ms, waited_ms)
+            self.buckets[bisect.bisect_left(self.BUCKETS_MS, waited_ms)] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "total_ms": round(self.total_ms, 3),
+                "max_ms": round(self.max_ms, 3),
+                "buckets_ms": dict(
+                    zip([*map(str, self.BUCKETS_MS), "+Inf"], self.buckets)
+                ),
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited.
+
+    The wait includes opening a new connection when the pool is below its
+    size, and queueing for a free one when it is exhausted.
+    """
+
+    slow_checkout_ms = 100.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited_ms = (time.perf_counter() - started) * 1000
+            self.checkout_stats.record(waited_ms)
+            if waited_ms >= self.slow_checkout_ms:
+                logger.warning(
+                    f"Waited {waited_ms:.1f} ms for a database connection "
+                    f"({self.status()})"
+                )
+
+
+def _is_sqlite_memory(url) -> bool:
+    database = url.database or ""
+    return database in ("", ":memory:") or "mode=memory" in str(url)
+
+
+def engine_options(config, url=None) -> dict:
+    """Build engine options for ``url``, by default the primary database."""
+    from utils.json_provider import json_deserializer, json_serializer
+
+    options = {
+        "json_serializer": json_serializer,
+        "json_deserializer": json_deserializer,
+    }
+    url = make_url(url or config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() == "sqlite" and _is_sqlite_memory(url):
+        # Let Flask-SQLAlchemy pick its single shared connection pool
+        return options
+
+    options.update(
+        poolclass=TimedQueuePool,
+        pool_size=config["DB_POOL_SIZE"],
+        max_overflow=config["DB_MAX_OVERFLOW"],
+        pool_timeout=config["DB_POOL_TIMEOUT"],
+    )
+    if url.get_backend_name() != "sqlite":
+        options["pool_recycle"] = config["DB_POOL_RECYCLE"]
+        options["pool_pre_ping"] = config["DB_POOL_PRE_PING"]
+    return options
+
+
+def configure_engines(app):
+    """Apply per-connection tuning to every engine of the app."""
+    TimedQueuePool.slow_checkout_ms = app.config["DB_SLOW_CHECKOUT_MS"]
+    pragmas = [
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={app.config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(app.config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(app.config['SQLITE_MMAP_SIZE'])}",
+    ]
+
+    def apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.url.get_backend_name() == "sqlite" and not _is_sqlite_memory(
+                engine.url
+            ):
+                event.listen(engine, "connect", apply_sqlite_pragmas)
+
+
+def pool_status() -> dict:
+    """Describe the connection pools of the current app's engines."""
+    status = {}
+    for key, engine in db.engines.items():
+        pool = engine.pool
+        entry = {"pool": pool.__class__.__name__, "status": pool.status()}
+        if isinstance(pool, TimedQueuePool):
+            entry.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+                checkout_wait=pool.checkout_stats.snapshot(),
+            )
+        status[key or "default"] = entry
+    return status
+
+
+class ReplicaRouter:
+    """Decides which requests may read from the replica.
+
+    GET, HEAD and OPTIONS requests read from the replica, except for users
+    who wrote within the last ``DB_REPLICA_STICKY_SECONDS``: replication
+    lag must not hide their own changes from them. Other requests only use
+    it for the auth lookup. Recent writers are tracked per process.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        # user id -> monotonic time their sticky window ends, oldest first
+        self._writers = OrderedDict()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Add the replica bind; call before ``db.init_app``."""
+        url = app.config.get("SQLALCHEMY_REPLICA_URI")
+        if url:
+            binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+            binds.setdefault(
+                REPLICA_BIND, {"url": url, **engine_options(app.config, url)}
+            )
+            app.config["SQLALCHEMY_BINDS"] = binds
+        app.before_request(self._start_request)
+        app.extensions["replica_router"] = self
+
+    def _start_request(self):
+        if not current_app.config.get("SQLALCHEMY_REPLICA_URI"):
+            return
+        # Tests can reuse one session across requests, so reset every key
+        info = db.session.info
+        info["replica"] = request.method in self.SAFE_METHODS
+        info["wrote"] = False
+        info["sticky"] = False
+        info.pop("user_id", None)
+
+    def bind_user(self, user_id):
+        """Record the request's user, keeping recent writers on the primary."""
+        if not current_app.config.get("SQLALCHEMY_REPLICA_URI"):
+            return
+        info = db.session.info
+        info["user_id"] = user_id
+        if self.is_sticky(user_id):
+            info["sticky"] = True
+            info["replica"] = False
+
+    def get(self, model, ident):
+        """Load a row by primary key from the replica, even in a write request.
+
+        Falls back to the primary when the replica has not caught up with
+        the row yet, e.g. for a user who has just registered.
+        """
+        session = db.session()
+        if not current_app.config.get("SQLALCHEMY_REPLICA_URI"):
+            return session.get(model, ident)
+        previous = session.info.get("replica")
+        session.info["replica"] = not session.info.get("sticky")
+        try:
+            row = session.get(model, ident)
+            if row is None and session.info["replica"]:
+                session.info["replica"] = False
+                row = session.get(model, ident)
+            return row
+        finally:
+            session.info["replica"] = previous
+
+    def mark_write(self, user_id):
+        window = current_app.config.get("DB_REPLICA_STICKY_SECONDS", 0)
+        if window <= 0 or not current_app.config.get("SQLALCHEMY_REPLICA_URI"):
+            return
+        now = time.monotonic()
+        key = str(user_id)
+        with self._lock:
+            self._writers[key] = now + window
+            self._writers.move_to_end(key)
+            while self._writers and next(iter(self._writers.values())) <= now:
+                self._writers.popitem(last=False)
+
+    def is_sticky(self, user_id) -> bool:
+        deadline = self._writers.get(str(user_id))
+        return deadline is not None and deadline > time.monotonic()
+
+    def reset(self):
+        with self._lock:
+            self._writers.clear()
+
+
+replica_router = ReplicaRouter()
+
 
-db = SQLAlchemy()
+@event.listens_for(RoutingSession, "after_commit")
+def start_sticky_window(session):
+    if session.info.get("wrote") and "user_id" in session.info:
+        replica_router.mark_write(session.info["user_id"])
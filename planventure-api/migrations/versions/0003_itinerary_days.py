@@ -0,0 +1,50 @@
+"""normalized itinerary days
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+Existing trips keep their JSON itineraries; move them over with
+``python scripts/normalize_itineraries.py``. Run it with ``--reverse``
+before downgrading, or normalized days are dropped.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "trips",
+        sa.Column(
+            "itinerary_normalized",
+            sa.Boolean(),
+            nullable=False,
+            server_default=sa.false(),
+        ),
+    )
+    op.create_table(
+        "itinerary_days",
+        sa.Column(
+            "trip_id",
+            sa.Integer(),
+            sa.ForeignKey("trips.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("data", sa.JSON(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("itinerary_days")
+    with op.batch_alter_table("trips") as batch_op:
+        batch_op.drop_column("itinerary_normalized")
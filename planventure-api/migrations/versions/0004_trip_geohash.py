@@ -0,0 +1,87 @@
+"""trip geohash
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+Adds a geohash column for the nearby query and backfills it from the
+existing coordinates in batches.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from utils.geo import encode_geohash
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill(connection) -> None:
+    trips = sa.table(
+        "trips",
+        sa.column("id", sa.Integer),
+        sa.column("latitude", sa.Float),
+        sa.column("longitude", sa.Float),
+        sa.column("geohash", sa.String),
+    )
+    update = (
+        trips.update()
+        .where(trips.c.id == sa.bindparam("trip_id"))
+        .values(geohash=sa.bindparam("hash"))
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(trips.c.id, trips.c.latitude, trips.c.longitude)
+            .where(
+                trips.c.id > last_id,
+                trips.c.latitude.is_not(None),
+                trips.c.longitude.is_not(None),
+            )
+            .order_by(trips.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            update,
+            [
+                {"trip_id": row.id, "hash": encode_geohash(row.latitude, row.longitude)}
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column("trips", sa.Column("geohash", sa.String(length=12), nullable=True))
+    backfill(op.get_bind())
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_trips_user_id_geohash",
+            "trips",
+            ["user_id", "geohash"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_trips_user_id_geohash",
+            table_name="trips",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    with op.batch_alter_table("trips") as batch_op:
+        batch_op.drop_column("geohash")
@@ -0,0 +1,42 @@
+"""trip end date index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+Serves date-window overlap filters and upcoming trips. On PostgreSQL the
+index is built with CREATE INDEX CONCURRENTLY so the trips table stays
+writable while it builds.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_trips_user_id_end_date",
+            "trips",
+            ["user_id", "end_date"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_trips_user_id_end_date",
+            table_name="trips",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,45 @@
+"""itinerary revisions
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+Itinerary history: JSON Patch diffs between revisions with periodic full
+snapshots. Existing trips start their history on their next edit.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "itinerary_revisions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "trip_id",
+            sa.Integer(),
+            sa.ForeignKey("trips.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("number", sa.Integer(), nullable=False),
+        sa.Column("snapshot", sa.JSON(none_as_null=True)),
+        sa.Column("patch", sa.JSON(none_as_null=True)),
+        sa.Column("source", sa.String(length=20), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.UniqueConstraint(
+            "trip_id", "number", name="uq_itinerary_revisions_trip_id_number"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("itinerary_revisions")
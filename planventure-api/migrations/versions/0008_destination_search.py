@@ -0,0 +1,39 @@
+"""destination search index
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00
+
+SQLite: an FTS5 table over trips.destination kept in sync by triggers and
+filled from the existing rows. PostgreSQL: tsvector and trigram expression
+indexes, built CONCURRENTLY so trips stays writable.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from utils.search import create_search_index, drop_search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # CONCURRENTLY cannot run inside a transaction block
+        with op.get_context().autocommit_block():
+            create_search_index(op.get_bind(), concurrently=True)
+    else:
+        create_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            drop_search_index(op.get_bind(), concurrently=True)
+    else:
+        drop_search_index(op.get_bind())
@@ -0,0 +1,35 @@
+"""job output files
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 00:00:00
+
+Job output moves from a Text column to a file in the job output directory,
+so large exports are neither buffered nor stored in the database. Outputs
+of finished jobs are dropped; rerun those jobs to get them again.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.add_column(sa.Column("output_file", sa.String(length=255)))
+        batch_op.drop_column("output")
+    op.execute("UPDATE jobs SET output_type = NULL")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.add_column(sa.Column("output", sa.Text()))
+        batch_op.drop_column("output_file")
+    op.execute("UPDATE jobs SET output_type = NULL")
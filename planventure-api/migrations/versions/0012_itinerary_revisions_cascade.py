@@ -0,0 +1,30 @@
+"""itinerary revisions cascade trigger
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 00:00:00
+
+SQLite does not enforce the ON DELETE CASCADE on itinerary_revisions.trip_id
+without PRAGMA foreign_keys, so a trigger deletes a trip's history instead
+of a statement per trip deletion. Other databases enforce the foreign key.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from models.itinerary_revision import create_cascade_trigger, drop_cascade_trigger
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012"
+down_revision: Union[str, None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_cascade_trigger(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_cascade_trigger(op.get_bind())
@@ -1,4 +1,8 @@
 from .user import User
 from .trip import Trip
+from .itinerary_day import ItineraryDay
+from .itinerary_revision import ItineraryRevision
+from .revoked_token import RevokedToken
+from .job import Job
 
-__all__ = ["User", "Trip"]
+__all__ = ["User", "Trip", "ItineraryDay", "ItineraryRevision", "RevokedToken", "Job"]
@@ -0,0 +1,25 @@
+import datetime as dt
+from database import db
+
+
+class ItineraryDay(db.Model):
+    """One day of a trip itinerary, for trips using normalized storage."""
+
+    __tablename__ = "itinerary_days"
+
+    trip_id = db.Column(
+        db.Integer, db.ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True
+    )
+    date = db.Column(db.Date, primary_key=True)
+    data = db.Column(db.JSON, nullable=False)
+
+    def __repr__(self):
+        return f"<ItineraryDay {self.trip_id} {self.date}>"
+
+    @staticmethod
+    def parse_key(key: str) -> dt.date:
+        """Parse an itinerary day key. Raises ValueError unless it is YYYY-MM-DD."""
+        parsed = dt.datetime.strptime(key, "%Y-%m-%d").date()
+        if parsed.isoformat() != key:
+            raise ValueError(f"Invalid itinerary day: {key}")
+        return parsed
@@ -0,0 +1,151 @@
+from datetime import datetime
+from typing import Optional
+from flask import current_app
+from sqlalchemy import event
+from database import db
+from utils.patch import apply_json_patch, make_json_patch
+
+# ON DELETE CASCADE removes a deleted trip's history, but SQLite only
+# enforces foreign keys with PRAGMA foreign_keys, so there a trigger does it
+# instead. Either way no extra statement runs for trips without history.
+SQLITE_CASCADE_TRIGGER = "itinerary_revisions_trips_ad"
+
+
+def create_cascade_trigger(connection):
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {SQLITE_CASCADE_TRIGGER} "
+            "AFTER DELETE ON trips BEGIN "
+            "DELETE FROM itinerary_revisions WHERE trip_id = old.id; END"
+        )
+
+
+def drop_cascade_trigger(connection):
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {SQLITE_CASCADE_TRIGGER}")
+
+
+class ItineraryRevision(db.Model):
+    """One saved version of a trip's itinerary.
+
+    Most revisions store a JSON Patch against the previous revision; every
+    ``ITINERARY_SNAPSHOT_INTERVAL``-th one stores the whole itinerary, so
+    rebuilding any revision replays at most that many patches.
+    """
+
+    __tablename__ = "itinerary_revisions"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "trip_id", "number", name="uq_itinerary_revisions_trip_id_number"
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    trip_id = db.Column(
+        db.Integer, db.ForeignKey("trips.id", ondelete="CASCADE"), nullable=False
+    )
+    # 1-based and consecutive per trip
+    number = db.Column(db.Integer, nullable=False)
+    # Snapshots hold the whole itinerary (which may be null) and no patch
+    snapshot = db.Column(db.JSON(none_as_null=True))
+    patch = db.Column(db.JSON(none_as_null=True))
+    # What produced the revision: "original", "update", "patch", "restore"
+    # or "rebuild"
+    source = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ItineraryRevision {self.trip_id}#{self.number}>"
+
+    @staticmethod
+    def latest_number(trip_id: int) -> Optional[int]:
+        return db.session.scalar(
+            db.select(db.func.max(ItineraryRevision.number)).where(
+                ItineraryRevision.trip_id == trip_id
+            )
+        )
+
+    @staticmethod
+    def record(trip, previous, current, source: str):
+        """Save the change from ``previous`` to ``current`` as a new revision.
+
+        Call this before storing ``current`` on the trip. Both may be
+        limited to the days being changed, as the patch only needs the
+        parts that differ. A trip's first recorded change also saves its
+        stored itinerary as revision 1, so the original can be restored.
+        Returns the new revision, or None if nothing changed.
+
+        The trip row is locked before numbering where the database supports
+        it. Elsewhere (SQLite) two concurrent edits can pick the same number;
+        the unique constraint then fails the later commit with IntegrityError.
+        """
+        from .trip import Trip
+
+        patch = make_json_patch(previous, current)
+        if not patch:
+            return None
+
+        db.session.execute(
+            db.select(Trip.id).where(Trip.id == trip.id).with_for_update()
+        )
+        number = ItineraryRevision.latest_number(trip.id)
+        stored = None
+        if number is None:
+            stored = trip.get_itinerary()
+            db.session.add(
+                ItineraryRevision(
+                    trip_id=trip.id, number=1, snapshot=stored, source="original"
+                )
+            )
+            number = 1
+        number += 1
+
+        revision = ItineraryRevision(trip_id=trip.id, number=number, source=source)
+        interval = current_app.config["ITINERARY_SNAPSHOT_INTERVAL"]
+        if (number - 1) % interval == 0:
+            if stored is None:
+                stored = trip.get_itinerary()
+            revision.snapshot = apply_json_patch(stored, patch)
+        else:
+            revision.patch = patch
+        db.session.add(revision)
+        return revision
+
+    @staticmethod
+    def itinerary_at(trip_id: int, number: int):
+        """Rebuild the itinerary as of a revision. Raises LookupError if missing."""
+        base = db.session.scalar(
+            db.select(db.func.max(ItineraryRevision.number)).where(
+                ItineraryRevision.trip_id == trip_id,
+                ItineraryRevision.number <= number,
+                ItineraryRevision.patch.is_(None),
+            )
+        )
+        revisions = (
+            ItineraryRevision.query.filter(
+                ItineraryRevision.trip_id == trip_id,
+                ItineraryRevision.number.between(base or 0, number),
+            )
+            .order_by(ItineraryRevision.number)
+            .all()
+            if base is not None
+            else []
+        )
+        if not revisions or revisions[-1].number != number:
+            raise LookupError(f"Revision {number} not found")
+
+        itinerary = revisions[0].snapshot
+        for revision in revisions[1:]:
+            itinerary = apply_json_patch(itinerary, revision.patch)
+        return itinerary
+
+
+@event.listens_for(ItineraryRevision.__table__, "after_create")
+def create_revisions_cascade(target, connection, **kw):
+    """trips exists by now, as the table's foreign key orders it first."""
+    create_cascade_trigger(connection)
+
+
+@event.listens_for(ItineraryRevision.__table__, "before_drop")
+def drop_revisions_cascade(target, connection, **kw):
+    drop_cascade_trigger(connection)
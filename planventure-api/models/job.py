@@ -0,0 +1,37 @@
+from datetime import datetime
+from database import db
+
+
+class Job(db.Model):
+    """A background job and, once it finishes, its outcome.
+
+    Jobs move from "queued" to "running" and end as "succeeded", "failed"
+    or "cancelled". ``result`` holds a small JSON summary; jobs that produce
+    a file, such as exports, write it to ``output_file`` in the runner's
+    output directory instead.
+    """
+
+    __tablename__ = "jobs"
+    __table_args__ = (db.Index("ix_jobs_user_id_status", "user_id", "status"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    params = db.Column(db.JSON(none_as_null=True))
+    result = db.Column(db.JSON(none_as_null=True))
+    error = db.Column(db.Text)
+    # File name in JobRunner.output_dir(); exports can be large
+    output_file = db.Column(db.String(255))
+    output_type = db.Column(db.String(100))
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime, index=True)
+    # Refreshed by the process that owns the job while it is queued or running
+    heartbeat_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.kind} {self.status}>"
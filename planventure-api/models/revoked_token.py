@@ -0,0 +1,27 @@
+from datetime import datetime
+from database import db
+
+
+class RevokedToken(db.Model):
+    """A revoked JWT, or a user's logout-everywhere cutoff.
+
+    Rows with a ``jti`` revoke that one token. Rows without one revoke every
+    token the user was issued before ``revoked_at``. Either kind can be
+    purged once ``expires_at`` has passed, as the tokens it covers have
+    expired by then.
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    revoked_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, index=True
+    )
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken {self.jti or f'user {self.user_id}'}>"
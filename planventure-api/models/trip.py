@@ -1,10 +1,26 @@
-from datetime import datetime
+import json
+import logging
+from datetime import date, datetime
+from typing import Iterable, Optional
+from sqlalchemy import event
 from database import db
-from utils.itinerary import generate_itinerary_template
+from utils.geo import geohash_for
+from utils.itinerary import merge_itinerary
+from utils.json_provider import RawJSON
+from utils.search import create_search_index, drop_search_index
+from .itinerary_day import ItineraryDay
 
 
 class Trip(db.Model):
     __tablename__ = "trips"
+    __table_args__ = (
+        # Serves per-user listings ordered by date and keyset pagination
+        db.Index("ix_trips_user_id_start_date_id", "user_id", "start_date", "id"),
+        # Serves date-window overlap filters and upcoming trips (end_date >= x)
+        db.Index("ix_trips_user_id_end_date", "user_id", "end_date"),
+        # Prefix range scans on the geohash serve the nearby query
+        db.Index("ix_trips_user_id_geohash", "user_id", "geohash"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -13,7 +29,16 @@ class Trip(db.Model):
     end_date = db.Column(db.DateTime, nullable=False)
     latitude = db.Column(db.Float)
     longitude = db.Column(db.Float)
+    # Kept in sync with latitude/longitude by the before_insert/update events
+    geohash = db.Column(db.String(12))
     itinerary = db.Column(db.JSON)
+    # The itinerary as stored JSON text, for responses that embed it as is
+    itinerary_raw = db.column_property(db.cast(itinerary, db.Text), deferred=True)
+    # When set, itinerary days live in itinerary_days and the JSON column
+    # only holds the top-level fields (notes, estimated_budget, ...)
+    itinerary_normalized = db.Column(
+        db.Boolean, nullable=False, default=False, server_default=db.false()
+    )
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
@@ -32,55 +57,198 @@ class Trip(db.Model):
     def full_itinerary(self):
         """Returns itinerary with default template merged with custom data."""
         try:
-            default_template = generate_itinerary_template(
+            return merge_itinerary(
                 self.start_date.strftime("%Y-%m-%d"),
                 self.end_date.strftime("%Y-%m-%d"),
+                self.get_itinerary(),
             )
+        except Exception as e:
+            logging.error(f"Error generating full itinerary: {str(e)}")
+            return self.itinerary or {}
+
+    def _day_keys(self, days: Iterable[str]) -> list[date]:
+        keys = []
+        for day in days:
+            try:
+                keys.append(ItineraryDay.parse_key(day))
+            except ValueError:
+                continue
+        return keys
+
+    def get_itinerary(self, days: Optional[Iterable[str]] = None):
+        """Return the stored itinerary, optionally limited to some day keys."""
+        if not self.itinerary_normalized:
+            if days is None or not isinstance(self.itinerary, dict):
+                return self.itinerary
+            stored_days = self.itinerary.get("days") or {}
+            return {
+                **self.itinerary,
+                "days": {day: stored_days[day] for day in days if day in stored_days},
+            }
 
-            if not self.itinerary or not isinstance(self.itinerary, dict):
-                return default_template
+        query = ItineraryDay.query.filter_by(trip_id=self.id)
+        if days is not None:
+            keys = self._day_keys(days)
+            query = query.filter(ItineraryDay.date.in_(keys)) if keys else None
+        rows = query.order_by(ItineraryDay.date).all() if query is not None else []
+        return {
+            **(self.itinerary or {}),
+            "days": {row.date.isoformat(): row.data for row in rows},
+        }
 
-            # Deep merge stored data with template
-            result = default_template.copy()
+    def set_itinerary(self, itinerary, days: Optional[Iterable[str]] = None):
+        """Store an itinerary.
 
-            # Merge days
-            for date, stored_day in self.itinerary.get("days", {}).items():
-                if date in result["days"]:
-                    template_day = result["days"][date]
+        When ``days`` is given, ``itinerary["days"]`` only holds those days and
+        every other stored day is left alone. With normalized storage only the
+        day rows whose content changed are written.
+        """
+        if not self.itinerary_normalized:
+            if days is not None and isinstance(self.itinerary, dict):
+                merged = dict(self.itinerary.get("days") or {})
+                for day in days:
+                    if day in itinerary.get("days", {}):
+                        merged[day] = itinerary["days"][day]
+                    else:
+                        merged.pop(day, None)
+                itinerary = {**itinerary, "days": merged}
+            self.itinerary = itinerary
+            return
 
-                    # Merge activities
-                    template_day["activities"].extend(stored_day.get("activities", []))
+        if not isinstance(itinerary, dict) or not isinstance(
+            itinerary.get("days", {}), dict
+        ):
+            raise ValueError("Itinerary must be an object with a days object")
+        new_days = {
+            ItineraryDay.parse_key(day): data
+            for day, data in itinerary.get("days", {}).items()
+        }
+        meta = {key: value for key, value in itinerary.items() if key != "days"}
 
-                    # Merge meals
-                    for meal, details in stored_day.get("meals", {}).items():
-                        if meal in template_day["meals"]:
-                            template_day["meals"][meal].update(details)
+        if self.id is None:
+            db.session.add(self)
+            db.session.flush()
 
-                    # Merge accommodation
-                    template_day["accommodation"].update(
-                        stored_day.get("accommodation", {})
-                    )
+        query = ItineraryDay.query.filter_by(trip_id=self.id)
+        if days is not None:
+            query = query.filter(ItineraryDay.date.in_(self._day_keys(days)))
+        existing = {row.date: row for row in query}
 
-                    # Merge transportation
-                    template_day["transportation"].update(
-                        stored_day.get("transportation", {})
-                    )
+        changed = False
+        for day, data in new_days.items():
+            row = existing.pop(day, None)
+            if row is None:
+                db.session.add(ItineraryDay(trip_id=self.id, date=day, data=data))
+                changed = True
+            elif row.data != data:
+                row.data = data
+                changed = True
+        for row in existing.values():
+            db.session.delete(row)
+            changed = True
 
-                    # Merge notes
-                    if stored_day.get("notes"):
-                        template_day["notes"] = stored_day["notes"]
+        if meta != self.itinerary:
+            self.itinerary = meta
+        elif changed:
+            # Day rows changed without touching the trip row; bump the version
+            self.updated_at = datetime.utcnow()
 
-            # Merge top-level fields
-            result["notes"] = self.itinerary.get("notes", result["notes"])
-            result["estimated_budget"] = self.itinerary.get(
-                "estimated_budget", result["estimated_budget"]
+    def get_days(self, start: Optional[date] = None, end: Optional[date] = None):
+        """Return the stored days between start and end (inclusive)."""
+        if not self.itinerary_normalized:
+            stored_days = (self.itinerary or {}).get("days") or {}
+            low = start.isoformat() if start else ""
+            high = end.isoformat() if end else "\uffff"
+            return {
+                day: data
+                for day, data in sorted(stored_days.items())
+                if low <= day <= high
+            }
+
+        query = ItineraryDay.query.filter_by(trip_id=self.id)
+        if start:
+            query = query.filter(ItineraryDay.date >= start)
+        if end:
+            query = query.filter(ItineraryDay.date <= end)
+        return {
+            row.date.isoformat(): row.data for row in query.order_by(ItineraryDay.date)
+        }
+
+    @staticmethod
+    def load_itineraries(trips, raw: bool = False) -> dict:
+        """Return {trip id: itinerary}, loading normalized days in one query.
+
+        With ``raw``, the trips must have ``itinerary_raw`` loaded instead of
+        ``itinerary``, and JSON-stored itineraries are returned as RawJSON so
+        they are never decoded.
+        """
+        itineraries = {}
+        normalized = []
+        for trip in trips:
+            if raw:
+                text = trip.itinerary_raw
+                if not trip.itinerary_normalized:
+                    itineraries[trip.id] = RawJSON(text) if text is not None else None
+                    continue
+                # Only the small top-level fields live in the JSON column
+                meta = json.loads(text) if text is not None else None
+            else:
+                meta = trip.itinerary
+                if not trip.itinerary_normalized:
+                    itineraries[trip.id] = meta
+                    continue
+            itineraries[trip.id] = {**(meta or {}), "days": {}}
+            normalized.append(trip.id)
+        if normalized:
+            rows = (
+                ItineraryDay.query.filter(ItineraryDay.trip_id.in_(normalized))
+                .order_by(ItineraryDay.trip_id, ItineraryDay.date)
+                .all()
             )
-            result["overview"].update(self.itinerary.get("overview", {}))
+            for row in rows:
+                itineraries[row.trip_id]["days"][row.date.isoformat()] = row.data
+        return itineraries
 
-            return result
-        except Exception as e:
-            logging.error(f"Error generating full itinerary: {str(e)}")
-            return self.itinerary or {}
+    @staticmethod
+    def bulk_insert(user_id: int, rows: list, normalized: bool = False) -> list:
+        """Insert validated trip rows with executemany and return their ids.
+
+        ``rows`` are the values returned by ``validate_trip_data``. This skips
+        the ORM unit of work, so ORM events do not fire for these trips and the
+        geohash is computed here instead.
+        """
+        values = []
+        for row in rows:
+            itinerary = row["itinerary"]
+            if normalized:
+                itinerary = {k: v for k, v in itinerary.items() if k != "days"}
+            values.append(
+                {
+                    **row,
+                    "user_id": user_id,
+                    "itinerary": itinerary,
+                    "itinerary_normalized": normalized,
+                    "geohash": geohash_for(row["latitude"], row["longitude"]),
+                }
+            )
+        ids = (
+            db.session.execute(
+                db.insert(Trip).returning(Trip.id, sort_by_parameter_order=True),
+                values,
+            )
+            .scalars()
+            .all()
+        )
+
+        if normalized:
+            days = [
+                {"trip_id": trip_id, "date": ItineraryDay.parse_key(day), "data": data}
+                for trip_id, row in zip(ids, rows)
+                for day, data in (row["itinerary"].get("days") or {}).items()
+            ]
+            if days:
+                db.session.execute(db.insert(ItineraryDay), days)
+        return ids
 
     def update_from_dict(self, data: dict) -> tuple[bool, str]:
         """Update trip attributes from dictionary data."""
@@ -118,10 +286,39 @@ class Trip(db.Model):
                 self.longitude = data["longitude"]
 
             if "itinerary" in data:
-                self.itinerary = data["itinerary"]
+                self.set_itinerary(data["itinerary"])
 
             return True, "Success"
         except ValueError:
             return False, "Invalid date format. Use YYYY-MM-DD"
         except Exception as e:
             return False, str(e)
+
+
+@event.listens_for(Trip, "before_delete")
+def delete_itinerary_days(mapper, connection, target):
+    """Remove normalized itinerary days with their trip in one statement."""
+    if target.itinerary_normalized:
+        connection.execute(
+            ItineraryDay.__table__.delete().where(
+                ItineraryDay.__table__.c.trip_id == target.id
+            )
+        )
+
+
+@event.listens_for(Trip, "before_insert")
+@event.listens_for(Trip, "before_update")
+def update_geohash(mapper, connection, target):
+    """Recompute the geohash from the trip's coordinates."""
+    target.geohash = geohash_for(target.latitude, target.longitude)
+
+
+@event.listens_for(Trip.__table__, "after_create")
+def create_destination_search(target, connection, **kw):
+    """Create the destination search index along with the table."""
+    create_search_index(connection)
+
+
+@event.listens_for(Trip.__table__, "before_drop")
+def drop_destination_search(target, connection, **kw):
+    drop_search_index(connection)
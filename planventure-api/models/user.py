@@ -1,7 +1,9 @@
 from datetime import datetime
 from database import db
-from utils.auth import hash_password, verify_password
+from sqlalchemy import event
+from utils.auth import hash_password, password_needs_rehash, verify_password
 from utils.jwt import generate_tokens
+from utils.user_cache import user_cache
 
 
 class User(db.Model):
@@ -26,6 +28,10 @@ class User(db.Model):
         """Check if the provided password matches the hash."""
         return verify_password(password, self.password_hash)
 
+    def password_needs_rehash(self) -> bool:
+        """Check if the stored hash uses a different bcrypt work factor."""
+        return password_needs_rehash(self.password_hash)
+
     def get_tokens(self):
         """Generate access and refresh tokens for the user."""
         return generate_tokens(self.id)
@@ -34,3 +40,10 @@ class User(db.Model):
     def get_user_from_token(identity):
         """Get user instance from token identity."""
         return User.query.get(identity)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_cached_user(mapper, connection, target):
+    """Drop the cached identity whenever a user row changes."""
+    user_cache.invalidate(target.id)
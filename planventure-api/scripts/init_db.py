@@ -3,12 +3,17 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import app, db
+from app import create_app
+from database import db
+from alembic import command
+from alembic.config import Config
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+app = create_app()
+
 try:
     with app.app_context():
         db_path = app.config["SQLALCHEMY_DATABASE_URI"].replace("sqlite:///", "")
@@ -19,6 +24,18 @@ try:
         inspector = db.inspect(db.engine)
         tables = inspector.get_table_names()
         logger.info(f"Tables created: {tables}")
+
+        # Mark the fresh schema as current so later migrations apply cleanly
+        alembic_ini = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini"
+        )
+        alembic_config = Config(alembic_ini)
+        alembic_config.set_main_option(
+            "sqlalchemy.url",
+            app.config["SQLALCHEMY_DATABASE_URI"].replace("%", "%%"),
+        )
+        command.stamp(alembic_config, "head")
+        logger.info("Database stamped at the latest migration")
 except Exception as e:
     logger.error(f"Error creating database tables: {e}")
     sys.exit(1)
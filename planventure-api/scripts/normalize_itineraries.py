@@ -0,0 +1,88 @@
+"""Move trip itineraries between JSON and normalized (per-day) storage.
+
+Usage:
+    python scripts/normalize_itineraries.py [--batch-size 500] [--reverse]
+"""
+import argparse
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from database import db
+from models import ItineraryDay, Trip
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def normalize(trip: Trip) -> bool:
+    """Move one trip's days into itinerary_days. Returns False if skipped."""
+    itinerary = trip.itinerary
+    if itinerary is not None and not isinstance(itinerary, dict):
+        return False
+    days = (itinerary or {}).get("days") or {}
+    try:
+        for day in days:
+            ItineraryDay.parse_key(day)
+    except ValueError:
+        return False
+    trip.itinerary_normalized = True
+    trip.itinerary = None
+    trip.set_itinerary(itinerary or {"days": {}})
+    return True
+
+
+def denormalize(trip: Trip) -> bool:
+    """Fold one trip's itinerary_days back into the JSON column."""
+    itinerary = trip.get_itinerary()
+    ItineraryDay.query.filter_by(trip_id=trip.id).delete()
+    trip.itinerary_normalized = False
+    trip.itinerary = itinerary
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--reverse", action="store_true", help="Move days back into the JSON column"
+    )
+    args = parser.parse_args()
+
+    convert = denormalize if args.reverse else normalize
+    moved = skipped = 0
+    last_id = 0
+    while True:
+        batch = (
+            Trip.query.filter(
+                Trip.id > last_id, Trip.itinerary_normalized.is_(args.reverse)
+            )
+            .order_by(Trip.id)
+            .limit(args.batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        for trip in batch:
+            if convert(trip):
+                moved += 1
+            else:
+                skipped += 1
+                logger.warning(f"Skipped trip {trip.id}: itinerary days are not dates")
+        last_id = batch[-1].id
+        db.session.commit()
+        logger.info(f"Converted {moved} trips so far")
+
+    logger.info(f"Done: converted {moved} trips, skipped {skipped}")
+
+
+if __name__ == "__main__":
+    try:
+        with create_app().app_context():
+            main()
+    except Exception as e:
+        logger.error(f"Error converting itineraries: {e}")
+        sys.exit(1)
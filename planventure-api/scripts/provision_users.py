@@ -0,0 +1,196 @@
+"""Create many user accounts at once from a CSV or NDJSON file.
+
+CSV files need a header row with ``email`` and ``password`` columns; NDJSON
+files hold one ``{"email": ..., "password": ...}`` object per line. Rows are
+validated like /auth/register, emails that already exist are skipped, and
+passwords are hashed on a process pool using every core.
+
+Usage:
+    python scripts/provision_users.py users.csv [--format csv|ndjson]
+        [--batch-size 1000] [--workers N] [--dry-run]
+"""
+import argparse
+import csv
+import itertools
+import json
+import sys
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from database import db
+from models import User
+from sqlalchemy.exc import IntegrityError
+from utils.auth import hasher
+from utils.validation import validate_email, validate_password
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def hash_password(args: tuple) -> str:
+    """Hash one password; runs in a worker process."""
+    import bcrypt
+
+    password, rounds = args
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode(
+        "utf-8"
+    )
+
+
+def read_rows(f, fmt: str):
+    """Yield (line number, row dict or None) from a CSV or NDJSON file."""
+    if fmt == "csv":
+        # Line 1 is the header
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            yield line, row
+        return
+    for line, text in enumerate(f, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = None
+        yield line, row if isinstance(row, dict) else None
+
+
+def validate_rows(rows, errors: list):
+    """Yield (email, password) for valid rows; record the others in ``errors``."""
+    seen = set()
+    for line, row in rows:
+        if row is None:
+            errors.append((line, "Invalid row"))
+            continue
+        email = row.get("email") or ""
+        password = row.get("password") or ""
+        # NDJSON fields may hold any JSON type
+        if not isinstance(email, str) or not isinstance(password, str):
+            errors.append((line, "Invalid row"))
+            continue
+        email = email.lower().strip()
+        if not validate_email(email):
+            errors.append((line, "Invalid email format"))
+            continue
+        is_valid, message = validate_password(password)
+        if not is_valid:
+            errors.append((line, message))
+            continue
+        if email in seen:
+            errors.append((line, "Duplicate email in file"))
+            continue
+        seen.add(email)
+        yield email, password
+
+
+def existing_emails(emails: list) -> set:
+    return set(db.session.scalars(db.select(User.email).where(User.email.in_(emails))))
+
+
+def insert_users(users: list) -> int:
+    """Insert (email, password hash) pairs; returns how many were inserted.
+
+    Emails registered since the existence check are dropped and the batch
+    is retried, so a concurrent signup does not abort the import.
+    """
+    now = datetime.utcnow()
+    while users:
+        try:
+            db.session.execute(
+                db.insert(User),
+                [
+                    {
+                        "email": email,
+                        "password_hash": password_hash,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for email, password_hash in users
+                ],
+            )
+            db.session.commit()
+            return len(users)
+        except IntegrityError:
+            db.session.rollback()
+            taken = existing_emails([email for email, _ in users])
+            if not taken:
+                raise
+            users = [user for user in users if user[0] not in taken]
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="CSV or NDJSON file, or - for stdin")
+    parser.add_argument("--format", choices=("csv", "ndjson"))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Hashing processes (default: cores)"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Validate and check for existing users"
+    )
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    workers = args.workers or os.cpu_count() or 1
+    errors = []
+    created = skipped = 0
+    started = time.perf_counter()
+
+    f = sys.stdin if args.path == "-" else open(args.path, newline="")
+    try:
+        rows = validate_rows(read_rows(f, fmt), errors)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            while True:
+                batch = list(itertools.islice(rows, args.batch_size))
+                if not batch:
+                    break
+                taken = existing_emails([email for email, _ in batch])
+                skipped += len(taken)
+                batch = [user for user in batch if user[0] not in taken]
+                if args.dry_run:
+                    created += len(batch)
+                    continue
+                if not batch:
+                    continue
+
+                hashes = pool.map(
+                    hash_password,
+                    [(password, hasher.rounds) for _, password in batch],
+                    chunksize=max(1, len(batch) // (4 * workers)),
+                )
+                created += insert_users(
+                    [(email, h) for (email, _), h in zip(batch, hashes)]
+                )
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    f"Created {created} users ({created / elapsed:.0f}/s), "
+                    f"skipped {skipped} existing, {len(errors)} invalid"
+                )
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+    for line, message in errors:
+        logger.warning(f"Line {line}: {message}")
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Done in {elapsed:.1f}s: {'would create' if args.dry_run else 'created'} "
+        f"{created} users, "
+        f"skipped {skipped} existing, {len(errors)} invalid"
+    )
+
+
+if __name__ == "__main__":
+    try:
+        with create_app().app_context():
+            main()
+    except Exception as e:
+        logger.error(f"Error provisioning users: {e}")
+        sys.exit(1)
@@ -1,29 +1,44 @@
 import os
 import sys
+import tempfile
 import pytest
 
 # Add project root to Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from app import app as flask_app
-from database import db
+# Use the cheapest bcrypt work factor to keep the suite fast
+os.environ.setdefault("BCRYPT_LOG_ROUNDS", "4")
+
+from app import create_app
+from database import db, replica_router
+from utils.metrics import metrics
+from utils.rate_limit import login_throttle
+from utils.revocation import denylist
+from utils.user_cache import user_cache
+
+flask_app = create_app(
+    {
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "JWT_SECRET_KEY": "test-secret-key",
+        "JOBS_EAGER": True,
+        "JOBS_OUTPUT_DIR": tempfile.mkdtemp(prefix="planventure-jobs-"),
+    }
+)
 
 
 @pytest.fixture
 def app():
-    flask_app.config.update(
-        {
-            "TESTING": True,
-            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
-            "JWT_SECRET_KEY": "test-secret-key",
-        }
-    )
-
     with flask_app.app_context():
         db.create_all()
         yield flask_app
         db.session.remove()
         db.drop_all()
+        user_cache.clear()
+        metrics.reset()
+        login_throttle.reset()
+        denylist.clear()
+        replica_router.reset()
 
 
 @pytest.fixture
@@ -39,3 +54,40 @@ def auth_headers(client):
     )
     tokens = response.get_json()
     return {"Authorization": f'Bearer {tokens["access_token"]}'}
+
+
+@pytest.fixture(params=["json", "normalized"])
+def storage(app, request):
+    """Run the test once per itinerary storage layout."""
+    app.config["ITINERARY_STORAGE"] = request.param
+    yield request.param
+    app.config["ITINERARY_STORAGE"] = "json"
+
+
+@pytest.fixture
+def create_trip(client, auth_headers):
+    """Factory that creates a trip through the API and returns its id.
+
+    Trips belong to the ``auth_headers`` user unless ``headers`` says
+    otherwise; ``coordinates`` is a (latitude, longitude) pair.
+    """
+
+    def create(
+        destination="Lisbon",
+        start_date="2024-01-01",
+        end_date="2024-01-03",
+        coordinates=None,
+        headers=None,
+    ):
+        data = {
+            "destination": destination,
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+        if coordinates is not None:
+            data["latitude"], data["longitude"] = coordinates
+        response = client.post("/api/trips", json=data, headers=headers or auth_headers)
+        assert response.status_code == 201
+        return response.get_json()["id"]
+
+    return create
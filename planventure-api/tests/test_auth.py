@@ -19,3 +19,157 @@ def test_login(client):
     )
     assert response.status_code == 200
     assert "access_token" in response.get_json()
+
+
+def test_login_rehashes_outdated_password_hash(client):
+    from models import User
+    from utils.auth import hasher
+
+    client.post(
+        "/auth/register",
+        json={"email": "rehash@example.com", "password": "SecurePass123"},
+    )
+    old_rounds = hasher.rounds
+    hasher.rounds = old_rounds + 1
+    try:
+        response = client.post(
+            "/auth/login",
+            json={"email": "rehash@example.com", "password": "SecurePass123"},
+        )
+        assert response.status_code == 200
+        user = User.query.filter_by(email="rehash@example.com").first()
+        assert not user.password_needs_rehash()
+    finally:
+        hasher.rounds = old_rounds
+
+
+def test_login_returns_503_when_hasher_saturated(client, monkeypatch):
+    from utils.auth import HasherBusyError, hasher
+
+    client.post(
+        "/auth/register",
+        json={"email": "busy@example.com", "password": "SecurePass123"},
+    )
+
+    def busy(*args):
+        raise HasherBusyError("Password hashing queue is full")
+
+    monkeypatch.setattr(hasher, "_run", busy)
+    response = client.post(
+        "/auth/login", json={"email": "busy@example.com", "password": "SecurePass123"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_throttled_per_email_before_lookup(client, monkeypatch):
+    from utils.auth import hasher
+
+    client.post(
+        "/auth/register",
+        json={"email": "target@example.com", "password": "SecurePass123"},
+    )
+    for _ in range(5):
+        response = client.post(
+            "/auth/login", json={"email": "target@example.com", "password": "wrong"}
+        )
+        assert response.status_code == 401
+
+    def unexpected(*args):
+        raise AssertionError("throttled logins must not reach bcrypt")
+
+    monkeypatch.setattr(hasher, "_run", unexpected)
+    response = client.post(
+        "/auth/login", json={"email": "Target@example.com", "password": "wrong"}
+    )
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) == 30
+
+    # Other accounts are unaffected until the address itself runs dry
+    response = client.post(
+        "/auth/login", json={"email": "other@example.com", "password": "wrong"}
+    )
+    assert response.status_code == 401
+
+
+def test_login_throttled_per_ip(client):
+    statuses = [
+        client.post(
+            "/auth/login",
+            json={"email": f"spray{index}@example.com", "password": "wrong"},
+        ).status_code
+        for index in range(21)
+    ]
+    assert statuses == [401] * 20 + [429]
+
+    # A different client address has its own bucket
+    response = client.post(
+        "/auth/login",
+        json={"email": "spray0@example.com", "password": "wrong"},
+        environ_base={"REMOTE_ADDR": "10.0.0.2"},
+    )
+    assert response.status_code == 401
+
+
+def test_login_throttle_uses_forwarded_address_behind_trusted_proxy(app):
+    from app import create_app
+    from database import db
+
+    proxied = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "JWT_SECRET_KEY": "test-secret-key",
+            "TRUSTED_PROXY_COUNT": 1,
+        }
+    )
+    with proxied.app_context():
+        db.create_all()
+        client = proxied.test_client()
+
+        emails = (f"spray{index}@example.com" for index in range(100))
+
+        def login(forwarded_for):
+            return client.post(
+                "/auth/login",
+                json={"email": next(emails), "password": "wrong"},
+                headers={"X-Forwarded-For": forwarded_for},
+                environ_base={"REMOTE_ADDR": "10.0.0.1"},
+            ).status_code
+
+        assert [login("203.0.113.5") for _ in range(21)][-1] == 429
+        # Same proxy, another client behind it
+        assert login("203.0.113.6") == 401
+        # Only the last hop is trusted; a client cannot forge an earlier one
+        assert login("198.51.100.1, 203.0.113.5") == 429
+
+
+def test_forwarded_address_ignored_without_trusted_proxy(client):
+    statuses = [
+        client.post(
+            "/auth/login",
+            json={"email": f"spray{index}@example.com", "password": "wrong"},
+            headers={"X-Forwarded-For": f"203.0.113.{index}"},
+        ).status_code
+        for index in range(21)
+    ]
+    assert statuses[-1] == 429
+
+
+def test_memory_backend_refills_and_expires(monkeypatch):
+    from utils import rate_limit
+
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    backend = rate_limit.MemoryBackend(shards=1)
+
+    assert [backend.take("a", 2, 1.0) for _ in range(3)] == [0, 0, 1.0]
+    now[0] += 0.5
+    assert backend.take("a", 2, 1.0) == 0.5
+    now[0] += 1
+    assert backend.take("a", 2, 1.0) == 0
+
+    # Once "a" has refilled, the next hit on any key drops it
+    now[0] += 10
+    backend.take("b", 2, 1.0)
+    assert len(backend) == 1
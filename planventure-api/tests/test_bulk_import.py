@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from models import ItineraryDay, Trip
+
+
+def trip(index, **overrides):
+    return {
+        "destination": f"City {index}",
+        "start_date": "2024-01-01",
+        "end_date": "2024-01-03",
+        **overrides,
+    }
+
+
+@pytest.mark.parametrize("storage", ["json", "normalized"])
+def test_bulk_import_json_array_reports_bad_rows(app, client, auth_headers, storage):
+    app.config["ITINERARY_STORAGE"] = storage
+    app.config["TRIPS_BULK_CHUNK_SIZE"] = 2
+    try:
+        rows = [trip(i) for i in range(5)]
+        rows.insert(2, trip(99, start_date="2024-02-30"))
+        rows.append({"destination": "Nowhere"})
+
+        response = client.post("/api/trips/bulk", json=rows, headers=auth_headers)
+    finally:
+        app.config["ITINERARY_STORAGE"] = "json"
+        app.config["TRIPS_BULK_CHUNK_SIZE"] = 1000
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["created"] == 5
+    assert [error["row"] for error in body["errors"]] == [2, 6]
+    assert body["errors"][1]["missing_fields"] == ["start_date", "end_date"]
+    assert Trip.query.count() == 5
+
+    listed = client.get("/api/trips", headers=auth_headers).get_json()
+    assert len(listed[0]["itinerary"]["days"]) == 3
+    if storage == "normalized":
+        assert ItineraryDay.query.count() == 15
+
+
+def test_bulk_import_ndjson_stream(client, auth_headers):
+    body = "\n".join([json.dumps(trip(1)), "{not json", json.dumps(trip(2))])
+    response = client.post(
+        "/api/trips/bulk",
+        data=body,
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 201
+    assert response.get_json()["created"] == 2
+    assert response.get_json()["errors"] == [{"row": 1, "message": "Invalid JSON"}]
+
+
+def test_bulk_import_rejects_oversized_batches(app, client, auth_headers):
+    app.config["TRIPS_BULK_MAX_ROWS"] = 2
+    try:
+        response = client.post(
+            "/api/trips/bulk", json=[trip(i) for i in range(3)], headers=auth_headers
+        )
+    finally:
+        app.config["TRIPS_BULK_MAX_ROWS"] = 250000
+    assert response.status_code == 413
+    assert Trip.query.count() == 0
@@ -0,0 +1,129 @@
+import gzip
+import json
+import zlib
+
+
+def _create_trips(client, auth_headers, count=5, days=10):
+    itinerary = {
+        "days": {
+            f"2024-01-{day:02d}": {"notes": "Museum, market and a long dinner"}
+            for day in range(1, days + 1)
+        }
+    }
+    for index in range(count):
+        client.post(
+            "/api/trips",
+            json={
+                "destination": f"City {index}",
+                "start_date": "2024-01-01",
+                "end_date": f"2024-01-{days:02d}",
+                "itinerary": itinerary,
+            },
+            headers=auth_headers,
+        )
+
+
+def test_large_list_is_gzipped(client, auth_headers):
+    _create_trips(client, auth_headers)
+    plain = client.get("/api/trips", headers=auth_headers)
+    response = client.get(
+        "/api/trips", headers={**auth_headers, "Accept-Encoding": "gzip, deflate"}
+    )
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) < len(plain.data)
+    assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+    assert response.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+
+    # The suffixed ETag still revalidates
+    cached = client.get(
+        "/api/trips",
+        headers={
+            **auth_headers,
+            "Accept-Encoding": "gzip",
+            "If-None-Match": response.headers["ETag"],
+        },
+    )
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == response.headers["ETag"]
+
+
+def test_small_responses_and_unaccepted_encodings_are_plain(client, auth_headers):
+    response = client.get(
+        "/api/trips", headers={**auth_headers, "Accept-Encoding": "gzip"}
+    )
+    assert "Content-Encoding" not in response.headers
+
+    _create_trips(client, auth_headers)
+    response = client.get(
+        "/api/trips", headers={**auth_headers, "Accept-Encoding": "br"}
+    )
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json()
+
+
+def test_deflate_and_streamed_export(client, auth_headers):
+    _create_trips(client, auth_headers)
+    response = client.get(
+        "/api/trips/export?format=ndjson",
+        headers={**auth_headers, "Accept-Encoding": "deflate"},
+    )
+
+    assert response.headers["Content-Encoding"] == "deflate"
+    assert "Content-Length" not in response.headers
+    lines = zlib.decompress(response.data).decode("utf-8").splitlines()
+    assert [json.loads(line)["destination"] for line in lines] == [
+        f"City {index}" for index in range(5)
+    ]
+
+
+def test_gzipped_request_body(client, auth_headers):
+    _create_trips(client, auth_headers, count=1)
+    trip_id = client.get("/api/trips", headers=auth_headers).get_json()[0]["id"]
+    itinerary = {"days": {"2024-01-01": {"notes": "Louvre " * 500}}}
+
+    response = client.put(
+        f"/api/trips/{trip_id}",
+        data=gzip.compress(json.dumps({"itinerary": itinerary}).encode("utf-8")),
+        headers={
+            **auth_headers,
+            "Content-Type": "application/json",
+            "Content-Encoding": "gzip",
+        },
+    )
+
+    assert response.status_code == 200
+    trip = client.get(f"/api/trips/{trip_id}", headers=auth_headers).get_json()
+    assert trip["itinerary"] == itinerary
+
+
+def test_bad_request_bodies(app, client, auth_headers):
+    headers = {**auth_headers, "Content-Type": "application/x-ndjson"}
+    row = {"destination": "Paris", "start_date": "2024-01-01", "end_date": "2024-01-02"}
+    body = "\n".join(json.dumps(row) for _ in range(200)).encode("utf-8")
+
+    extension = app.extensions["compression"]
+    limit, extension.max_request_size = extension.max_request_size, 1024
+    try:
+        too_large = client.post(
+            "/api/trips/bulk",
+            data=gzip.compress(body),
+            headers={**headers, "Content-Encoding": "gzip"},
+        )
+    finally:
+        extension.max_request_size = limit
+    corrupt = client.post(
+        "/api/trips/bulk",
+        data=b"not gzip at all",
+        headers={**headers, "Content-Encoding": "gzip"},
+    )
+    unsupported = client.post(
+        "/api/trips/bulk", data=body, headers={**headers, "Content-Encoding": "br"}
+    )
+
+    assert too_large.status_code == 413
+    assert corrupt.status_code == 400
+    assert unsupported.status_code == 415
+    assert "gzip" in unsupported.headers["Accept-Encoding"]
+    assert client.get("/api/trips", headers=auth_headers).get_json() == []
@@ -0,0 +1,43 @@
+from sqlalchemy import text
+
+from app import create_app
+from database import TimedQueuePool, db
+
+
+def test_sqlite_file_engine_uses_wal_and_timed_pool(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'wal.db'}",
+            "JWT_SECRET_KEY": "test-secret-key",
+            "SQLITE_BUSY_TIMEOUT_MS": 1234,
+        }
+    )
+    with app.app_context():
+        assert isinstance(db.engine.pool, TimedQueuePool)
+        with db.engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+
+        response = app.test_client().get("/health/db")
+        engine = response.get_json()["engines"]["default"]
+        assert engine["pool"] == "TimedQueuePool"
+        assert engine["checkout_wait"]["count"] >= 1
+        db.engine.dispose()
+
+
+def test_postgres_engine_options():
+    from database import engine_options
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"})
+    config = {
+        **app.config,
+        "SQLALCHEMY_DATABASE_URI": "postgresql+psycopg2://user@localhost/planventure",
+        "DB_POOL_SIZE": 20,
+    }
+    options = engine_options(config)
+    assert options["poolclass"] is TimedQueuePool
+    assert options["pool_size"] == 20
+    assert options["pool_pre_ping"] is True
+    assert options["pool_recycle"] == 1800
@@ -0,0 +1,49 @@
+import csv
+import io
+import json
+
+import pytest
+
+
+@pytest.fixture
+def trips(app, client, auth_headers):
+    app.config["TRIPS_EXPORT_BATCH_SIZE"] = 2
+    client.post(
+        "/api/trips/bulk",
+        json=[
+            {
+                "destination": f"City {i}",
+                "start_date": f"2024-01-0{i}",
+                "end_date": f"2024-01-0{i}",
+            }
+            for i in range(1, 6)
+        ],
+        headers=auth_headers,
+    )
+    yield
+    app.config["TRIPS_EXPORT_BATCH_SIZE"] = 500
+
+
+def test_export_ndjson(client, auth_headers, trips):
+    response = client.get("/api/trips/export", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row["destination"] for row in rows] == [f"City {i}" for i in range(1, 6)]
+    assert rows[0]["start_date"] == "2024-01-01"
+    assert list(rows[0]["itinerary"]["days"]) == ["2024-01-01"]
+
+
+def test_export_csv(client, auth_headers, trips):
+    response = client.get("/api/trips/export?format=csv", headers=auth_headers)
+    assert response.status_code == 200
+    assert "attachment" in response.headers["Content-Disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 5
+    assert rows[4]["destination"] == "City 5"
+    assert "itinerary" not in rows[0]
+
+
+def test_export_rejects_unknown_format(client, auth_headers):
+    response = client.get("/api/trips/export?format=xml", headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from models import Trip
+from utils.itinerary import generate_itinerary_template, merge_itinerary
+
+
+def test_template_copies_are_independent():
+    first = generate_itinerary_template("2024-01-01", "2024-01-03")
+    first["days"]["2024-01-01"]["activities"].append("Louvre")
+    first["days"]["2024-01-01"]["meals"]["lunch"] = "Cafe"
+
+    second = generate_itinerary_template("2024-01-01", "2024-01-03")
+    assert list(second["days"]) == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert second["days"]["2024-01-01"]["activities"] == []
+    assert second["days"]["2024-01-01"]["meals"]["lunch"] == ""
+
+
+def test_template_rejects_invalid_dates():
+    assert generate_itinerary_template("2024-13-01", "2024-13-02") is None
+
+
+def test_merge_overlays_stored_days_without_mutating_them():
+    stored = {
+        "days": {
+            "2024-01-02": {
+                "activities": [{"name": "Museum"}],
+                "meals": {"dinner": "Bistro"},
+                "accommodation": "Hotel",
+            }
+        },
+        "notes": "Pack light",
+    }
+    merged = merge_itinerary("2024-01-01", "2024-01-03", stored)
+
+    day = merged["days"]["2024-01-02"]
+    assert day["activities"] == [{"name": "Museum"}]
+    assert day["meals"] == {"breakfast": "", "lunch": "", "dinner": "Bistro"}
+    assert day["accommodation"] == "Hotel"
+    assert merged["notes"] == "Pack light"
+
+    day["activities"][0]["name"] = "Changed"
+    assert stored["days"]["2024-01-02"]["activities"][0]["name"] == "Museum"
+
+
+def test_trip_full_itinerary():
+    trip = Trip(
+        destination="Paris",
+        start_date=datetime(2024, 1, 1),
+        end_date=datetime(2024, 1, 2),
+        itinerary={"days": {"2024-01-01": {"notes": "Arrive"}}},
+    )
+    assert trip.full_itinerary["days"]["2024-01-01"]["notes"] == "Arrive"
+    assert trip.full_itinerary["days"]["2024-01-02"]["notes"] == ""
@@ -0,0 +1,76 @@
+import pytest
+
+from models import ItineraryDay
+
+
+@pytest.fixture
+def trip_id(create_trip, storage):
+    return create_trip("Vienna", "2024-08-01", "2024-08-10")
+
+
+def test_get_trip_returns_full_itinerary(client, auth_headers, trip_id, storage):
+    itinerary = client.get(f"/api/trips/{trip_id}", headers=auth_headers).get_json()[
+        "itinerary"
+    ]
+    assert len(itinerary["days"]) == 10
+    assert itinerary["notes"] == ""
+    if storage == "normalized":
+        assert ItineraryDay.query.filter_by(trip_id=trip_id).count() == 10
+
+
+def test_get_days_range(client, auth_headers, trip_id):
+    response = client.get(
+        f"/api/trips/{trip_id}/days?from=2024-08-03&to=2024-08-05",
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert list(response.get_json()["days"]) == [
+        "2024-08-03",
+        "2024-08-04",
+        "2024-08-05",
+    ]
+
+    response = client.get(f"/api/trips/{trip_id}/days?from=08/03", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_patch_and_list_with_either_storage(client, auth_headers, trip_id):
+    response = client.patch(
+        f"/api/trips/{trip_id}/itinerary",
+        json={"days": {"2024-08-02": {"notes": "Opera"}}, "notes": "Waltz"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+
+    trip = client.get("/api/trips", headers=auth_headers).get_json()[0]
+    assert trip["itinerary"]["notes"] == "Waltz"
+    assert trip["itinerary"]["days"]["2024-08-02"]["notes"] == "Opera"
+    assert trip["itinerary"]["days"]["2024-08-03"]["notes"] == ""
+
+
+def test_normalized_day_changes_bump_version(client, auth_headers, app):
+    app.config["ITINERARY_STORAGE"] = "normalized"
+    trip_id = client.post(
+        "/api/trips",
+        json={
+            "destination": "Graz",
+            "start_date": "2024-09-01",
+            "end_date": "2024-09-02",
+        },
+        headers=auth_headers,
+    ).get_json()["id"]
+    app.config["ITINERARY_STORAGE"] = "json"
+
+    etag = client.get(f"/api/trips/{trip_id}", headers=auth_headers).headers["ETag"]
+    client.patch(
+        f"/api/trips/{trip_id}/itinerary",
+        json={"days": {"2024-09-02": {"notes": "Castle"}}},
+        headers=auth_headers,
+    )
+    response = client.get(
+        f"/api/trips/{trip_id}", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+    client.delete(f"/api/trips/{trip_id}", headers=auth_headers)
+    assert ItineraryDay.query.filter_by(trip_id=trip_id).count() == 0
@@ -0,0 +1,130 @@
+import pytest
+
+from utils.patch import (
+    PatchError,
+    apply_json_patch,
+    apply_merge_patch,
+    make_json_patch,
+)
+
+
+@pytest.fixture
+def trip_id(client, auth_headers):
+    response = client.post(
+        "/api/trips",
+        json={
+            "destination": "Kyoto",
+            "start_date": "2024-03-01",
+            "end_date": "2024-03-05",
+        },
+        headers=auth_headers,
+    )
+    return response.get_json()["id"]
+
+
+def test_merge_patch_updates_only_given_days(client, auth_headers, trip_id):
+    response = client.patch(
+        f"/api/trips/{trip_id}/itinerary",
+        json={
+            "days": {"2024-03-02": {"notes": "Temples", "meals": {"lunch": "Ramen"}}}
+        },
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    days = response.get_json()["days"]
+    assert list(days) == ["2024-03-02"]
+    assert days["2024-03-02"]["notes"] == "Temples"
+    assert days["2024-03-02"]["meals"] == {
+        "breakfast": "",
+        "lunch": "Ramen",
+        "dinner": "",
+    }
+
+    itinerary = client.get(f"/api/trips/{trip_id}", headers=auth_headers).get_json()[
+        "itinerary"
+    ]
+    assert itinerary["days"]["2024-03-02"]["notes"] == "Temples"
+    assert itinerary["days"]["2024-03-03"]["notes"] == ""
+
+
+def test_json_patch_appends_activity(client, auth_headers, trip_id):
+    response = client.patch(
+        f"/api/trips/{trip_id}/itinerary",
+        json=[
+            {
+                "op": "add",
+                "path": "/days/2024-03-04/activities/-",
+                "value": {"name": "Fushimi Inari"},
+            }
+        ],
+        headers={**auth_headers, "Content-Type": "application/json-patch+json"},
+    )
+    assert response.status_code == 200
+    assert response.get_json()["days"]["2024-03-04"]["activities"] == [
+        {"name": "Fushimi Inari"}
+    ]
+
+    response = client.patch(
+        f"/api/trips/{trip_id}/itinerary",
+        json=[{"op": "remove", "path": "/days/1999-01-01"}],
+        headers={**auth_headers, "Content-Type": "application/json-patch+json"},
+    )
+    assert response.status_code == 400
+
+
+def test_patch_rejects_stale_if_match(client, auth_headers, trip_id):
+    response = client.patch(
+        f"/api/trips/{trip_id}/itinerary",
+        json={"notes": "Updated"},
+        headers={**auth_headers, "If-Match": '"stale"'},
+    )
+    assert response.status_code == 412
+
+
+def test_json_patch_is_copy_on_write_and_atomic():
+    document = {"days": {"a": {"activities": []}, "b": {"activities": []}}}
+    patched = apply_json_patch(
+        document, [{"op": "add", "path": "/days/a/activities/-", "value": 1}]
+    )
+    assert patched["days"]["a"]["activities"] == [1]
+    assert document["days"]["a"]["activities"] == []
+    assert patched["days"]["b"] is document["days"]["b"]
+
+    with pytest.raises(PatchError):
+        apply_json_patch(
+            document,
+            [
+                {"op": "add", "path": "/days/a/activities/-", "value": 1},
+                {"op": "test", "path": "/days/a/activities", "value": []},
+            ],
+        )
+    assert document["days"]["a"]["activities"] == []
+
+
+def test_merge_patch_removes_null_members():
+    assert apply_merge_patch({"a": 1, "b": {"c": 2}}, {"a": None, "b": {"d": 3}}) == {
+        "b": {"c": 2, "d": 3}
+    }
+
+
+@pytest.mark.parametrize(
+    "source, target",
+    [
+        ({"a": [1, 2, 3], "b": {"c": 1}}, {"a": [1, 5], "b": {"c": 1, "d/e~": 2}}),
+        ({"a": [1]}, {"a": [1, {"x": 2}, 3], "z": None}),
+        ({"a": {"b": 1}}, {"a": [1]}),
+        (None, {"days": {}}),
+    ],
+)
+def test_make_json_patch_round_trips(source, target):
+    assert apply_json_patch(source, make_json_patch(source, target)) == target
+
+
+def test_make_json_patch_only_touches_changed_paths():
+    days = {
+        f"2024-01-{day:02d}": {"notes": "", "activities": []} for day in range(1, 29)
+    }
+    changed = {**days, "2024-01-02": {"notes": "", "activities": [{"name": "Zoo"}]}}
+    assert make_json_patch({"days": days}, {"days": changed}) == [
+        {"op": "add", "path": "/days/2024-01-02/activities/0", "value": {"name": "Zoo"}}
+    ]
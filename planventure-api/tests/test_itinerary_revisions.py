@@ -0,0 +1,117 @@
+import pytest
+
+from database import db
+from models import ItineraryRevision, Trip
+
+
+@pytest.fixture
+def trip_id(create_trip, storage):
+    return create_trip("Lisbon", "2024-05-01", "2024-05-03")
+
+
+def _itinerary(client, auth_headers, trip_id):
+    response = client.get(f"/api/trips/{trip_id}", headers=auth_headers)
+    return response.get_json()["itinerary"]
+
+
+def _set_notes(client, auth_headers, trip_id, notes):
+    return client.patch(
+        f"/api/trips/{trip_id}/itinerary",
+        json={"days": {"2024-05-02": {"notes": notes}}},
+        headers=auth_headers,
+    )
+
+
+def test_edits_are_listed_and_restorable(client, auth_headers, trip_id):
+    original = _itinerary(client, auth_headers, trip_id)
+    assert (
+        client.get(f"/api/trips/{trip_id}/revisions", headers=auth_headers).get_json()
+        == []
+    )
+
+    _set_notes(client, auth_headers, trip_id, "Tram 28")
+    edited = _itinerary(client, auth_headers, trip_id)
+    client.put(
+        f"/api/trips/{trip_id}",
+        json={"itinerary": {**edited, "notes": "Pack light"}},
+        headers=auth_headers,
+    )
+
+    revisions = client.get(
+        f"/api/trips/{trip_id}/revisions", headers=auth_headers
+    ).get_json()
+    assert [(r["number"], r["source"]) for r in revisions] == [
+        (3, "update"),
+        (2, "patch"),
+        (1, "original"),
+    ]
+    response = client.get(f"/api/trips/{trip_id}/revisions/2", headers=auth_headers)
+    assert response.get_json()["itinerary"] == edited
+
+    response = client.post(
+        f"/api/trips/{trip_id}/revisions/1/restore", headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.get_json()["revision"] == 4
+    assert _itinerary(client, auth_headers, trip_id) == original
+
+    response = client.get(f"/api/trips/{trip_id}/revisions/9", headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_diffs_with_periodic_snapshots(app, client, auth_headers, trip_id):
+    app.config["ITINERARY_SNAPSHOT_INTERVAL"] = 3
+    try:
+        expected = {1: _itinerary(client, auth_headers, trip_id)}
+        for number in range(2, 9):
+            _set_notes(client, auth_headers, trip_id, f"Edit {number}")
+            expected[number] = _itinerary(client, auth_headers, trip_id)
+    finally:
+        app.config["ITINERARY_SNAPSHOT_INTERVAL"] = 20
+
+    rows = ItineraryRevision.query.filter_by(trip_id=trip_id).order_by(
+        ItineraryRevision.number
+    )
+    assert [row.number for row in rows if row.patch is None] == [1, 4, 7]
+    # A diff holds the edit, not the document
+    assert rows[1].patch == [
+        {"op": "replace", "path": "/days/2024-05-02/notes", "value": "Edit 2"}
+    ]
+    for number, itinerary in expected.items():
+        assert ItineraryRevision.itinerary_at(trip_id, number) == itinerary
+
+
+def test_deleting_trip_deletes_history(client, auth_headers, trip_id):
+    _set_notes(client, auth_headers, trip_id, "Fado night")
+    client.delete(f"/api/trips/{trip_id}", headers=auth_headers)
+
+    assert db.session.get(Trip, trip_id) is None
+    assert ItineraryRevision.query.filter_by(trip_id=trip_id).count() == 0
+
+
+def test_bulk_trip_delete_deletes_history(client, auth_headers, trip_id):
+    _set_notes(client, auth_headers, trip_id, "Fado night")
+    db.session.execute(db.delete(Trip).where(Trip.id == trip_id))
+    db.session.commit()
+
+    assert ItineraryRevision.query.filter_by(trip_id=trip_id).count() == 0
+
+
+def test_concurrent_edits_conflict(client, auth_headers, trip_id, monkeypatch):
+    _set_notes(client, auth_headers, trip_id, "Tram 28")
+    before = _itinerary(client, auth_headers, trip_id)
+    # Another request numbered its revision from the same latest number
+    monkeypatch.setattr(ItineraryRevision, "latest_number", lambda trip_id: 1)
+
+    response = _set_notes(client, auth_headers, trip_id, "Fado night")
+    assert response.status_code == 409
+    response = client.put(
+        f"/api/trips/{trip_id}",
+        json={"itinerary": {**before, "notes": "Pack light"}},
+        headers=auth_headers,
+    )
+    assert response.status_code == 409
+
+    monkeypatch.undo()
+    assert _itinerary(client, auth_headers, trip_id) == before
+    assert ItineraryRevision.latest_number(trip_id) == 2
@@ -0,0 +1,271 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import db
+from models import ItineraryRevision, Job, Trip, User
+from utils.jobs import JobRunner, job_runner
+
+
+def enqueue(client, auth_headers, kind, **params):
+    return client.post(
+        "/api/jobs", json={"kind": kind, "params": params}, headers=auth_headers
+    )
+
+
+@pytest.fixture
+def queued(app, monkeypatch):
+    """Run jobs by hand: scheduled job ids are collected instead of started."""
+    submitted = []
+    monkeypatch.setitem(app.config, "JOBS_EAGER", False)
+    monkeypatch.setattr(
+        job_runner, "_submit", lambda app, job_id, user_id: submitted.append(job_id)
+    )
+    yield submitted
+    job_runner._owned.clear()
+    job_runner._running.clear()
+    job_runner._waiting.clear()
+
+
+def test_export_job(client, auth_headers, create_trip):
+    create_trip("Lisbon")
+    create_trip("Porto")
+
+    response = enqueue(client, auth_headers, "export", format="csv")
+    assert response.status_code == 202
+    job = response.get_json()
+    assert job["status"] == "succeeded"
+    assert job["has_output"]
+    assert response.headers["Location"] == f"/api/jobs/{job['id']}"
+
+    polled = client.get(f"/api/jobs/{job['id']}", headers=auth_headers).get_json()
+    assert polled["result"]["format"] == "csv"
+
+    output = client.get(f"/api/jobs/{job['id']}/output", headers=auth_headers)
+    assert output.mimetype == "text/csv"
+    exported = client.get("/api/trips/export?format=csv", headers=auth_headers)
+    assert output.get_data() == exported.get_data()
+    assert polled["result"]["size"] == len(exported.get_data())
+
+    path = job_runner.output_path(db.session.get(Job, job["id"]).output_file)
+    os.remove(path)
+    output = client.get(f"/api/jobs/{job['id']}/output", headers=auth_headers)
+    assert output.status_code == 410
+
+
+def test_failed_export_leaves_no_file(client, auth_headers, monkeypatch):
+    def broken_export(job):
+        with job.open_output("ndjson", "application/x-ndjson") as f:
+            f.write("{}\n")
+            raise RuntimeError("disk full")
+
+    monkeypatch.setitem(job_runner._handlers, "broken", broken_export)
+    job = enqueue(client, auth_headers, "broken").get_json()
+
+    assert job["status"] == "failed"
+    assert not job["has_output"]
+    prefix = f"job-{job['id']}-"
+    assert not any(
+        name.startswith(prefix) for name in os.listdir(job_runner.output_dir())
+    )
+
+
+def test_purge_removes_output_files(app, client, auth_headers, monkeypatch):
+    job = enqueue(client, auth_headers, "export").get_json()
+    path = job_runner.output_path(db.session.get(Job, job["id"]).output_file)
+    assert os.path.exists(path)
+
+    monkeypatch.setitem(app.config, "JOBS_RETENTION_HOURS", -1)
+    monkeypatch.setattr(job_runner, "_next_purge", 0.0)
+    enqueue(client, auth_headers, "export")
+
+    assert not os.path.exists(path)
+    assert Job.query.count() == 1
+
+
+def test_import_job(client, auth_headers):
+    rows = [
+        {"destination": "Rome", "start_date": "2024-01-01", "end_date": "2024-01-02"},
+        {"destination": "Nowhere"},
+    ]
+    job = enqueue(client, auth_headers, "import", trips=rows).get_json()
+
+    assert job["status"] == "succeeded"
+    assert job["result"]["created"] == 1
+    assert [error["row"] for error in job["result"]["errors"]] == [1]
+    assert Trip.query.count() == 1
+    assert not job["has_output"]
+
+
+def test_itinerary_job_refits_days(client, auth_headers, create_trip):
+    trip_id = create_trip()
+    client.put(
+        f"/api/trips/{trip_id}",
+        json={"start_date": "2024-01-02", "end_date": "2024-01-05"},
+        headers=auth_headers,
+    )
+
+    job = enqueue(client, auth_headers, "itinerary", trip_id=trip_id).get_json()
+
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"trip_id": trip_id, "days": 4}
+    days = db.session.get(Trip, trip_id).get_itinerary()["days"]
+    assert sorted(days) == ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+    assert ItineraryRevision.latest_number(trip_id) == 2
+
+
+def test_failed_job_and_validation(client, auth_headers):
+    job = enqueue(client, auth_headers, "itinerary", trip_id=999).get_json()
+    assert job["status"] == "failed"
+    assert "Trip not found" in job["error"]
+
+    assert enqueue(client, auth_headers, "reticulate").status_code == 400
+    response = client.post(
+        "/api/jobs", json={"kind": "export", "params": []}, headers=auth_headers
+    )
+    assert response.status_code == 400
+    assert client.get("/api/jobs/999", headers=auth_headers).status_code == 404
+
+
+def test_jobs_are_private(client, auth_headers):
+    job = enqueue(client, auth_headers, "export").get_json()
+    tokens = client.post(
+        "/auth/register",
+        json={"email": "other@example.com", "password": "OtherPass123"},
+    ).get_json()
+    other = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    assert client.get(f"/api/jobs/{job['id']}", headers=other).status_code == 404
+    assert client.delete(f"/api/jobs/{job['id']}", headers=other).status_code == 404
+
+
+def test_per_user_limits_and_queued_cancel(
+    app, client, auth_headers, queued, monkeypatch
+):
+    monkeypatch.setattr(job_runner, "max_running_per_user", 1)
+    monkeypatch.setitem(app.config, "JOBS_MAX_ACTIVE_PER_USER", 3)
+
+    ids = [enqueue(client, auth_headers, "export").get_json()["id"] for _ in range(3)]
+    assert queued == ids[:1]
+    assert job_runner.stats() == {"running": 1, "waiting": 2}
+    response = enqueue(client, auth_headers, "export")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"]
+
+    response = client.delete(f"/api/jobs/{ids[1]}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "cancelled"
+
+    # Each finished job hands its slot to the user's next one
+    user_id = db.session.get(Job, ids[0]).user_id
+    job_runner._run_scheduled(app, ids[0], user_id)
+    assert queued == ids[:2]
+    job_runner._run_scheduled(app, ids[1], user_id)
+    assert queued == ids
+    job_runner._run_scheduled(app, ids[2], user_id)
+    assert job_runner.stats() == {"running": 0, "waiting": 0}
+
+    db.session.expire_all()
+    statuses = [db.session.get(Job, job_id).status for job_id in ids]
+    assert statuses == ["succeeded", "cancelled", "succeeded"]
+    response = client.delete(f"/api/jobs/{ids[0]}", headers=auth_headers)
+    assert response.status_code == 409
+
+
+def test_cancelling_a_running_job_rolls_it_back(client, auth_headers, monkeypatch):
+    def slow_import(job):
+        db.session.add(Trip(user_id=job.user_id, destination="Half done"))
+        job_runner.cancel(job.id)
+        job.check_cancelled()
+
+    monkeypatch.setitem(job_runner._handlers, "slow", slow_import)
+    job = enqueue(client, auth_headers, "slow").get_json()
+
+    assert job["status"] == "cancelled"
+    assert Trip.query.count() == 0
+
+
+def test_cancellation_from_another_process_is_polled(client, auth_headers, monkeypatch):
+    def slow_export(job):
+        # DELETE /api/jobs/<id> handled by another worker process
+        db.session.execute(
+            db.update(Job).where(Job.id == job.id).values(cancel_requested=True)
+        )
+        job._next_poll = 0
+        job.check_cancelled()
+
+    monkeypatch.setitem(job_runner._handlers, "slow", slow_export)
+    job = enqueue(client, auth_headers, "slow").get_json()
+    assert job["status"] == "cancelled"
+
+
+def test_jobs_run_on_the_pool(app, client, auth_headers, queued, create_trip):
+    create_trip()
+    job_id = enqueue(client, auth_headers, "export").get_json()["id"]
+    user_id = db.session.get(Job, job_id).user_id
+
+    # Start the pool once the request is done with the shared test connection
+    JobRunner._submit(job_runner, app, job_id, user_id)
+    job_runner.shutdown(wait=True)
+
+    db.session.expire_all()
+    assert db.session.get(Job, job_id).status == "succeeded"
+    assert job_runner.stats() == {"running": 0, "waiting": 0}
+
+
+def _orphan(user_id, status, minutes_ago=10):
+    """A job left behind by a process that stopped."""
+    beat = datetime.utcnow() - timedelta(minutes=minutes_ago)
+    job = Job(user_id=user_id, kind="export", status=status, heartbeat_at=beat)
+    db.session.add(job)
+    db.session.commit()
+    return job.id
+
+
+def test_jobs_of_stopped_processes_are_reclaimed(
+    app, client, auth_headers, monkeypatch
+):
+    monkeypatch.setitem(app.config, "JOBS_MAX_ACTIVE_PER_USER", 2)
+    user_id = User.query.one().id
+    running = _orphan(user_id, "running")
+    queued = _orphan(user_id, "queued")
+
+    # Orphans do not use up the user's quota
+    assert enqueue(client, auth_headers, "export").status_code == 202
+
+    job = client.get(f"/api/jobs/{queued}", headers=auth_headers).get_json()
+    assert job["status"] == "failed"
+    assert job["error"] == job_runner.INTERRUPTED
+    assert job["finished_at"] is not None
+
+    # Cancelling a running orphan finishes it instead of waiting on its runner
+    response = client.delete(f"/api/jobs/{running}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "cancelled"
+
+
+def test_live_running_jobs_are_not_reclaimed(client, auth_headers):
+    user_id = User.query.one().id
+    running = _orphan(user_id, "running", minutes_ago=0)
+
+    job = client.get(f"/api/jobs/{running}", headers=auth_headers).get_json()
+    assert job["status"] == "running"
+    response = client.delete(f"/api/jobs/{running}", headers=auth_headers)
+    assert response.status_code == 202
+    assert response.get_json()["status"] == "running"
+
+
+def test_heartbeat_refreshes_owned_jobs(app, client, auth_headers, queued):
+    job_id = enqueue(client, auth_headers, "export").get_json()["id"]
+    stale = datetime.utcnow() - timedelta(minutes=10)
+    db.session.execute(
+        db.update(Job).where(Job.id == job_id).values(heartbeat_at=stale)
+    )
+    db.session.commit()
+
+    job_runner._beat(app)
+
+    db.session.expire_all()
+    assert db.session.get(Job, job_id).heartbeat_at > stale
+    assert job_runner.active_count(User.query.one().id) == 1
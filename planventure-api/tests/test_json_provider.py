@@ -0,0 +1,56 @@
+from datetime import date, datetime
+
+import pytest
+
+from utils.json_provider import OrjsonProvider, RawJSON, StdlibJSONProvider
+
+
+@pytest.fixture(params=[OrjsonProvider, StdlibJSONProvider])
+def provider(request, app):
+    original = app.json
+    app.json = request.param(app)
+    yield app.json
+    app.json = original
+
+
+def test_dates_and_raw_json(provider):
+    encoded = provider.dumps(
+        {
+            "day": date(2024, 1, 2),
+            "at": datetime(2024, 1, 2, 3, 4, 5),
+            "raw": RawJSON('{"days": {"2024-01-02": ["café"]}}'),
+            "forged": "@@raw-0000000000000000-0@@",
+        }
+    )
+    assert provider.loads(encoded) == {
+        "day": "2024-01-02",
+        "at": "2024-01-02T03:04:05",
+        "raw": {"days": {"2024-01-02": ["café"]}},
+        "forged": "@@raw-0000000000000000-0@@",
+    }
+
+
+def test_trip_responses_use_canonical_dates(provider, client, auth_headers):
+    itinerary = {"days": {"2024-01-01": {"notes": "à bientôt"}}, "notes": ""}
+    response = client.post(
+        "/api/trips",
+        json={
+            "destination": "Paris",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-01",
+            "itinerary": itinerary,
+        },
+        headers=auth_headers,
+    )
+    trip_id = response.get_json()["id"]
+
+    listed = client.get("/api/trips", headers=auth_headers).get_json()[0]
+    single = client.get(f"/api/trips/{trip_id}", headers=auth_headers).get_json()
+    updated = client.put(
+        f"/api/trips/{trip_id}", json={"destination": "Lyon"}, headers=auth_headers
+    ).get_json()["trip"]
+
+    for trip in (listed, single, updated):
+        assert trip["start_date"] == "2024-01-01"
+        assert trip["end_date"] == "2024-01-01"
+        assert trip["itinerary"] == itinerary
@@ -0,0 +1,63 @@
+import logging
+
+from flask import Response
+from sqlalchemy import text
+
+from database import db
+from utils.metrics import metrics
+
+
+def test_metrics_endpoint_reports_requests_and_queries(client, auth_headers):
+    client.post(
+        "/api/trips",
+        json={
+            "destination": "Paris",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-02",
+        },
+        headers=auth_headers,
+    )
+    client.get("/api/trips", headers=auth_headers)
+    client.get("/api/trips", headers=auth_headers)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert (
+        'planventure_http_requests_total{endpoint="trips.get_trips",'
+        'method="GET",status="200"} 2'
+    ) in body
+    assert (
+        'planventure_http_request_duration_seconds_count{endpoint="auth.register",'
+        'method="POST"} 1'
+    ) in body
+    assert 'planventure_db_queries_per_request_count{endpoint="trips.get_trips"} 2' in (
+        body
+    )
+    assert "planventure_user_cache_hits_total" in body
+
+
+def test_repeated_statements_are_flagged_as_n_plus_one(app, caplog):
+    with app.test_request_context("/api/trips"):
+        metrics._start_request()
+        for _ in range(metrics.n_plus_one_threshold):
+            db.session.execute(text("SELECT 1"))
+        with caplog.at_level(logging.WARNING, logger="utils.metrics"):
+            metrics._finish_request(Response())
+
+    assert "Possible N+1" in caplog.text
+    assert metrics.n_plus_one["trips.get_trips"] == 1
+
+
+def test_slow_queries_and_server_timing(app, client):
+    metrics.slow_query_ms, metrics.server_timing = 0.0, True
+    try:
+        response = client.get("/health")
+        with app.app_context():
+            db.session.execute(text("SELECT 1"))
+    finally:
+        metrics.slow_query_ms, metrics.server_timing = 100.0, False
+
+    assert response.headers["Server-Timing"].startswith('db;dur=0.000;desc="0 queries"')
+    assert metrics.slow_queries >= 1
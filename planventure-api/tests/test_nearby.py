@@ -0,0 +1,163 @@
+import math
+
+import pytest
+
+from database import db
+from models import Trip
+from utils.geo import (
+    EARTH_RADIUS_KM,
+    bounding_box,
+    covering_prefixes,
+    encode_geohash,
+    haversine_km,
+)
+
+PARIS = (48.8566, 2.3522)
+LONDON = (51.5074, -0.1278)
+NEW_YORK = (40.7128, -74.0060)
+
+
+def nearby(client, auth_headers, coordinates, radius_km):
+    latitude, longitude = coordinates
+    response = client.get(
+        f"/api/trips/nearby?lat={latitude}&lon={longitude}&radius_km={radius_km}",
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_geohash_and_distance():
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert haversine_km(*PARIS, *LONDON) == pytest.approx(343.5, abs=1)
+
+
+@pytest.mark.parametrize(
+    "center,radius_km",
+    [(PARIS, 1), (PARIS, 400), ((89.9, 0), 50), ((0, 179.99), 20), (PARIS, 20000)],
+)
+def test_covering_prefixes_contain_box_corners(center, radius_km):
+    min_lat, max_lat, min_lon, max_lon = bounding_box(*center, radius_km)
+    prefixes = covering_prefixes(min_lat, max_lat, min_lon, max_lon)
+    if not prefixes:
+        return
+    for lat in (min_lat, center[0], max_lat):
+        for lon in (min_lon, center[1], max_lon):
+            lon = (lon + 180.0) % 360.0 - 180.0
+            geohash = encode_geohash(lat, lon)
+            assert any(geohash.startswith(prefix) for prefix in prefixes)
+
+
+def test_nearby_sorted_by_distance(client, auth_headers, create_trip):
+    create_trip("New York", coordinates=NEW_YORK)
+    create_trip("London", coordinates=LONDON)
+    create_trip("Paris", coordinates=PARIS)
+    create_trip("Louvre", coordinates=(48.8606, 2.3376))
+    client.post(
+        "/api/trips",
+        json={
+            "destination": "Nowhere",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-01",
+        },
+        headers=auth_headers,
+    )
+
+    results = nearby(client, auth_headers, PARIS, 500)
+    assert [trip["destination"] for trip in results] == ["Paris", "Louvre", "London"]
+    assert results[0]["distance_km"] == 0
+    assert results[2]["distance_km"] == pytest.approx(343.5, abs=1)
+
+    assert [trip["destination"] for trip in nearby(client, auth_headers, PARIS, 5)] == [
+        "Paris",
+        "Louvre",
+    ]
+
+
+def destination_point(origin, distance_km, bearing_degrees):
+    """The point ``distance_km`` from ``origin`` along a great circle."""
+    lat, lon = map(math.radians, origin)
+    angle = distance_km / EARTH_RADIUS_KM
+    bearing = math.radians(bearing_degrees)
+    lat2 = math.asin(
+        math.sin(lat) * math.cos(angle)
+        + math.cos(lat) * math.sin(angle) * math.cos(bearing)
+    )
+    lon2 = lon + math.atan2(
+        math.sin(bearing) * math.sin(angle) * math.cos(lat),
+        math.cos(angle) - math.sin(lat) * math.sin(lat2),
+    )
+    return math.degrees(lat2), math.degrees(lon2)
+
+
+@pytest.mark.parametrize("center", [(10.0, 20.0), (60.0, 20.0), (-45.0, 179.5)])
+def test_nearby_includes_trips_just_inside_the_radius(
+    client, auth_headers, center, create_trip
+):
+    create_trip("North", coordinates=destination_point(center, 99.9, 0))
+    create_trip("East", coordinates=destination_point(center, 99.9, 90))
+    create_trip("Outside", coordinates=destination_point(center, 100.1, 45))
+
+    results = nearby(client, auth_headers, center, 100)
+    assert sorted(trip["destination"] for trip in results) == ["East", "North"]
+
+
+def test_nearby_edge_of_radius_due_north(client, auth_headers, create_trip):
+    # 99.94 km from the center; a box based on 111.32 km per degree missed it
+    create_trip("Edge", coordinates=(10.8988, 20.0))
+    assert len(nearby(client, auth_headers, (10.0, 20.0), 100)) == 1
+
+
+def test_nearby_across_antimeridian(client, auth_headers, create_trip):
+    create_trip("East", coordinates=(-17.0, 179.95))
+    create_trip("West", coordinates=(-17.0, -179.95))
+
+    results = nearby(client, auth_headers, (-17.0, 179.99), 20)
+    assert [trip["destination"] for trip in results] == ["East", "West"]
+
+
+def test_geohash_follows_updates_and_bulk_import(client, auth_headers, create_trip):
+    trip_id = create_trip("Paris", coordinates=PARIS)
+    client.put(
+        f"/api/trips/{trip_id}",
+        json={"latitude": LONDON[0], "longitude": LONDON[1]},
+        headers=auth_headers,
+    )
+    client.post(
+        "/api/trips/bulk",
+        json=[
+            {
+                "destination": "Bulk Paris",
+                "start_date": "2024-01-01",
+                "end_date": "2024-01-01",
+                "latitude": PARIS[0],
+                "longitude": PARIS[1],
+            }
+        ],
+        headers=auth_headers,
+    )
+
+    assert db.session.get(Trip, trip_id).geohash == encode_geohash(*LONDON)
+    assert [
+        trip["destination"] for trip in nearby(client, auth_headers, PARIS, 10)
+    ] == ["Bulk Paris"]
+
+
+def test_nearby_validates_parameters(client, auth_headers):
+    assert (
+        client.get("/api/trips/nearby?lat=1", headers=auth_headers).status_code == 400
+    )
+    assert (
+        client.get("/api/trips/nearby?lat=x&lon=1", headers=auth_headers).status_code
+        == 400
+    )
+    assert (
+        client.get("/api/trips/nearby?lat=91&lon=1", headers=auth_headers).status_code
+        == 400
+    )
+    assert (
+        client.get(
+            "/api/trips/nearby?lat=1&lon=1&radius_km=0", headers=auth_headers
+        ).status_code
+        == 400
+    )
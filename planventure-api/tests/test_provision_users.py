@@ -0,0 +1,116 @@
+import io
+import logging
+import sys
+
+import pytest
+
+from database import db
+from models import User
+from scripts import provision_users
+from utils.auth import hash_password
+
+
+def add_user(email):
+    user = User(email=email)
+    user.set_password("SecurePass123")
+    db.session.add(user)
+    db.session.commit()
+
+
+def run_main(monkeypatch, path, *args):
+    monkeypatch.setattr(
+        sys, "argv", ["provision_users.py", str(path), "--workers", "1", *args]
+    )
+    provision_users.main()
+
+
+@pytest.fixture
+def users_csv(tmp_path):
+    path = tmp_path / "users.csv"
+    path.write_text(
+        "email,password\n"
+        "new1@example.com,SecurePass123\n"
+        "Existing@Example.com,SecurePass123\n"
+        "new2@example.com,SecurePass123\n"
+        "NEW1@example.com,OtherPass123\n"
+        "not-an-email,SecurePass123\n"
+        "weak@example.com,short\n"
+    )
+    return path
+
+
+def test_validate_rows_reports_invalid_and_duplicate_rows():
+    rows = provision_users.read_rows(
+        io.StringIO(
+            '{"email": "a@example.com", "password": "SecurePass123"}\n'
+            "not json\n"
+            "\n"
+            '{"email": " A@EXAMPLE.COM ", "password": "SecurePass123"}\n'
+            '{"email": "b@example.com", "password": "short"}\n'
+            '{"email": 5, "password": "SecurePass123"}\n'
+            '{"email": "d@example.com", "password": 12345678}\n'
+            '{"email": "c@example.com", "password": "SecurePass123"}\n'
+        ),
+        "ndjson",
+    )
+    errors = []
+
+    valid = list(provision_users.validate_rows(rows, errors))
+
+    assert valid == [
+        ("a@example.com", "SecurePass123"),
+        ("c@example.com", "SecurePass123"),
+    ]
+    assert [line for line, _ in errors] == [2, 4, 5, 6, 7]
+    assert errors[0] == (2, "Invalid row")
+    assert errors[1] == (4, "Duplicate email in file")
+    assert errors[3:] == [(6, "Invalid row"), (7, "Invalid row")]
+
+
+def test_insert_users_retries_without_emails_taken_meanwhile(app):
+    add_user("taken@example.com")
+    password_hash = hash_password("SecurePass123")
+
+    inserted = provision_users.insert_users(
+        [
+            ("fresh@example.com", password_hash),
+            ("taken@example.com", password_hash),
+        ]
+    )
+
+    assert inserted == 1
+    assert User.query.count() == 2
+    fresh = User.query.filter_by(email="fresh@example.com").one()
+    assert fresh.check_password("SecurePass123")
+
+
+def test_insert_users_reraises_other_integrity_errors(app):
+    from sqlalchemy.exc import IntegrityError
+
+    with pytest.raises(IntegrityError):
+        provision_users.insert_users([("a@example.com", None)])
+    assert User.query.count() == 0
+
+
+def test_dry_run_counts_without_creating(app, monkeypatch, users_csv, caplog):
+    add_user("existing@example.com")
+
+    with caplog.at_level(logging.INFO):
+        run_main(monkeypatch, users_csv, "--dry-run")
+
+    assert "would create 2 users, skipped 1 existing, 3 invalid" in caplog.text
+    assert User.query.count() == 1
+
+
+def test_main_creates_users_that_can_log_in(app, client, monkeypatch, users_csv):
+    add_user("existing@example.com")
+
+    run_main(monkeypatch, users_csv, "--batch-size", "1")
+
+    assert User.query.count() == 3
+    # Hashes are stored as text, like the ones set_password makes
+    assert all(isinstance(user.password_hash, str) for user in User.query)
+    response = client.post(
+        "/auth/login", json={"email": "new2@example.com", "password": "SecurePass123"}
+    )
+    assert response.status_code == 200
@@ -0,0 +1,145 @@
+from datetime import datetime
+
+import pytest
+from flask_jwt_extended import decode_token
+from sqlalchemy import insert, select
+
+from app import create_app
+from database import REPLICA_BIND, db, replica_router
+from models import RevokedToken, Trip, User
+from utils.revocation import denylist
+
+
+@pytest.fixture
+def replicated(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'primary.db'}",
+            "SQLALCHEMY_REPLICA_URI": f"sqlite:///{tmp_path / 'replica.db'}",
+            "JWT_SECRET_KEY": "test-secret-key",
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines[REPLICA_BIND])
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    replica_router.reset()
+    # init_app registered an empty MetaData for the bind on the shared db,
+    # which create_all in other tests' apps would fail on
+    db.metadatas.pop(REPLICA_BIND, None)
+
+
+def replicate(app, model):
+    """Copy a table's rows to the replica, as replication eventually would."""
+    with app.app_context():
+        rows = db.session.execute(select(model.__table__)).mappings().all()
+        with db.engines[REPLICA_BIND].begin() as connection:
+            connection.execute(model.__table__.delete())
+            connection.execute(insert(model.__table__), [dict(row) for row in rows])
+
+
+def test_reads_go_to_the_replica(replicated):
+    replicated.config["DB_REPLICA_STICKY_SECONDS"] = 0
+    client = replicated.test_client()
+    tokens = client.post(
+        "/auth/register", json={"email": "r@example.com", "password": "Replica123"}
+    ).get_json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    # The replica has not seen the new user yet; auth falls back to the primary
+    response = client.post(
+        "/api/trips",
+        json={
+            "destination": "Oslo",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-02",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201
+    trip_id = response.get_json()["id"]
+
+    assert client.get("/api/trips", headers=headers).get_json() == []
+    assert client.get(f"/api/trips/{trip_id}", headers=headers).status_code == 404
+    replicate(replicated, Trip)
+    trips = client.get("/api/trips", headers=headers).get_json()
+    assert [trip["destination"] for trip in trips] == ["Oslo"]
+
+    # Writes always go to the primary
+    response = client.put(
+        f"/api/trips/{trip_id}", json={"destination": "Bergen"}, headers=headers
+    )
+    assert response.get_json()["trip"]["destination"] == "Bergen"
+    with replicated.app_context():
+        assert db.session.get(Trip, trip_id).destination == "Bergen"
+
+    health = client.get("/health/db").get_json()
+    assert set(health["engines"]) == {"default", "replica"}
+
+
+def test_writers_stick_to_the_primary(replicated):
+    client = replicated.test_client()
+    tokens = client.post(
+        "/auth/register", json={"email": "s@example.com", "password": "Sticky123"}
+    ).get_json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    client.post(
+        "/api/trips",
+        json={
+            "destination": "Oslo",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-02",
+        },
+        headers=headers,
+    )
+
+    trips = client.get("/api/trips", headers=headers).get_json()
+    assert [trip["destination"] for trip in trips] == ["Oslo"]
+
+    replica_router.reset()  # the sticky window has passed
+    assert client.get("/api/trips", headers=headers).get_json() == []
+
+
+def test_read_after_write_in_one_request(replicated):
+    with replicated.test_request_context("/api/trips", method="GET"):
+        replicated.preprocess_request()
+        assert db.session.get_bind() is db.engines[REPLICA_BIND]
+        db.session.execute(db.update(Trip).values(destination="Nowhere"))
+        assert db.session.get_bind() is db.engines[None]
+        db.session.rollback()
+
+    with replicated.test_request_context("/api/trips", method="POST"):
+        replicated.preprocess_request()
+        assert db.session.get_bind() is db.engines[None]
+
+
+def test_denylist_syncs_from_the_primary(replicated):
+    replicated.config["DB_REPLICA_STICKY_SECONDS"] = 0
+    client = replicated.test_client()
+    tokens = client.post(
+        "/auth/register", json={"email": "d@example.com", "password": "Denied123"}
+    ).get_json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    replicate(replicated, User)
+    assert client.get("/api/trips", headers=headers).status_code == 200
+
+    # Another worker revokes the token; the replica has not caught up with it
+    with replicated.app_context():
+        payload = decode_token(tokens["access_token"])
+        db.session.add(
+            RevokedToken(
+                jti=payload["jti"],
+                user_id=payload["sub"],
+                expires_at=datetime.utcfromtimestamp(payload["exp"]),
+            )
+        )
+        db.session.commit()
+    denylist._next_sync = 0
+    try:
+        assert client.get("/api/trips", headers=headers).status_code == 401
+    finally:
+        denylist.clear()
@@ -0,0 +1,103 @@
+import time
+from datetime import datetime
+
+from flask_jwt_extended import decode_token
+
+from database import db
+from models import RevokedToken
+from utils.revocation import denylist
+
+
+def _register(client, email="revoke@example.com"):
+    response = client.post(
+        "/auth/register", json={"email": email, "password": "SecurePass123"}
+    )
+    return response.get_json()
+
+
+def _bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _me(client, tokens):
+    return client.get("/api/me", headers=_bearer(tokens["access_token"])).status_code
+
+
+def test_logout_revokes_access_and_refresh_tokens(client):
+    tokens = _register(client)
+
+    response = client.post(
+        "/auth/logout",
+        json={"refresh_token": tokens["refresh_token"]},
+        headers=_bearer(tokens["access_token"]),
+    )
+    assert response.status_code == 200
+
+    assert _me(client, tokens) == 401
+    response = client.post("/auth/refresh", headers=_bearer(tokens["refresh_token"]))
+    assert response.status_code == 401
+    assert response.get_json()["message"] == "Token has been revoked"
+    assert RevokedToken.query.count() == 2
+
+
+def test_refresh_rotates_tokens(client):
+    tokens = _register(client)
+
+    response = client.post("/auth/refresh", headers=_bearer(tokens["refresh_token"]))
+    assert response.status_code == 200
+    rotated = response.get_json()
+
+    # The old refresh token was used up; the new pair works
+    response = client.post("/auth/refresh", headers=_bearer(tokens["refresh_token"]))
+    assert response.status_code == 401
+    assert _me(client, rotated) == 200
+    response = client.post("/auth/refresh", headers=_bearer(rotated["refresh_token"]))
+    assert response.status_code == 200
+
+
+def test_logout_all_revokes_earlier_tokens_only(client):
+    first = _register(client)
+    second = client.post(
+        "/auth/login", json={"email": "revoke@example.com", "password": "SecurePass123"}
+    ).get_json()
+
+    response = client.post("/auth/logout-all", headers=_bearer(second["access_token"]))
+    assert response.status_code == 200
+
+    for tokens in (first, second):
+        assert _me(client, tokens) == 401
+        response = client.post(
+            "/auth/refresh", headers=_bearer(tokens["refresh_token"])
+        )
+        assert response.status_code == 401
+
+    fresh = client.post(
+        "/auth/login", json={"email": "revoke@example.com", "password": "SecurePass123"}
+    ).get_json()
+    assert _me(client, fresh) == 200
+
+
+def test_revocations_from_other_workers_are_synced(app, client):
+    tokens = _register(client)
+    headers = _bearer(tokens["access_token"])
+    assert client.get("/api/me", headers=headers).status_code == 200
+
+    # Another worker revokes the token; this one sees it after the next sync
+    payload = decode_token(tokens["access_token"])
+    db.session.add(
+        RevokedToken(
+            jti=payload["jti"],
+            user_id=payload["sub"],
+            expires_at=datetime.utcfromtimestamp(payload["exp"]),
+        )
+    )
+    db.session.commit()
+    assert client.get("/api/me", headers=headers).status_code == 200
+    denylist._next_sync = 0
+    assert client.get("/api/me", headers=headers).status_code == 401
+
+    # Entries are dropped from memory once the tokens they cover expire
+    denylist._add_jti("expired", time.time() - 60)
+    denylist._next_sync = 0
+    denylist.sync()
+    assert denylist.stats() == {"tokens": 1, "users": 0}
@@ -0,0 +1,106 @@
+import pytest
+
+from database import db
+from utils import search
+from utils.search import search_terms
+
+
+def search_trips(client, auth_headers, q, **params):
+    response = client.get(
+        "/api/trips/search", query_string={"q": q, **params}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    return [trip["destination"] for trip in response.get_json()]
+
+
+@pytest.fixture
+def destinations(create_trip):
+    return {
+        name: create_trip(name)
+        for name in (
+            "Paris, France",
+            "Paris, Texas",
+            "Parma, Italy",
+            "São Paulo, Brazil",
+            "New York",
+        )
+    }
+
+
+def test_search_terms():
+    assert search_terms(' Paris  "France"* ') == ["paris", "france"]
+    assert search_terms("-- ") == []
+
+
+def test_prefix_autocomplete(client, auth_headers, destinations):
+    assert sorted(search_trips(client, auth_headers, "par")) == [
+        "Paris, France",
+        "Paris, Texas",
+        "Parma, Italy",
+    ]
+    assert search_trips(client, auth_headers, "paris fr") == ["Paris, France"]
+    assert search_trips(client, auth_headers, "sao") == ["São Paulo, Brazil"]
+    assert len(search_trips(client, auth_headers, "par", limit=1)) == 1
+    assert search_trips(client, auth_headers, "tokyo") == []
+
+
+def test_search_requires_terms(client, auth_headers):
+    response = client.get("/api/trips/search?q=%20-", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_search_is_limited_to_own_trips(
+    client, auth_headers, destinations, create_trip
+):
+    client.post(
+        "/auth/register",
+        json={"email": "other@example.com", "password": "SecurePass123"},
+    )
+    token = client.post(
+        "/auth/login", json={"email": "other@example.com", "password": "SecurePass123"}
+    ).get_json()["access_token"]
+    other = {"Authorization": f"Bearer {token}"}
+    create_trip("Paris, Kentucky", headers=other)
+
+    assert search_trips(client, other, "paris") == ["Paris, Kentucky"]
+    assert "Paris, Kentucky" not in search_trips(client, auth_headers, "paris")
+
+
+def test_index_follows_writes(client, auth_headers, destinations):
+    trip_id = destinations["New York"]
+    response = client.put(
+        f"/api/trips/{trip_id}",
+        json={"destination": "Lisbon, Portugal"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert search_trips(client, auth_headers, "new") == []
+    assert search_trips(client, auth_headers, "lis") == ["Lisbon, Portugal"]
+
+    client.delete(f"/api/trips/{trip_id}", headers=auth_headers)
+    assert search_trips(client, auth_headers, "lis") == []
+
+    response = client.post(
+        "/api/trips/bulk",
+        json=[
+            {
+                "destination": "Kyoto, Japan",
+                "start_date": "2024-01-01",
+                "end_date": "2024-01-02",
+            }
+        ],
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+    assert search_trips(client, auth_headers, "kyo") == ["Kyoto, Japan"]
+
+
+def test_uses_fts5_index(app):
+    with app.app_context():
+        assert search.search_backend(db.session.connection()) == "fts5"
+
+
+def test_like_fallback(client, auth_headers, destinations, monkeypatch):
+    monkeypatch.setattr("blueprints.trips.search_backend", lambda connection: "like")
+    assert search_trips(client, auth_headers, "paris")[0].startswith("Paris")
+    assert search_trips(client, auth_headers, "paris tex") == ["Paris, Texas"]
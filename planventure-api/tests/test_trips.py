@@ -29,3 +29,183 @@ def test_get_trips(client, auth_headers):
     trips = response.get_json()
     assert len(trips) > 0
     assert trips[0]["destination"] == "London"
+
+
+def test_get_trips_paginates_with_cursor(client, auth_headers):
+    for day in range(1, 6):
+        client.post(
+            "/api/trips",
+            json={
+                "destination": f"City {day}",
+                "start_date": f"2024-03-0{day}",
+                "end_date": f"2024-03-0{day}",
+            },
+            headers=auth_headers,
+        )
+
+    response = client.get("/api/trips?limit=2", headers=auth_headers)
+    assert response.status_code == 200
+    assert [t["destination"] for t in response.get_json()] == ["City 1", "City 2"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    seen = []
+    while cursor:
+        response = client.get(
+            f"/api/trips?limit=2&cursor={cursor}", headers=auth_headers
+        )
+        seen.extend(t["destination"] for t in response.get_json())
+        cursor = response.headers.get("X-Next-Cursor")
+    assert seen == ["City 3", "City 4", "City 5"]
+
+
+def test_get_trips_field_projection(client, auth_headers):
+    client.post(
+        "/api/trips",
+        json={
+            "destination": "Rome",
+            "start_date": "2024-04-01",
+            "end_date": "2024-04-03",
+        },
+        headers=auth_headers,
+    )
+
+    response = client.get("/api/trips?fields=id,destination", headers=auth_headers)
+    assert response.status_code == 200
+    trip = response.get_json()[0]
+    assert set(trip) == {"id", "destination"}
+
+    response = client.get("/api/trips?fields=secret", headers=auth_headers)
+    assert response.status_code == 400
+    response = client.get("/api/trips?cursor=not-a-cursor", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_get_trip_conditional_requests(client, auth_headers):
+    trip_id = client.post(
+        "/api/trips",
+        json={
+            "destination": "Lisbon",
+            "start_date": "2024-05-01",
+            "end_date": "2024-05-03",
+        },
+        headers=auth_headers,
+    ).get_json()["id"]
+
+    response = client.get(f"/api/trips/{trip_id}", headers=auth_headers)
+    etag = response.headers["ETag"]
+    last_modified = response.headers["Last-Modified"]
+
+    response = client.get(
+        f"/api/trips/{trip_id}", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    response = client.get(
+        f"/api/trips/{trip_id}",
+        headers={**auth_headers, "If-Modified-Since": last_modified},
+    )
+    assert response.status_code == 304
+
+    client.put(
+        f"/api/trips/{trip_id}", json={"destination": "Porto"}, headers=auth_headers
+    )
+    response = client.get(
+        f"/api/trips/{trip_id}", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_get_trips_conditional_requests(client, auth_headers):
+    client.post(
+        "/api/trips",
+        json={
+            "destination": "Oslo",
+            "start_date": "2024-06-01",
+            "end_date": "2024-06-02",
+        },
+        headers=auth_headers,
+    )
+    etag = client.get("/api/trips", headers=auth_headers).headers["ETag"]
+
+    response = client.get("/api/trips", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    client.post(
+        "/api/trips",
+        json={
+            "destination": "Bergen",
+            "start_date": "2024-07-01",
+            "end_date": "2024-07-02",
+        },
+        headers=auth_headers,
+    )
+    response = client.get("/api/trips", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.get_json()) == 2
+
+
+def test_get_trips_date_window_overlap(client, auth_headers):
+    trips = [
+        ("Before", "2024-01-01", "2024-01-09"),
+        ("Overlaps start", "2024-01-05", "2024-01-10"),
+        ("Inside", "2024-01-12", "2024-01-14"),
+        ("Spans window", "2023-12-01", "2024-02-01"),
+        ("Overlaps end", "2024-01-20", "2024-01-25"),
+        ("After", "2024-01-21", "2024-01-30"),
+    ]
+    for destination, start, end in trips:
+        client.post(
+            "/api/trips",
+            json={"destination": destination, "start_date": start, "end_date": end},
+            headers=auth_headers,
+        )
+
+    response = client.get(
+        "/api/trips?from=2024-01-10&to=2024-01-20&fields=destination",
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert [t["destination"] for t in response.get_json()] == [
+        "Spans window",
+        "Overlaps start",
+        "Inside",
+        "Overlaps end",
+    ]
+
+    response = client.get("/api/trips?from=2024-01-22", headers=auth_headers)
+    assert [t["destination"] for t in response.get_json()] == [
+        "Spans window",
+        "Overlaps end",
+        "After",
+    ]
+
+    for query in ("from=2024-13-01", "from=2024-01-20&to=2024-01-10"):
+        response = client.get(f"/api/trips?{query}", headers=auth_headers)
+        assert response.status_code == 400
+
+
+def test_get_upcoming_trips(client, auth_headers):
+    from datetime import date, timedelta
+
+    today = date.today()
+    trips = [
+        ("Past", today - timedelta(days=10), today - timedelta(days=5)),
+        ("Next month", today + timedelta(days=30), today + timedelta(days=35)),
+        ("Ongoing", today - timedelta(days=2), today + timedelta(days=2)),
+    ]
+    for destination, start, end in trips:
+        client.post(
+            "/api/trips",
+            json={
+                "destination": destination,
+                "start_date": start.isoformat(),
+                "end_date": end.isoformat(),
+            },
+            headers=auth_headers,
+        )
+
+    response = client.get("/api/trips/upcoming", headers=auth_headers)
+    assert response.status_code == 200
+    assert [t["destination"] for t in response.get_json()] == ["Ongoing", "Next month"]
@@ -0,0 +1,37 @@
+from database import db
+from models import User
+from utils.user_cache import user_cache
+
+
+def test_auth_required_serves_repeat_requests_from_cache(client, auth_headers):
+    user_cache.clear()
+    assert client.get("/api/me", headers=auth_headers).status_code == 200
+    response = client.get("/api/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()["email"] == "test@example.com"
+    assert user_cache.stats()["hits"] == 1
+    assert user_cache.stats()["misses"] == 1
+
+
+def test_deleting_user_invalidates_cache(client, auth_headers):
+    assert client.get("/api/me", headers=auth_headers).status_code == 200
+    assert user_cache.stats()["size"] == 1
+
+    db.session.delete(User.query.filter_by(email="test@example.com").first())
+    db.session.commit()
+
+    assert user_cache.stats()["size"] == 0
+    assert client.get("/api/me", headers=auth_headers).status_code == 401
+
+
+def test_deferred_lookup_skips_query_until_needed(app, client, auth_headers):
+    app.config["AUTH_DEFER_USER_LOOKUP"] = True
+    try:
+        response = client.get("/api/trips", headers=auth_headers)
+        assert response.status_code == 200
+        assert user_cache.stats()["misses"] == 0
+
+        response = client.get("/api/me", headers=auth_headers)
+        assert response.get_json()["email"] == "test@example.com"
+    finally:
+        app.config["AUTH_DEFER_USER_LOOKUP"] = False
@@ -1,12 +1,104 @@
-import bcrypt
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
 
 
-def hash_password(password: str) -> bytes:
+class HasherBusyError(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded worker pool.
+
+    bcrypt releases the GIL, so a thread pool caps how many cores hashing can
+    take while request threads wait on the result. Once ``max_pending`` jobs
+    are queued or running, new jobs fail fast with HasherBusyError.
+    """
+
+    def __init__(self, app=None):
+        self.rounds = 12
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self.configure()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.configure(
+            rounds=app.config.get("BCRYPT_LOG_ROUNDS", 12),
+            max_workers=app.config.get("BCRYPT_MAX_WORKERS"),
+            max_pending=app.config.get("BCRYPT_MAX_PENDING"),
+        )
+        app.extensions["password_hasher"] = self
+
+    def configure(self, rounds: int = 12, max_workers=None, max_pending=None):
+        """(Re)configure the work factor and pool limits."""
+        max_workers = max_workers or os.cpu_count() or 1
+        max_pending = max_pending or max_workers * 4
+        with self._lock:
+            old_executor = self._executor
+            self.rounds = rounds
+            self.max_workers = max_workers
+            self.max_pending = max_pending
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="bcrypt"
+            )
+            self._slots = threading.BoundedSemaphore(max_pending)
+        if old_executor is not None:
+            old_executor.shutdown(wait=False)
+
+    def _run(self, fn, *args):
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HasherBusyError("Password hashing queue is full")
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future.result()
+
+    def hash(self, password: str) -> str:
+        import bcrypt
+
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        # Stored as text in users.password_hash, like provisioned accounts
+        return self._run(bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
+
+    def verify(self, password: str, hashed_password: Union[bytes, str]) -> bool:
+        import bcrypt
+
+        if isinstance(hashed_password, str):
+            hashed_password = hashed_password.encode("utf-8")
+        return self._run(bcrypt.checkpw, password.encode("utf-8"), hashed_password)
+
+    def needs_rehash(self, hashed_password: Union[bytes, str]) -> bool:
+        """Check whether a hash was made with a different work factor."""
+        if isinstance(hashed_password, bytes):
+            hashed_password = hashed_password.decode("utf-8")
+        try:
+            # bcrypt hashes look like $2b$12$<salt+hash>
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+hasher = PasswordHasher()
+
+
+def hash_password(password: str) -> str:
     """Hash a password using bcrypt."""
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode("utf-8"), salt)
+    return hasher.hash(password)
 
 
-def verify_password(password: str, hashed_password: bytes) -> bool:
+def verify_password(password: str, hashed_password: Union[bytes, str]) -> bool:
     """Verify a password against its hash."""
-    return bcrypt.checkpw(password.encode("utf-8"), hashed_password)
+    return hasher.verify(password, hashed_password)
+
+
+def password_needs_rehash(hashed_password: Union[bytes, str]) -> bool:
+    """Check if a hash should be upgraded to the configured work factor."""
+    return hasher.needs_rehash(hashed_password)
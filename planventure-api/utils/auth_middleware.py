@@ -1,7 +1,10 @@
 from functools import wraps
-from flask import jsonify
+from flask import current_app, jsonify
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from werkzeug.exceptions import HTTPException
+from database import replica_router
 from models import User
+from utils.user_cache import LazyUser, user_cache
 
 
 def auth_required():
@@ -11,12 +14,25 @@ def auth_required():
             try:
                 verify_jwt_in_request()
                 current_user_id = get_jwt_identity()
-                current_user = User.query.get(current_user_id)
+                replica_router.bind_user(current_user_id)
 
-                if not current_user:
-                    return jsonify({"message": "User not found"}), 401
+                if current_app.config.get("AUTH_DEFER_USER_LOOKUP"):
+                    # Trust the token; the user is only loaded if a view needs it
+                    current_user = LazyUser(current_user_id)
+                else:
+                    cached = user_cache.get(current_user_id)
+                    if cached:
+                        current_user = LazyUser(cached.id, cached.email)
+                    else:
+                        current_user = replica_router.get(User, current_user_id)
+                        if not current_user:
+                            return jsonify({"message": "User not found"}), 401
+                        user_cache.set(current_user)
 
                 return fn(current_user, *args, **kwargs)
+            except HTTPException:
+                # Errors raised by the view itself (e.g. 413) keep their status
+                raise
             except Exception as e:
                 return jsonify({"message": "Authentication failed"}), 401
 
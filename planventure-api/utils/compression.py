@@ -0,0 +1,227 @@
+import gzip
+import io
+import re
+import zlib
+
+from flask import g, jsonify, request
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+from werkzeug.wsgi import get_input_stream
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - exercised when zstandard is missing
+    zstandard = None
+
+CHUNK_SIZE = 64 * 1024
+
+# Media types worth compressing; everything the API emits is text
+COMPRESSIBLE_MIMETYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/problem+json",
+    "text/csv",
+    "text/plain",
+    "text/html",
+)
+
+# Matches the encoding suffix we add to strong ETags, e.g. "abc123-gzip"
+ETAG_SUFFIX = re.compile(r'-(zstd|gzip|deflate)"')
+
+
+def _zlib_compressor(encoding: str, level: int):
+    # wbits 31 writes a gzip container, 15 the zlib format HTTP calls deflate
+    return zlib.compressobj(level, zlib.DEFLATED, 31 if encoding == "gzip" else 15)
+
+
+class _ZlibReader:
+    """Read a zlib (HTTP deflate) stream, never inflating more than asked."""
+
+    def __init__(self, source):
+        self.source = source
+        self.decompressor = zlib.decompressobj()
+
+    def read(self, size: int) -> bytes:
+        while not self.decompressor.eof:
+            data = self.decompressor.unconsumed_tail or self.source.read(CHUNK_SIZE)
+            if not data:
+                raise EOFError("Compressed stream ended early")
+            output = self.decompressor.decompress(data, size)
+            if output:
+                return output
+        return b""
+
+
+class _DecompressingStream(io.RawIOBase):
+    """File-like view of a compressed request body with a size limit."""
+
+    def __init__(self, reader, limit: int):
+        self.reader = reader
+        self.limit = limit
+        self.total = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer) -> int:
+        try:
+            data = self.reader.read(len(buffer))
+        except (OSError, EOFError, zlib.error) as e:
+            raise BadRequest(f"Invalid compressed request body: {e}")
+        except Exception as e:
+            if zstandard is not None and isinstance(e, zstandard.ZstdError):
+                raise BadRequest(f"Invalid compressed request body: {e}")
+            raise
+        self.total += len(data)
+        if self.total > self.limit:
+            raise RequestEntityTooLarge("Decompressed request body is too large")
+        buffer[: len(data)] = data
+        return len(data)
+
+
+class Compression:
+    """Negotiated response compression and request body decompression.
+
+    Responses with a compressible media type are encoded with the best of
+    zstd (when the zstandard module is installed), gzip and deflate that the
+    client accepts. Buffered responses below ``min_size`` are sent as is;
+    streamed responses are compressed chunk by chunk and flushed after each
+    chunk so clients still see progress. Strong ETags get an encoding
+    suffix, which is stripped from conditional request headers again.
+    """
+
+    def __init__(self, app=None):
+        self.min_size = 1024
+        self.level = 6
+        self.zstd_level = 3
+        self.max_request_size = 64 * 1024 * 1024
+        if app is not None:
+            self.init_app(app)
+
+    @property
+    def encodings(self) -> tuple:
+        """Supported encodings in server preference order."""
+        if zstandard is not None:
+            return ("zstd", "gzip", "deflate")
+        return ("gzip", "deflate")
+
+    def init_app(self, app):
+        self.min_size = app.config.get("COMPRESS_MIN_SIZE", self.min_size)
+        self.level = app.config.get("COMPRESS_LEVEL", self.level)
+        self.zstd_level = app.config.get("COMPRESS_ZSTD_LEVEL", self.zstd_level)
+        self.max_request_size = app.config.get(
+            "COMPRESS_MAX_REQUEST_SIZE", self.max_request_size
+        )
+        app.extensions["compression"] = self
+        if not app.config.get("COMPRESS_ENABLED", True):
+            return
+        app.before_request(self._prepare_request)
+        app.after_request(self._compress_response)
+
+    def _prepare_request(self):
+        environ = request.environ
+        for header in ("HTTP_IF_NONE_MATCH", "HTTP_IF_MATCH"):
+            value = environ.get(header)
+            match = value and ETAG_SUFFIX.search(value)
+            if match:
+                environ[header] = ETAG_SUFFIX.sub('"', value)
+                g._etag_encoding = match.group(1)
+
+        encoding = environ.get("HTTP_CONTENT_ENCODING", "").strip().lower()
+        if encoding in ("", "identity"):
+            return None
+        if encoding not in self.encodings:
+            response = jsonify({"message": f"Unsupported Content-Encoding {encoding}"})
+            response.headers["Accept-Encoding"] = ", ".join(self.encodings)
+            return response, 415
+
+        source = get_input_stream(environ)
+        if encoding == "gzip":
+            reader = gzip.GzipFile(fileobj=source, mode="rb")
+        elif encoding == "deflate":
+            reader = _ZlibReader(source)
+        else:
+            reader = zstandard.ZstdDecompressor().stream_reader(source)
+        environ["wsgi.input"] = io.BufferedReader(
+            _DecompressingStream(reader, self.max_request_size), CHUNK_SIZE
+        )
+        # The decompressed length is unknown; read until the stream ends
+        environ["wsgi.input_terminated"] = True
+        environ.pop("CONTENT_LENGTH", None)
+        del environ["HTTP_CONTENT_ENCODING"]
+        return None
+
+    def _choose_encoding(self):
+        return request.accept_encodings.best_match(self.encodings)
+
+    def _compressor(self, encoding: str):
+        """Return (compress, flush_chunk, finish) callables for one response."""
+        if encoding == "zstd":
+            compressor = zstandard.ZstdCompressor(level=self.zstd_level).compressobj()
+            return (
+                compressor.compress,
+                lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+                compressor.flush,
+            )
+        compressor = _zlib_compressor(encoding, self.level)
+        return (
+            compressor.compress,
+            lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+            compressor.flush,
+        )
+
+    def _compress_response(self, response):
+        etag_encoding = g.pop("_etag_encoding", None)
+        if response.status_code == 304:
+            # Echo the validator the client holds, suffix included
+            tag, weak = response.get_etag()
+            if tag and not weak and etag_encoding:
+                response.set_etag(f"{tag}-{etag_encoding}")
+            return response
+
+        if (
+            response.status_code < 200
+            or response.status_code == 204
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = self._choose_encoding()
+        if encoding is None:
+            return response
+
+        compress, flush_chunk, finish = self._compressor(encoding)
+        if response.is_streamed:
+            response.response = self._stream(
+                response.response, compress, flush_chunk, finish
+            )
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(compress(data) + finish())
+
+        response.headers["Content-Encoding"] = encoding
+        tag, weak = response.get_etag()
+        if tag and not weak:
+            response.set_etag(f"{tag}-{encoding}")
+        return response
+
+    @staticmethod
+    def _stream(chunks, compress, flush_chunk, finish):
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                if chunk:
+                    yield compress(chunk) + flush_chunk()
+            yield finish()
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+
+compression = Compression()
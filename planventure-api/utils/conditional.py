@@ -0,0 +1,44 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from flask import request
+
+
+def make_etag(parts: Iterable) -> str:
+    """Build a strong ETag value from the parts that identify a representation."""
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, datetime):
+            part = part.isoformat()
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def has_conditional_headers() -> bool:
+    """Check if the client sent any validator worth checking before a full load."""
+    return bool(request.if_none_match) or request.if_modified_since is not None
+
+
+def is_not_modified(etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against the current validators.
+
+    ``last_modified`` is a naive UTC datetime, as stored in ``updated_at``.
+    """
+    if request.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        # HTTP dates have one second resolution
+        modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+        return modified <= request.if_modified_since
+    return False
+
+
+def set_validators(response, etag: str, last_modified: Optional[datetime] = None):
+    """Attach ETag (and Last-Modified when known) to a response."""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return response
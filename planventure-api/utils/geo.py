@@ -0,0 +1,116 @@
+import math
+from typing import Optional
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0088
+
+# Precision stored on trips; 9 characters is a cell of roughly 5 x 5 m
+GEOHASH_PRECISION = 9
+
+# Upper bound on the number of prefix ranges a single query may scan
+MAX_COVER_CELLS = 16
+
+
+def encode_geohash(
+    latitude: float, longitude: float, precision: int = GEOHASH_PRECISION
+) -> str:
+    """Encode a coordinate as a geohash string."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        rng, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def geohash_for(latitude: Optional[float], longitude: Optional[float]):
+    """Geohash for optional coordinates, or None when either is missing."""
+    if latitude is None or longitude is None:
+        return None
+    return encode_geohash(latitude, longitude)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """Return the (height, width) in degrees of a geohash cell."""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 180.0 / 2**lat_bits, 360.0 / 2**lon_bits
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float):
+    """Return (min_lat, max_lat, min_lon, max_lon) around a point.
+
+    The box is the smallest one containing every point within
+    ``radius_km`` by ``haversine_km``, so filtering on it never drops a
+    match. Longitudes are not wrapped; a box crossing the antimeridian has
+    min_lon < -180 or max_lon > 180. When the circle reaches a pole the
+    box spans all longitudes.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    min_lat = latitude - dlat
+    max_lat = latitude + dlat
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return max(-90.0, min_lat), min(90.0, max_lat), -180.0, 180.0
+    # The circle's widest point is east/west of the center, slightly
+    # poleward of it, at this longitude offset
+    ratio = math.sin(angle) / math.cos(math.radians(latitude))
+    if ratio >= 1.0:
+        return min_lat, max_lat, -180.0, 180.0
+    dlon = math.degrees(math.asin(ratio))
+    return min_lat, max_lat, longitude - dlon, longitude + dlon
+
+
+def covering_prefixes(min_lat, max_lat, min_lon, max_lon) -> list[str]:
+    """Return geohash prefixes whose cells cover a bounding box.
+
+    Picks the longest prefix length that covers the box with at most
+    MAX_COVER_CELLS cells. An empty list means the box is too large for
+    prefixes to help, so callers should not filter on geohash.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = math.floor(max_lat / height) - math.floor(min_lat / height) + 1
+        cols = math.floor(max_lon / width) - math.floor(min_lon / width) + 1
+        if rows * cols > MAX_COVER_CELLS:
+            continue
+
+        prefixes = set()
+        for row in range(rows):
+            lat = min(max_lat, (math.floor(min_lat / height) + row + 0.5) * height)
+            for col in range(cols):
+                lon = (math.floor(min_lon / width) + col + 0.5) * width
+                # Wrap longitudes that cross the antimeridian
+                lon = (lon + 180.0) % 360.0 - 180.0
+                prefixes.add(encode_geohash(max(-90.0, lat), lon, precision))
+        return sorted(prefixes)
+    return []
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
@@ -1,27 +1,85 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional
 
 
-def generate_itinerary_template(start_date: str, end_date: str) -> dict:
-    """Generate a default itinerary template based on trip dates."""
-    try:
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
-        days = (end - start).days + 1
+@lru_cache(maxsize=4096)
+def trip_dates(start_date: str, end_date: str) -> tuple[str, ...]:
+    """Return the YYYY-MM-DD dates of a trip, cached per (start, end).
 
-        itinerary = {"days": {}, "notes": "", "estimated_budget": 0}
+    Raises ValueError for malformed dates.
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d").toordinal()
+    end = datetime.strptime(end_date, "%Y-%m-%d").toordinal()
+    return tuple(date.fromordinal(day).isoformat() for day in range(start, end + 1))
 
-        for day in range(days):
-            current_date = start + timedelta(days=day)
-            date_str = current_date.strftime("%Y-%m-%d")
 
-            itinerary["days"][date_str] = {
-                "activities": [],
-                "meals": {"breakfast": "", "lunch": "", "dinner": ""},
-                "accommodation": "",
-                "transportation": "",
-                "notes": "",
-            }
+def empty_day() -> dict:
+    """Return a fresh, independent day entry."""
+    return {
+        "activities": [],
+        "meals": {"breakfast": "", "lunch": "", "dinner": ""},
+        "accommodation": "",
+        "transportation": "",
+        "notes": "",
+    }
 
-        return itinerary
+
+def generate_itinerary_template(start_date: str, end_date: str) -> Optional[dict]:
+    """Generate a default itinerary template based on trip dates."""
+    try:
+        dates = trip_dates(start_date, end_date)
     except ValueError:
         return None
+    return {
+        "days": {day: empty_day() for day in dates},
+        "notes": "",
+        "estimated_budget": 0,
+    }
+
+
+def copy_json(value):
+    """Copy a JSON-compatible value; much cheaper than copy.deepcopy."""
+    if isinstance(value, dict):
+        return {key: copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_json(item) for item in value]
+    return value
+
+
+def merge_itinerary(start_date: str, end_date: str, stored: Optional[dict]) -> dict:
+    """Overlay stored itinerary data on a fresh template.
+
+    Only the days present in ``stored`` are visited, and stored values are
+    copied so the result can be mutated without touching ``stored``.
+    """
+    result = generate_itinerary_template(start_date, end_date)
+    if result is None:
+        raise ValueError("Invalid trip dates")
+    if not stored or not isinstance(stored, dict):
+        return result
+
+    days = result["days"]
+    for day, stored_day in (stored.get("days") or {}).items():
+        template_day = days.get(day)
+        if template_day is None or not isinstance(stored_day, dict):
+            continue
+
+        template_day["activities"].extend(copy_json(stored_day.get("activities") or []))
+
+        meals = template_day["meals"]
+        for meal, details in (stored_day.get("meals") or {}).items():
+            if meal in meals:
+                meals[meal] = copy_json(details)
+
+        for key in ("accommodation", "transportation", "notes"):
+            if stored_day.get(key):
+                template_day[key] = copy_json(stored_day[key])
+
+    result["notes"] = stored.get("notes", result["notes"])
+    result["estimated_budget"] = stored.get(
+        "estimated_budget", result["estimated_budget"]
+    )
+    if stored.get("overview"):
+        result["overview"] = copy_json(stored["overview"])
+    return result
@@ -0,0 +1,404 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled."""
+
+
+class JobContext:
+    """What a job handler gets to work with.
+
+    Handlers run in their own app context and session. Long loops should
+    call ``check_cancelled()`` between steps; it raises JobCancelled once
+    the job is cancelled, after which the session is rolled back.
+    """
+
+    # Cancellations from other processes are only visible in the database
+    CANCEL_POLL_SECONDS = 1.0
+
+    def __init__(self, job, cancel_event: threading.Event, output_dir: str):
+        self.id = job.id
+        self.user_id = job.user_id
+        self.params = job.params or {}
+        self.output_file = None
+        self.output_type = None
+        self._output_dir = output_dir
+        self._cancel_event = cancel_event
+        self._next_poll = time.monotonic() + self.CANCEL_POLL_SECONDS
+
+    def check_cancelled(self):
+        if not self._cancel_event.is_set() and time.monotonic() >= self._next_poll:
+            from database import db
+            from models import Job
+
+            self._next_poll = time.monotonic() + self.CANCEL_POLL_SECONDS
+            if db.session.scalar(
+                db.select(Job.cancel_requested).where(Job.id == self.id)
+            ):
+                self._cancel_event.set()
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def open_output(self, extension: str, mimetype: str):
+        """Open the text file served by GET /api/jobs/<id>/output.
+
+        Handlers write to it incrementally, so large outputs never have to
+        fit in memory. It is deleted again if the job does not succeed.
+        """
+        os.makedirs(self._output_dir, exist_ok=True)
+        # Unique, as SQLite may reuse the ids of purged jobs
+        self.output_file = f"job-{self.id}-{uuid.uuid4().hex}.{extension}"
+        self.output_type = mimetype
+        return open(
+            os.path.join(self._output_dir, self.output_file),
+            "w",
+            encoding="utf-8",
+            newline="",
+        )
+
+
+class JobRunner:
+    """Runs jobs from the jobs table on an in-process thread pool.
+
+    Threads rather than processes, as jobs spend most of their time in the
+    database and need the app and its session. Each user has at most
+    ``JOBS_MAX_RUNNING_PER_USER`` jobs running in this process; the rest
+    wait in a per-user queue, so one user's batch of exports cannot take
+    every worker. When the app sets ``JOBS_EAGER``, jobs run to completion
+    inside ``enqueue`` instead, which keeps tests deterministic.
+
+    Jobs run in the process that accepted them, which refreshes their
+    ``heartbeat_at`` every ``JOBS_HEARTBEAT_SECONDS`` while they are queued
+    or running. A job whose heartbeat is older than ``JOBS_STALE_SECONDS``
+    lost its process (e.g. to a restart); it no longer counts towards the
+    user's limit and is marked failed the next time it is looked at.
+    """
+
+    ACTIVE = ("queued", "running")
+    PURGE_INTERVAL = 3600.0
+    INTERRUPTED = "Interrupted: the process running this job stopped"
+
+    def __init__(self, app=None):
+        self.max_workers = 4
+        self.max_running_per_user = 2
+        self.heartbeat_interval = 15.0
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._heartbeat = None
+        self._stop = threading.Event()
+        self._owned = set()
+        self._running = defaultdict(int)
+        self._waiting = defaultdict(deque)
+        self._cancel_events = {}
+        self._next_purge = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_workers = app.config.get("JOBS_WORKERS", self.max_workers)
+        self.max_running_per_user = app.config.get(
+            "JOBS_MAX_RUNNING_PER_USER", self.max_running_per_user
+        )
+        self.heartbeat_interval = app.config.get(
+            "JOBS_HEARTBEAT_SECONDS", self.heartbeat_interval
+        )
+        app.extensions["job_runner"] = self
+
+    def handler(self, kind: str):
+        """Register the function that runs jobs of ``kind``.
+
+        It is called with a JobContext and returns the job's JSON result.
+        """
+
+        def register(fn):
+            self._handlers[kind] = fn
+            return fn
+
+        return register
+
+    @property
+    def kinds(self) -> list[str]:
+        return sorted(self._handlers)
+
+    @staticmethod
+    def output_dir() -> str:
+        """Where job output files are kept; shared storage for several hosts."""
+        from flask import current_app
+
+        return current_app.config.get("JOBS_OUTPUT_DIR") or os.path.join(
+            current_app.instance_path, "job-output"
+        )
+
+    def output_path(self, output_file: str) -> str:
+        return os.path.join(self.output_dir(), output_file)
+
+    def _remove_output(self, output_file):
+        if output_file is None:
+            return
+        try:
+            os.remove(self.output_path(output_file))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def stale_before() -> datetime:
+        """Active jobs with an older heartbeat have no live process."""
+        from flask import current_app
+
+        return datetime.utcnow() - timedelta(
+            seconds=current_app.config.get("JOBS_STALE_SECONDS", 60)
+        )
+
+    def is_stale(self, job) -> bool:
+        return job.status in self.ACTIVE and (
+            job.heartbeat_at is None or job.heartbeat_at < self.stale_before()
+        )
+
+    def active_count(self, user_id: int) -> int:
+        """Count the user's queued and running jobs that are still alive."""
+        from database import db
+        from models import Job
+
+        return db.session.scalar(
+            db.select(db.func.count())
+            .select_from(Job)
+            .where(
+                Job.user_id == user_id,
+                Job.status.in_(self.ACTIVE),
+                Job.heartbeat_at >= self.stale_before(),
+            )
+        )
+
+    def fail_stale(self, **filters) -> int:
+        """Mark active jobs without a live process as failed; returns how many.
+
+        ``filters`` narrow the jobs, e.g. ``id=...`` or ``user_id=...``.
+        The caller commits.
+        """
+        from database import db
+        from models import Job
+
+        return db.session.execute(
+            db.update(Job)
+            .filter_by(**filters)
+            .where(
+                Job.status.in_(self.ACTIVE),
+                db.or_(
+                    Job.heartbeat_at.is_(None),
+                    Job.heartbeat_at < self.stale_before(),
+                ),
+            )
+            .values(
+                status="failed",
+                error=self.INTERRUPTED,
+                finished_at=datetime.utcnow(),
+            )
+        ).rowcount
+
+    def enqueue(self, user_id: int, kind: str, params: dict):
+        """Save a new job and schedule it; returns the Job.
+
+        Raises KeyError for an unknown kind. The caller checks the
+        JOBS_MAX_ACTIVE_PER_USER limit with ``active_count`` first.
+        """
+        from flask import current_app
+        from database import db
+        from models import Job
+
+        if kind not in self._handlers:
+            raise KeyError(kind)
+        self._purge(current_app.config.get("JOBS_RETENTION_HOURS", 24))
+        job = Job(
+            user_id=user_id, kind=kind, params=params, heartbeat_at=datetime.utcnow()
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        app = current_app._get_current_object()
+        if app.config.get("JOBS_EAGER"):
+            self._run(app, job.id)
+            db.session.refresh(job)
+        else:
+            self._schedule(app, job.id, user_id)
+        return job
+
+    def cancel(self, job_id: int):
+        """Signal a job running in this process to stop."""
+        event = self._cancel_events.get(job_id)
+        if event is not None:
+            event.set()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the pool; a new one is started by the next job."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            heartbeat, self._heartbeat = self._heartbeat, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+        if heartbeat is not None:
+            self._stop.set()
+            heartbeat.join()
+            self._stop.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": sum(self._running.values()),
+                "waiting": sum(len(queue) for queue in self._waiting.values()),
+            }
+
+    def _schedule(self, app, job_id: int, user_id: int):
+        with self._lock:
+            self._owned.add(job_id)
+            if self._running[user_id] >= self.max_running_per_user:
+                self._waiting[user_id].append(job_id)
+                return
+            self._running[user_id] += 1
+        self._submit(app, job_id, user_id)
+
+    def _submit(self, app, job_id: int, user_id: int):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="job"
+                )
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(
+                    target=self._beat_forever,
+                    args=(app,),
+                    name="job-heartbeat",
+                    daemon=True,
+                )
+                self._heartbeat.start()
+            executor = self._executor
+        executor.submit(self._run_scheduled, app, job_id, user_id)
+
+    def _run_scheduled(self, app, job_id: int, user_id: int):
+        try:
+            self._run(app, job_id)
+        finally:
+            with self._lock:
+                self._owned.discard(job_id)
+                waiting = self._waiting[user_id]
+                next_job = waiting.popleft() if waiting else None
+                if not waiting:
+                    del self._waiting[user_id]
+                if next_job is None:
+                    self._running[user_id] -= 1
+                    if not self._running[user_id]:
+                        del self._running[user_id]
+            if next_job is not None:
+                # The user's running slot passes straight to their next job
+                self._submit(app, next_job, user_id)
+
+    def _run(self, app, job_id: int):
+        from database import db
+        from models import Job
+
+        with app.app_context():
+            try:
+                # Claim the job, unless it was cancelled while queued
+                claimed = db.session.execute(
+                    db.update(Job)
+                    .where(Job.id == job_id, Job.status == "queued")
+                    .values(
+                        status="running",
+                        started_at=datetime.utcnow(),
+                        heartbeat_at=datetime.utcnow(),
+                    )
+                ).rowcount
+                db.session.commit()
+                if not claimed:
+                    return
+
+                job = db.session.get(Job, job_id)
+                # Its writes start the user's sticky-primary window
+                db.session.info["user_id"] = job.user_id
+                event = self._cancel_events[job_id] = threading.Event()
+                context = JobContext(job, event, self.output_dir())
+                values = {}
+                try:
+                    values["result"] = self._handlers[job.kind](context)
+                    values.update(
+                        status="succeeded",
+                        output_file=context.output_file,
+                        output_type=context.output_type,
+                    )
+                except JobCancelled:
+                    db.session.rollback()
+                    self._remove_output(context.output_file)
+                    values["status"] = "cancelled"
+                except Exception as e:
+                    db.session.rollback()
+                    self._remove_output(context.output_file)
+                    logger.exception(f"Job {job_id} ({job.kind}) failed")
+                    values.update(status="failed", error=str(e))
+
+                db.session.execute(
+                    db.update(Job)
+                    .where(Job.id == job_id)
+                    .values(finished_at=datetime.utcnow(), **values)
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Could not run job {job_id}: {e}")
+            finally:
+                self._cancel_events.pop(job_id, None)
+                db.session.remove()
+
+    def _beat_forever(self, app):
+        while not self._stop.wait(self.heartbeat_interval):
+            self._beat(app)
+
+    def _beat(self, app):
+        """Refresh the heartbeat of every job this process owns."""
+        from database import db
+        from models import Job
+
+        with self._lock:
+            owned = list(self._owned)
+        if not owned:
+            return
+        with app.app_context():
+            try:
+                db.session.execute(
+                    db.update(Job)
+                    .where(Job.id.in_(owned), Job.status.in_(self.ACTIVE))
+                    .values(heartbeat_at=datetime.utcnow())
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"Job heartbeat failed: {e}")
+            finally:
+                db.session.remove()
+
+    def _purge(self, retention_hours: float):
+        """Delete finished jobs past their retention, at most once an hour."""
+        from database import db
+        from models import Job
+
+        if time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + self.PURGE_INTERVAL
+        self.fail_stale()
+        expired = Job.finished_at < datetime.utcnow() - timedelta(hours=retention_hours)
+        for output_file in db.session.scalars(
+            db.select(Job.output_file).where(expired, Job.output_file.is_not(None))
+        ):
+            self._remove_output(output_file)
+        db.session.execute(db.delete(Job).where(expired))
+
+
+job_runner = JobRunner()
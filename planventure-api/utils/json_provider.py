@@ -0,0 +1,144 @@
+import dataclasses
+import json
+import re
+import secrets
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is missing
+    orjson = None
+
+
+class RawJSON:
+    """Already-encoded JSON text to embed in a response as is.
+
+    Lets an itinerary read from the database as text be written out without
+    decoding it and encoding it again. The text must be valid JSON.
+    """
+
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text.encode("utf-8") if isinstance(text, str) else text
+
+    def __eq__(self, other):
+        return isinstance(other, RawJSON) and other.text == self.text
+
+    def __repr__(self):
+        return f"RawJSON({self.text[:40]!r})"
+
+
+# RawJSON values are dumped as placeholder strings and spliced in afterwards.
+# The per-process nonce keeps user data from forging a placeholder.
+_NONCE = secrets.token_hex(8)
+_PLACEHOLDER = re.compile(rf'"@@raw-{_NONCE}-(\d+)@@"'.encode("ascii"))
+
+
+def encode_value(value):
+    """Encode the non-JSON types the API emits.
+
+    Dates become YYYY-MM-DD and datetimes ISO 8601, matching what orjson
+    emits natively for naive values.
+    """
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _Splicer:
+    """Collects RawJSON values during one dump and splices them back in."""
+
+    __slots__ = ("raw",)
+
+    def __init__(self):
+        self.raw = []
+
+    def default(self, value):
+        if isinstance(value, RawJSON):
+            self.raw.append(value.text)
+            return f"@@raw-{_NONCE}-{len(self.raw) - 1}@@"
+        return encode_value(value)
+
+    def splice(self, encoded: bytes) -> bytes:
+        if not self.raw:
+            return encoded
+        return _PLACEHOLDER.sub(lambda m: self.raw[int(m.group(1))], encoded)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """The built-in json provider with canonical dates and RawJSON support."""
+
+    default = staticmethod(encode_value)
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs) -> str:
+        splicer = _Splicer()
+        kwargs.setdefault("default", splicer.default)
+        encoded = super().dumps(obj, **kwargs)
+        if not splicer.raw:
+            return encoded
+        return splicer.splice(encoded.encode("utf-8")).decode("utf-8")
+
+
+class OrjsonProvider(JSONProvider):
+    """orjson-backed provider; responses are encoded straight to bytes."""
+
+    mimetype = "application/json"
+
+    def dumps_bytes(self, obj, option: int = 0) -> bytes:
+        splicer = _Splicer()
+        return splicer.splice(orjson.dumps(obj, default=splicer.default, option=option))
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = orjson.OPT_APPEND_NEWLINE
+        if self._app.debug:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            self.dumps_bytes(obj, option), mimetype=self.mimetype
+        )
+
+
+PROVIDERS = {"orjson": OrjsonProvider, "stdlib": StdlibJSONProvider}
+
+
+def provider_class(name: str = "auto"):
+    """Pick a provider by name; "auto" prefers orjson when it is installed."""
+    if name == "auto":
+        name = "orjson" if orjson is not None else "stdlib"
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown JSON provider {name!r}")
+    if name == "orjson" and orjson is None:
+        raise RuntimeError("JSON_PROVIDER=orjson but orjson is not installed")
+    return PROVIDERS[name]
+
+
+def json_serializer(value) -> str:
+    """Serializer for SQLAlchemy JSON columns."""
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value)
+
+
+def json_deserializer(text):
+    """Deserializer for SQLAlchemy JSON columns."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
@@ -1,19 +1,61 @@
+from flask import jsonify
 from flask_jwt_extended import (
+    JWTManager,
     create_access_token,
     create_refresh_token,
     get_jwt_identity,
     jwt_required,
 )
+import time
 from datetime import timedelta
 from typing import Dict
+from utils.revocation import denylist
+
+jwt = JWTManager()
 
 
 def generate_tokens(user_id: int) -> Dict[str, str]:
-    """Generate access and refresh tokens for a user."""
+    """Generate access and refresh tokens for a user.
+
+    Tokens carry their issue time in milliseconds (``iat_ms``), so a
+    logout-all cutoff can tell apart tokens issued within the same second.
+    """
+    claims = {"iat_ms": int(time.time() * 1000)}
     access_token = create_access_token(
-        identity=user_id, expires_delta=timedelta(hours=1)
+        identity=user_id, expires_delta=timedelta(hours=1), additional_claims=claims
     )
     refresh_token = create_refresh_token(
-        identity=user_id, expires_delta=timedelta(days=30)
+        identity=user_id, expires_delta=timedelta(days=30), additional_claims=claims
     )
     return {"access_token": access_token, "refresh_token": refresh_token}
+
+
+# JWT error handlers
+@jwt.expired_token_loader
+def expired_token_callback(jwt_header, jwt_data):
+    return jsonify({"message": "Token has expired"}), 401
+
+
+@jwt.invalid_token_loader
+def invalid_token_callback(error):
+    return jsonify({"message": "Invalid token"}), 401
+
+
+@jwt.unauthorized_loader
+def unauthorized_callback(error):
+    return jsonify({"message": "Missing Authorization Header"}), 401
+
+
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_data):
+    return denylist.is_revoked(jwt_data)
+
+
+@jwt.revoked_token_loader
+def revoked_token_callback(jwt_header, jwt_data):
+    return jsonify({"message": "Token has been revoked"}), 401
+
+
+@jwt.needs_fresh_token_loader
+def token_not_fresh_callback(jwt_header, jwt_data):
+    return jsonify({"message": "Fresh token required"}), 401
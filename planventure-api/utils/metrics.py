@@ -0,0 +1,313 @@
+import bisect
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Yield (upper bound label, cumulative count) pairs, ending with +Inf."""
+        total = 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            yield bound, total
+
+
+def _labels(**labels) -> str:
+    pairs = ",".join(
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in labels.items()
+    )
+    return "{" + pairs + "}" if pairs else ""
+
+
+class Metrics:
+    """Request and SQL instrumentation rendered in Prometheus text format.
+
+    Each request is timed per endpoint, and SQL statements executed while it
+    runs are counted and timed through engine events. A statement repeated
+    at least ``n_plus_one_threshold`` times in one request is logged as a
+    likely N+1 pattern. Updates take a single lock per request.
+    """
+
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.slow_request_ms = 500.0
+        self.slow_query_ms = 100.0
+        self.n_plus_one_threshold = 5
+        self.server_timing = False
+        self.reset()
+        if app is not None:
+            self.init_app(app)
+
+    def reset(self):
+        with self._lock:
+            self.requests = Counter()
+            self.latency = defaultdict(lambda: Histogram(self.LATENCY_BUCKETS))
+            self.queries = defaultdict(lambda: Histogram(self.QUERY_COUNT_BUCKETS))
+            self.query_seconds = Counter()
+            self.slow_requests = Counter()
+            self.slow_queries = 0
+            self.n_plus_one = Counter()
+
+    def init_app(self, app):
+        self.slow_request_ms = app.config.get("METRICS_SLOW_REQUEST_MS", 500.0)
+        self.slow_query_ms = app.config.get("METRICS_SLOW_QUERY_MS", 100.0)
+        self.n_plus_one_threshold = app.config.get("METRICS_N_PLUS_ONE_THRESHOLD", 5)
+        self.server_timing = app.config.get("METRICS_SERVER_TIMING", False)
+        app.extensions["metrics"] = self
+        if not app.config.get("METRICS_ENABLED", True):
+            return
+
+        from database import db
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        with app.app_context():
+            for engine in db.engines.values():
+                self.instrument_engine(engine)
+
+    def instrument_engine(self, engine):
+        """Time every statement executed on an engine."""
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        event.listen(engine, "handle_error", self._execute_failed)
+
+    def _start_request(self):
+        g._metrics_started = time.perf_counter()
+        g._metrics_sql_ms = 0.0
+        g._metrics_statements = Counter()
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("_metrics_started", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, many):
+        elapsed_ms = (time.perf_counter() - conn.info["_metrics_started"].pop()) * 1000
+        if has_request_context() and "_metrics_statements" in g:
+            g._metrics_sql_ms += elapsed_ms
+            g._metrics_statements[statement] += 1
+        if elapsed_ms >= self.slow_query_ms:
+            with self._lock:
+                self.slow_queries += 1
+            logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {statement}")
+
+    def _execute_failed(self, context):
+        # after_cursor_execute does not run for failed statements
+        if context.connection is not None:
+            started = context.connection.info.get("_metrics_started")
+            if started:
+                started.pop()
+
+    def _finish_request(self, response):
+        started = g.pop("_metrics_started", None)
+        if started is None:
+            return response
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        sql_ms = g.pop("_metrics_sql_ms")
+        statements = g.pop("_metrics_statements")
+        query_count = sum(statements.values())
+        endpoint = request.endpoint or "unmatched"
+        repeated = [
+            (statement, count)
+            for statement, count in statements.items()
+            if count >= self.n_plus_one_threshold
+        ]
+
+        with self._lock:
+            self.requests[(endpoint, request.method, response.status_code)] += 1
+            self.latency[(endpoint, request.method)].observe(elapsed_ms / 1000)
+            self.queries[endpoint].observe(query_count)
+            self.query_seconds[endpoint] += sql_ms / 1000
+            if elapsed_ms >= self.slow_request_ms:
+                self.slow_requests[endpoint] += 1
+            if repeated:
+                self.n_plus_one[endpoint] += 1
+
+        if elapsed_ms >= self.slow_request_ms:
+            logger.warning(
+                f"Slow request {request.method} {request.path} ({endpoint}): "
+                f"{elapsed_ms:.1f} ms, {query_count} queries in {sql_ms:.1f} ms"
+            )
+        for statement, count in repeated:
+            logger.warning(
+                f"Possible N+1 in {endpoint}: statement ran {count} times: "
+                f"{statement}"
+            )
+        if self.server_timing:
+            response.headers.add(
+                "Server-Timing",
+                f'db;dur={sql_ms:.3f};desc="{query_count} queries", '
+                f"app;dur={elapsed_ms:.3f}",
+            )
+        return response
+
+    def render(self) -> list[str]:
+        """Render the request and SQL metrics as Prometheus text lines."""
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP planventure_http_requests_total HTTP requests handled.",
+                "# TYPE planventure_http_requests_total counter",
+            ]
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                labels = _labels(endpoint=endpoint, method=method, status=status)
+                lines.append(f"planventure_http_requests_total{labels} {count}")
+
+            lines += [
+                "# HELP planventure_http_request_duration_seconds Request latency.",
+                "# TYPE planventure_http_request_duration_seconds histogram",
+            ]
+            for (endpoint, method), histogram in sorted(self.latency.items()):
+                lines += _histogram_lines(
+                    "planventure_http_request_duration_seconds",
+                    histogram,
+                    endpoint=endpoint,
+                    method=method,
+                )
+
+            lines += [
+                "# HELP planventure_db_queries_per_request SQL statements per request.",
+                "# TYPE planventure_db_queries_per_request histogram",
+            ]
+            for endpoint, histogram in sorted(self.queries.items()):
+                lines += _histogram_lines(
+                    "planventure_db_queries_per_request", histogram, endpoint=endpoint
+                )
+
+            lines += [
+                "# HELP planventure_db_query_seconds_total Time spent in SQL.",
+                "# TYPE planventure_db_query_seconds_total counter",
+            ]
+            for endpoint, seconds in sorted(self.query_seconds.items()):
+                labels = _labels(endpoint=endpoint)
+                lines.append(f"planventure_db_query_seconds_total{labels} {seconds}")
+
+            lines += [
+                "# HELP planventure_slow_requests_total Requests over the threshold.",
+                "# TYPE planventure_slow_requests_total counter",
+            ]
+            for endpoint, count in sorted(self.slow_requests.items()):
+                labels = _labels(endpoint=endpoint)
+                lines.append(f"planventure_slow_requests_total{labels} {count}")
+
+            lines += [
+                "# HELP planventure_n_plus_one_requests_total Requests that repeated "
+                "a statement at least the N+1 threshold.",
+                "# TYPE planventure_n_plus_one_requests_total counter",
+            ]
+            for endpoint, count in sorted(self.n_plus_one.items()):
+                labels = _labels(endpoint=endpoint)
+                lines.append(f"planventure_n_plus_one_requests_total{labels} {count}")
+
+            lines += [
+                "# HELP planventure_db_slow_queries_total Queries over the threshold.",
+                "# TYPE planventure_db_slow_queries_total counter",
+                f"planventure_db_slow_queries_total {self.slow_queries}",
+            ]
+        return lines
+
+
+def _histogram_lines(name, histogram, **labels):
+    lines = [
+        f"{name}_bucket{_labels(**labels, le=bound)} {count}"
+        for bound, count in histogram.cumulative()
+    ]
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+def _user_cache_lines() -> list[str]:
+    from utils.user_cache import user_cache
+
+    stats = user_cache.stats()
+    return [
+        "# HELP planventure_user_cache_entries Users held by the auth cache.",
+        "# TYPE planventure_user_cache_entries gauge",
+        f"planventure_user_cache_entries {stats['size']}",
+        "# HELP planventure_user_cache_hits_total Auth cache hits.",
+        "# TYPE planventure_user_cache_hits_total counter",
+        f"planventure_user_cache_hits_total {stats['hits']}",
+        "# HELP planventure_user_cache_misses_total Auth cache misses.",
+        "# TYPE planventure_user_cache_misses_total counter",
+        f"planventure_user_cache_misses_total {stats['misses']}",
+    ]
+
+
+def _login_throttle_lines() -> list[str]:
+    from utils.rate_limit import login_throttle
+
+    stats = login_throttle.stats()
+    lines = [
+        "# HELP planventure_login_throttled_total Login attempts rejected.",
+        "# TYPE planventure_login_throttled_total counter",
+    ]
+    for scope in ("ip", "email"):
+        count = stats["rejected"].get(scope, 0)
+        lines.append(f"planventure_login_throttled_total{_labels(scope=scope)} {count}")
+    return lines
+
+
+def _pool_lines() -> list[str]:
+    from database import pool_status
+
+    name = "planventure_db_pool_checkout_wait_seconds"
+    lines = [
+        "# HELP planventure_db_pool_checked_out Connections in use.",
+        "# TYPE planventure_db_pool_checked_out gauge",
+    ]
+    waits = [
+        f"# HELP {name} Time spent waiting for a pooled connection.",
+        f"# TYPE {name} histogram",
+    ]
+    for engine, status in sorted(pool_status().items()):
+        if "checkout_wait" not in status:
+            continue
+        lines.append(
+            f"planventure_db_pool_checked_out{_labels(engine=engine)} "
+            f"{status['checked_out']}"
+        )
+        snapshot = status["checkout_wait"]
+        total = 0
+        for bound, count in snapshot["buckets_ms"].items():
+            total += count
+            le = bound if bound == "+Inf" else str(float(bound) / 1000)
+            waits.append(f"{name}_bucket{_labels(engine=engine, le=le)} {total}")
+        waits.append(
+            f"{name}_sum{_labels(engine=engine)} {snapshot['total_ms'] / 1000}"
+        )
+        waits.append(f"{name}_count{_labels(engine=engine)} {snapshot['count']}")
+    return lines + waits
+
+
+def render_metrics() -> str:
+    """Render every metric of the current app in Prometheus text format."""
+    lines = (
+        metrics.render() + _user_cache_lines() + _login_throttle_lines() + _pool_lines()
+    )
+    return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
@@ -0,0 +1,62 @@
+import base64
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+
+def encode_cursor(start_date: datetime, trip_id: int) -> str:
+    """Encode a (start_date, id) keyset position as an opaque cursor."""
+    raw = f"{start_date.isoformat()}|{trip_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if invalid."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        start_date, trip_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(start_date), int(trip_id)
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+
+def parse_limit(value: Optional[str], default: int, maximum: int) -> int:
+    """Parse a page size query parameter. Raises ValueError if invalid."""
+    if value is None or value == "":
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError("Limit must be an integer")
+    if limit < 1:
+        raise ValueError("Limit must be at least 1")
+    return min(limit, maximum)
+
+
+def parse_window(
+    start: Optional[str], end: Optional[str]
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Parse optional YYYY-MM-DD `from`/`to` bounds. Raises ValueError if invalid."""
+    try:
+        start = datetime.strptime(start, "%Y-%m-%d") if start else None
+        end = datetime.strptime(end, "%Y-%m-%d") if end else None
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD")
+    if start and end and start > end:
+        raise ValueError("from must not be after to")
+    return start, end
+
+
+def parse_fields(value: Optional[str], allowed: Iterable[str]) -> list[str]:
+    """Parse a comma separated field projection. Raises ValueError if invalid."""
+    allowed = list(allowed)
+    if not value:
+        return allowed
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    # Keep the canonical field order and drop duplicates
+    return [field for field in allowed if field in fields]
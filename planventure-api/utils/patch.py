@@ -0,0 +1,246 @@
+"""JSON Merge Patch (RFC 7386) and JSON Patch (RFC 6902) helpers.
+
+Both appliers are copy-on-write: the input document is never mutated, and
+only the containers along patched paths are copied, so untouched subtrees
+(e.g. the other days of a long itinerary) are shared with the original.
+"""
+from utils.itinerary import copy_json
+
+
+class PatchError(ValueError):
+    """Raised when a patch is malformed or cannot be applied."""
+
+
+def apply_merge_patch(target, patch):
+    """Apply a JSON Merge Patch and return the patched document."""
+    if not isinstance(patch, dict):
+        return copy_json(patch)
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def parse_pointer(pointer: str) -> list[str]:
+    """Split a JSON Pointer into its unescaped reference tokens."""
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    if pointer == "":
+        return []
+    return [
+        token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")
+    ]
+
+
+def _list_index(container: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise PatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    limit = len(container) + 1 if allow_end else len(container)
+    if index >= limit:
+        raise PatchError(f"Array index out of range: {token}")
+    return index
+
+
+class _Document:
+    """Tracks which containers have been copied while applying a patch."""
+
+    def __init__(self, root):
+        self.root = root
+        self._owned = {}
+
+    def _own(self, container):
+        if id(container) in self._owned:
+            return container
+        copied = dict(container) if isinstance(container, dict) else list(container)
+        self._owned[id(copied)] = copied
+        return copied
+
+    def get(self, tokens: list[str]):
+        node = self.root
+        for token in tokens:
+            if isinstance(node, dict):
+                if token not in node:
+                    raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+                node = node[token]
+            elif isinstance(node, list):
+                node = node[_list_index(node, token)]
+            else:
+                raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+        return node
+
+    def parent(self, tokens: list[str]):
+        """Return a writable copy of the container holding the last token."""
+        if not isinstance(self.root, (dict, list)):
+            raise PatchError("Document root is not a container")
+        self.root = self._own(self.root)
+        node = self.root
+        for token in tokens[:-1]:
+            key = _list_index(node, token) if isinstance(node, list) else token
+            if isinstance(node, dict) and key not in node:
+                raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+            child = node[key]
+            if not isinstance(child, (dict, list)):
+                raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+            node[key] = node = self._own(child)
+        return node
+
+    def add(self, tokens: list[str], value):
+        if not tokens:
+            self.root = value
+            return
+        parent = self.parent(tokens)
+        if isinstance(parent, list):
+            parent.insert(_list_index(parent, tokens[-1], allow_end=True), value)
+        else:
+            parent[tokens[-1]] = value
+
+    def remove(self, tokens: list[str]):
+        if not tokens:
+            raise PatchError("Cannot remove the document root")
+        self.get(tokens)
+        parent = self.parent(tokens)
+        if isinstance(parent, list):
+            del parent[_list_index(parent, tokens[-1])]
+        else:
+            del parent[tokens[-1]]
+
+    def replace(self, tokens: list[str], value):
+        self.get(tokens)
+        if not tokens:
+            self.root = value
+            return
+        parent = self.parent(tokens)
+        if isinstance(parent, list):
+            parent[_list_index(parent, tokens[-1])] = value
+        else:
+            parent[tokens[-1]] = value
+
+
+def apply_json_patch(document, operations: list):
+    """Apply a JSON Patch and return the patched document.
+
+    The patch is atomic: if any operation fails, PatchError is raised and
+    ``document`` is left untouched.
+    """
+    if not isinstance(operations, list):
+        raise PatchError("JSON Patch must be an array of operations")
+
+    doc = _Document(document)
+    for operation in operations:
+        if not isinstance(operation, dict) or "path" not in operation:
+            raise PatchError("Each operation needs an 'op' and a 'path'")
+        op = operation.get("op")
+        path = parse_pointer(operation["path"])
+
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise PatchError(f"'{op}' operation requires a value")
+        if op in ("move", "copy") and "from" not in operation:
+            raise PatchError(f"'{op}' operation requires 'from'")
+
+        if op == "add":
+            doc.add(path, copy_json(operation["value"]))
+        elif op == "remove":
+            doc.remove(path)
+        elif op == "replace":
+            doc.replace(path, copy_json(operation["value"]))
+        elif op == "move":
+            source = parse_pointer(operation["from"])
+            if path[: len(source)] == source and path != source:
+                raise PatchError("Cannot move a value into one of its children")
+            value = doc.get(source)
+            doc.remove(source)
+            doc.add(path, value)
+        elif op == "copy":
+            doc.add(path, copy_json(doc.get(parse_pointer(operation["from"]))))
+        elif op == "test":
+            if doc.get(path) != operation["value"]:
+                raise PatchError(f"Test failed at {operation['path']}")
+        else:
+            raise PatchError(f"Unsupported operation: {op!r}")
+    return doc.root
+
+
+def _escape(token) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def make_json_patch(source, target, path: str = "") -> list:
+    """Return a JSON Patch that turns ``source`` into ``target``.
+
+    Objects are diffed key by key and arrays index by index, with items
+    added or removed at the end, so the patch grows with the edit rather
+    than with the document.
+    """
+    if type(source) is not type(target):
+        return [{"op": "replace", "path": path, "value": copy_json(target)}]
+    if isinstance(source, dict):
+        operations = []
+        for key in source:
+            if key not in target:
+                operations.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in target.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in source:
+                operations.append(
+                    {"op": "add", "path": child, "value": copy_json(value)}
+                )
+            else:
+                operations.extend(make_json_patch(source[key], value, child))
+        return operations
+    if isinstance(source, list):
+        operations = []
+        common = min(len(source), len(target))
+        for index in range(common):
+            operations.extend(
+                make_json_patch(source[index], target[index], f"{path}/{index}")
+            )
+        # Remove from the end first so the earlier indexes stay valid
+        for index in range(len(source) - 1, common - 1, -1):
+            operations.append({"op": "remove", "path": f"{path}/{index}"})
+        for index in range(common, len(target)):
+            operations.append(
+                {
+                    "op": "add",
+                    "path": f"{path}/{index}",
+                    "value": copy_json(target[index]),
+                }
+            )
+        return operations
+    if source != target:
+        return [{"op": "replace", "path": path, "value": copy_json(target)}]
+    return []
+
+
+def merge_patch_days(patch: dict):
+    """Return the itinerary days a merge patch touches, or None for all days."""
+    if "days" not in patch:
+        return set()
+    if not isinstance(patch["days"], dict):
+        return None
+    return set(patch["days"])
+
+
+def json_patch_days(operations: list):
+    """Return the itinerary days a JSON Patch references, or None for all days."""
+    if not isinstance(operations, list):
+        raise PatchError("JSON Patch must be an array of operations")
+    days = set()
+    for operation in operations:
+        if not isinstance(operation, dict) or "path" not in operation:
+            raise PatchError("Each operation needs an 'op' and a 'path'")
+        pointers = [operation["path"]]
+        if "from" in operation:
+            pointers.append(operation["from"])
+        for pointer in pointers:
+            tokens = parse_pointer(pointer)
+            if not tokens or (tokens[0] == "days" and len(tokens) < 2):
+                return None
+            if tokens[0] == "days":
+                days.add(tokens[1])
+    return days
@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Optional
+
+# Atomic token bucket for Redis-compatible servers. The bucket is a hash of
+# (tokens, ts) that expires once it would have refilled completely.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class MemoryBackend:
+    """Token buckets held in process, split over independently locked shards.
+
+    Each shard is an OrderedDict kept in last-update order, so buckets idle
+    long enough to be full again sit at the front and are dropped a couple at
+    a time on every hit. A full bucket is the same as no bucket, so expiry
+    never changes a decision. ``max_entries`` bounds memory under key floods.
+    """
+
+    def __init__(self, shards: int = 16, max_entries: int = 100000):
+        self.shards = [(threading.Lock(), OrderedDict()) for _ in range(shards)]
+        self.max_entries_per_shard = max(1, max_entries // shards)
+
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        """Take one token; return 0 if allowed, else seconds until one refills."""
+        now = time.monotonic()
+        lock, buckets = self.shards[hash(key) % len(self.shards)]
+        with lock:
+            tokens, updated, _ = buckets.pop(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+
+            # Evict from the oldest end: buckets that have refilled, or the
+            # least recently used one while the shard is over its limit
+            for _ in range(2):
+                oldest_key, (_, _, full_at) = next(iter(buckets.items()))
+                if full_at > now and len(buckets) <= self.max_entries_per_shard:
+                    break
+                del buckets[oldest_key]
+                if not buckets:
+                    break
+        return wait
+
+    def clear(self):
+        for lock, buckets in self.shards:
+            with lock:
+                buckets.clear()
+
+    def __len__(self):
+        return sum(len(buckets) for _, buckets in self.shards)
+
+
+class RedisBackend:
+    """Token buckets shared by every worker through a Redis-compatible server.
+
+    Works with any client exposing ``eval`` the way redis-py does (Redis,
+    Valkey, KeyDB, or a local stand-in such as fakeredis).
+    """
+
+    def __init__(self, client, prefix: str = "planventure:throttle:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str):
+        import redis
+
+        return cls(redis.Redis.from_url(url))
+
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        wait = self.client.eval(
+            TOKEN_BUCKET_SCRIPT, 1, self.prefix + key, capacity, rate, time.time()
+        )
+        return float(wait)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+class LoginThrottle:
+    """Token-bucket limits on login attempts per client IP and per email.
+
+    Every attempt takes a token from the IP's bucket and then from the
+    email's; either running dry rejects the attempt before the user lookup
+    and the bcrypt check. Buckets hold ``*_burst`` tokens and refill at
+    ``*_per_minute``.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.backend = MemoryBackend()
+        self.ip_burst = 20
+        self.ip_per_minute = 10.0
+        self.email_burst = 5
+        self.email_per_minute = 2.0
+        self.rejected = Counter()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, backend=None):
+        self.enabled = app.config.get("LOGIN_THROTTLE_ENABLED", self.enabled)
+        self.ip_burst = app.config.get("LOGIN_THROTTLE_IP_BURST", self.ip_burst)
+        self.ip_per_minute = app.config.get(
+            "LOGIN_THROTTLE_IP_PER_MINUTE", self.ip_per_minute
+        )
+        self.email_burst = app.config.get(
+            "LOGIN_THROTTLE_EMAIL_BURST", self.email_burst
+        )
+        self.email_per_minute = app.config.get(
+            "LOGIN_THROTTLE_EMAIL_PER_MINUTE", self.email_per_minute
+        )
+        if backend is None:
+            url = app.config.get("LOGIN_THROTTLE_BACKEND", "memory")
+            backend = MemoryBackend() if url == "memory" else RedisBackend.from_url(url)
+        self.backend = backend
+        app.extensions["login_throttle"] = self
+
+    def hit(self, ip: Optional[str], email: str) -> float:
+        """Count a login attempt; return 0 if allowed, else the Retry-After."""
+        if not self.enabled:
+            return 0.0
+        checks = (
+            ("ip", ip or "unknown", self.ip_burst, self.ip_per_minute),
+            ("email", email, self.email_burst, self.email_per_minute),
+        )
+        for scope, value, burst, per_minute in checks:
+            wait = self.backend.take(f"{scope}:{value}", burst, per_minute / 60)
+            if wait:
+                with self._lock:
+                    self.rejected[scope] += 1
+                return wait
+        return 0.0
+
+    def reset(self):
+        self.backend.clear()
+        with self._lock:
+            self.rejected.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {"rejected": dict(self.rejected)}
+        if isinstance(self.backend, MemoryBackend):
+            stats["buckets"] = len(self.backend)
+        return stats
+
+
+login_throttle = LoginThrottle()
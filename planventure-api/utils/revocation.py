@@ -0,0 +1,192 @@
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+def _timestamp(value: datetime) -> float:
+    """POSIX timestamp of a naive UTC datetime, as stored in the database."""
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+class TokenDenylist:
+    """In-memory view of the revoked_tokens table for the JWT blocklist check.
+
+    Checking a token is a couple of dict lookups; the table is only read to
+    pick up revocations made by other workers, at most once every
+    ``sync_interval`` seconds. Each sync re-reads the last ``SYNC_OVERLAP``
+    seconds so rows committed out of order are not missed. Entries are kept
+    until the tokens they cover expire, then dropped.
+    """
+
+    SYNC_OVERLAP = timedelta(seconds=30)
+    PURGE_INTERVAL = 3600.0
+
+    def __init__(self, app=None):
+        self.sync_interval = 5.0
+        self._lock = threading.Lock()
+        self.clear()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.sync_interval = app.config.get(
+            "JWT_DENYLIST_SYNC_SECONDS", self.sync_interval
+        )
+        app.extensions["token_denylist"] = self
+
+    def clear(self):
+        """Forget everything; the next check reloads from the database."""
+        with self._lock:
+            # jti -> expiry, and user id -> (cutoff in ms, expiry), as timestamps
+            self._jtis = {}
+            self._cutoffs = {}
+            self._expiry = []
+            self._synced_at = None
+            self._next_sync = 0.0
+            self._next_purge = time.monotonic() + self.PURGE_INTERVAL
+
+    def is_revoked(self, payload: dict) -> bool:
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+        if payload.get("jti") in self._jtis:
+            return True
+        cutoff = self._cutoffs.get(str(payload.get("sub")))
+        if cutoff is None:
+            return False
+        # iat only has one second resolution; prefer our millisecond claim
+        issued = payload.get("iat_ms") or payload.get("iat", 0) * 1000
+        return issued < cutoff[0]
+
+    def revoke(self, *payloads: dict):
+        """Revoke decoded tokens by jti and commit."""
+        from database import db
+        from models import RevokedToken
+
+        payloads = [p for p in payloads if p["jti"] not in self._jtis]
+        if not payloads:
+            return
+        existing = set(
+            db.session.scalars(
+                db.select(RevokedToken.jti).where(
+                    RevokedToken.jti.in_([p["jti"] for p in payloads])
+                )
+            )
+        )
+        for payload in payloads:
+            if payload["jti"] not in existing:
+                db.session.add(
+                    RevokedToken(
+                        jti=payload["jti"],
+                        user_id=int(payload["sub"]),
+                        expires_at=datetime.utcfromtimestamp(payload["exp"]),
+                    )
+                )
+        db.session.commit()
+        with self._lock:
+            for payload in payloads:
+                self._add_jti(payload["jti"], payload["exp"])
+
+    def revoke_all(self, user_id, lifetime: timedelta):
+        """Revoke every token issued to a user before now and commit.
+
+        ``lifetime`` is the longest token lifetime, after which the cutoff
+        no longer matters.
+        """
+        from database import db
+        from models import RevokedToken
+
+        now = datetime.utcnow()
+        row = RevokedToken(
+            user_id=int(user_id), revoked_at=now, expires_at=now + lifetime
+        )
+        db.session.add(row)
+        db.session.commit()
+        with self._lock:
+            self._add_cutoff(
+                row.user_id, _timestamp(now) * 1000, _timestamp(row.expires_at)
+            )
+
+    def sync(self):
+        """Load revocations committed since the last sync, then drop expired ones."""
+        from database import db
+        from models import RevokedToken
+
+        if not self._lock.acquire(blocking=False):
+            return  # another thread is syncing; serve the current view
+        try:
+            self._next_sync = time.monotonic() + self.sync_interval
+            now = datetime.utcnow()
+            query = db.select(
+                RevokedToken.jti,
+                RevokedToken.user_id,
+                RevokedToken.revoked_at,
+                RevokedToken.expires_at,
+            )
+            if self._synced_at is None:
+                query = query.where(RevokedToken.expires_at > now)
+            else:
+                query = query.where(
+                    RevokedToken.revoked_at >= self._synced_at - self.SYNC_OVERLAP
+                )
+            # Read the primary: a revocation reaching a lagging replica after
+            # SYNC_OVERLAP would fall behind _synced_at and never be loaded
+            session = db.session()
+            previous = session.info.get("replica")
+            session.info["replica"] = False
+            try:
+                rows = session.execute(query).all()
+                if time.monotonic() >= self._next_purge:
+                    self._next_purge = time.monotonic() + self.PURGE_INTERVAL
+                    session.execute(
+                        db.delete(RevokedToken).where(RevokedToken.expires_at <= now)
+                    )
+                    session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.warning(f"Token denylist sync failed: {e}")
+                return
+            finally:
+                session.info["replica"] = previous
+            self._synced_at = now
+            for jti, user_id, revoked_at, expires_at in rows:
+                if jti is not None:
+                    self._add_jti(jti, _timestamp(expires_at))
+                else:
+                    self._add_cutoff(
+                        user_id, _timestamp(revoked_at) * 1000, _timestamp(expires_at)
+                    )
+            self._prune(time.time())
+        finally:
+            self._lock.release()
+
+    def _add_jti(self, jti: str, expires: float):
+        if jti in self._jtis:
+            return  # re-read by an overlapping sync
+        self._jtis[jti] = expires
+        heapq.heappush(self._expiry, (expires, "jti", jti))
+
+    def _add_cutoff(self, user_id, cutoff: float, expires: float):
+        key = str(user_id)
+        current = self._cutoffs.get(key)
+        if current is None or current[0] < cutoff:
+            self._cutoffs[key] = (cutoff, expires)
+            heapq.heappush(self._expiry, (expires, "user", key))
+
+    def _prune(self, now: float):
+        while self._expiry and self._expiry[0][0] <= now:
+            expires, kind, key = heapq.heappop(self._expiry)
+            if kind == "jti":
+                if self._jtis.get(key) == expires:
+                    del self._jtis[key]
+            elif self._cutoffs.get(key, (None, None))[1] == expires:
+                del self._cutoffs[key]
+
+    def stats(self) -> dict:
+        return {"tokens": len(self._jtis), "users": len(self._cutoffs)}
+
+
+denylist = TokenDenylist()
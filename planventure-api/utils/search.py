@@ -0,0 +1,159 @@
+"""Destination search backed by the database's full-text index.
+
+SQLite gets an FTS5 table over ``trips`` kept in sync by triggers, so every
+write path (ORM, bulk executemany, raw SQL) updates it. PostgreSQL gets a
+``tsvector`` expression index for ranked matches and a trigram index for
+typo-tolerant ones; expression indexes need no syncing. Databases without
+either fall back to LIKE.
+"""
+import re
+
+from sqlalchemy import DateTime, Integer, String, text
+
+FTS_TABLE = "trips_fts"
+PG_TSV_INDEX = "ix_trips_destination_tsv"
+PG_TRGM_INDEX = "ix_trips_destination_trgm"
+
+SQLITE_DDL = (
+    # user_id is indexed too, so a MATCH can intersect on the owner
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "destination, user_id, content='trips', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON trips BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, destination, user_id) "
+    "VALUES (new.id, new.destination, new.user_id); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON trips BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, destination, user_id) "
+    "VALUES ('delete', old.id, old.destination, old.user_id); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au "
+    "AFTER UPDATE OF destination, user_id ON trips BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, destination, user_id) "
+    "VALUES ('delete', old.id, old.destination, old.user_id); "
+    f"INSERT INTO {FTS_TABLE}(rowid, destination, user_id) "
+    "VALUES (new.id, new.destination, new.user_id); END",
+)
+
+POSTGRES_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX {{concurrently}} IF NOT EXISTS {PG_TSV_INDEX} ON trips "
+    "USING gin (to_tsvector('simple', destination))",
+    f"CREATE INDEX {{concurrently}} IF NOT EXISTS {PG_TRGM_INDEX} ON trips "
+    "USING gin (lower(destination) gin_trgm_ops)",
+)
+
+
+def is_search_object(name: str) -> bool:
+    """Whether a reflected table/index belongs to the search index.
+
+    These are created with raw DDL rather than declared on the models, so
+    autogenerate and schema comparisons should leave them alone.
+    """
+    return bool(name) and (
+        name.startswith(FTS_TABLE) or name in (PG_TSV_INDEX, PG_TRGM_INDEX)
+    )
+
+
+def create_search_index(connection, concurrently: bool = False):
+    """Create the search index for the connection's database, if supported."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        try:
+            for statement in SQLITE_DDL:
+                connection.exec_driver_sql(statement)
+        except Exception as e:
+            if "fts5" not in str(e):
+                raise
+            return  # SQLite built without FTS5; search falls back to LIKE
+        # Index rows that existed before the table (no-op when empty)
+        connection.exec_driver_sql(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+    elif dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            connection.exec_driver_sql(
+                statement.format(concurrently="CONCURRENTLY" if concurrently else "")
+            )
+
+
+def drop_search_index(connection, concurrently: bool = False):
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif dialect == "postgresql":
+        keyword = "CONCURRENTLY" if concurrently else ""
+        for index in (PG_TSV_INDEX, PG_TRGM_INDEX):
+            connection.exec_driver_sql(f"DROP INDEX {keyword} IF EXISTS {index}")
+
+
+def search_terms(query: str) -> list[str]:
+    """Split a search string into lowercase word tokens."""
+    return re.findall(r"\w+", (query or "").lower())
+
+
+def search_backend(connection) -> str:
+    """Return "fts5", "postgres" or "like" for a connection."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        return "postgres"
+    if dialect == "sqlite":
+        found = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (FTS_TABLE,),
+        ).first()
+        if found:
+            return "fts5"
+    return "like"
+
+
+def search_statement(backend: str, terms: list[str], user_id: int, limit: int):
+    """Build the ranked search query for one user's trips.
+
+    Every term is matched as a word prefix, so partial input autocompletes.
+    Rows come back as (id, destination, start_date, end_date), best first.
+    """
+    params = {"user_id": user_id, "limit": limit}
+    if backend == "fts5":
+        # Quoted terms cannot be parsed as FTS5 operators. Matching the owner
+        # inside the MATCH lets FTS5 intersect postings instead of filtering
+        # every user's matches afterwards.
+        params["match"] = " ".join(
+            [*(f'destination : "{term}"*' for term in terms), f"user_id : {user_id}"]
+        )
+        sql = (
+            "SELECT trips.id, trips.destination, trips.start_date, trips.end_date "
+            f"FROM {FTS_TABLE} JOIN trips ON trips.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :match AND trips.user_id = :user_id "
+            f"ORDER BY bm25({FTS_TABLE}, 1.0, 0.0), trips.start_date, trips.id "
+            "LIMIT :limit"
+        )
+    elif backend == "postgres":
+        params["tsquery"] = " & ".join(f"{term}:*" for term in terms)
+        params["phrase"] = " ".join(terms)
+        vector = "to_tsvector('simple', destination)"
+        sql = (
+            "SELECT id, destination, start_date, end_date FROM trips "
+            "WHERE user_id = :user_id AND ("
+            f"{vector} @@ to_tsquery('simple', :tsquery) "
+            "OR lower(destination) % :phrase) "
+            f"ORDER BY ts_rank({vector}, to_tsquery('simple', :tsquery)) DESC, "
+            "similarity(lower(destination), :phrase) DESC, start_date, id "
+            "LIMIT :limit"
+        )
+    else:
+        conditions = []
+        for index, term in enumerate(terms):
+            params[f"term{index}"] = f"%{term}%"
+            conditions.append(f"lower(destination) LIKE :term{index}")
+        params["prefix"] = f"{terms[0]}%"
+        sql = (
+            "SELECT id, destination, start_date, end_date FROM trips "
+            f"WHERE user_id = :user_id AND {' AND '.join(conditions)} "
+            "ORDER BY lower(destination) LIKE :prefix DESC, destination, id "
+            "LIMIT :limit"
+        )
+    statement = text(sql).columns(
+        id=Integer, destination=String, start_date=DateTime, end_date=DateTime
+    )
+    return statement, params
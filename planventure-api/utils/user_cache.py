@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+
+class CachedUser(NamedTuple):
+    """Snapshot of the user columns views read on every request."""
+
+    id: int
+    email: str
+
+
+class UserCache:
+    """Thread-safe LRU cache of user snapshots with a TTL, keyed by user id."""
+
+    def __init__(self, app=None, maxsize: int = 10000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.maxsize = app.config.get("AUTH_USER_CACHE_SIZE", self.maxsize)
+        self.ttl = app.config.get("AUTH_USER_CACHE_TTL", self.ttl)
+        app.extensions["user_cache"] = self
+
+    def get(self, user_id) -> Optional[CachedUser]:
+        key = int(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, user) -> CachedUser:
+        snapshot = CachedUser(id=user.id, email=user.email)
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return snapshot
+        with self._lock:
+            self._entries[int(user.id)] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(int(user.id))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(int(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class UserNotFoundError(Exception):
+    """Raised when a deferred user lookup finds no matching user."""
+
+
+class LazyUser:
+    """Stand-in for a User that only hits the database when needed.
+
+    ``id`` (and ``email`` when a cached snapshot is available) are served
+    without a query; any other attribute loads the real User once.
+    """
+
+    def __init__(self, user_id, email: Optional[str] = None):
+        self.__dict__["id"] = int(user_id)
+        self.__dict__["_user"] = None
+        if email is not None:
+            self.__dict__["email"] = email
+
+    def _load(self):
+        if self._user is None:
+            from models import User
+
+            user = User.query.get(self.id)
+            if user is None:
+                raise UserNotFoundError(self.id)
+            self.__dict__["_user"] = user
+        return self._user
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def __repr__(self):
+        return f"<LazyUser {self.id}>"
+
+
+user_cache = UserCache()
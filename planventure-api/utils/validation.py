@@ -1,4 +1,9 @@
 import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+from utils.itinerary import generate_itinerary_template
 
 
 def validate_email(email: str) -> bool:
@@ -16,3 +21,62 @@ def validate_password(password: str) -> tuple[bool, str]:
     if not any(c.isdigit() for c in password):
         return False, "Password must contain at least one number"
     return True, "Password is valid"
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value: str) -> datetime:
+    """Parse a YYYY-MM-DD date. Cached since imports repeat the same dates."""
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def validate_trip_data(data) -> tuple[Optional[dict], Optional[dict]]:
+    """Validate a trip payload.
+
+    Returns (values, None) with cleaned column values, or (None, error) where
+    error is a JSON-ready dict with a message.
+    """
+    if not isinstance(data, dict):
+        return None, {"message": "Trip must be a JSON object"}
+
+    required_fields = ["destination", "start_date", "end_date"]
+    missing_fields = [field for field in required_fields if field not in data]
+    if missing_fields:
+        return None, {
+            "message": "Missing required fields",
+            "missing_fields": missing_fields,
+        }
+
+    if not isinstance(data["destination"], str) or not data["destination"].strip():
+        return None, {"message": "Destination must be a non-empty string"}
+
+    try:
+        start_date = parse_date(data["start_date"])
+        end_date = parse_date(data["end_date"])
+    except (TypeError, ValueError):
+        return None, {"message": "Invalid date format. Use YYYY-MM-DD"}
+
+    if start_date > end_date:
+        return None, {"message": "Start date must be before end date"}
+
+    latitude = data.get("latitude")
+    longitude = data.get("longitude")
+    if latitude is not None and not isinstance(latitude, (int, float)):
+        return None, {"message": "Latitude must be a number"}
+    if longitude is not None and not isinstance(longitude, (int, float)):
+        return None, {"message": "Longitude must be a number"}
+
+    # Generate default itinerary if none provided
+    itinerary = data.get("itinerary")
+    if not itinerary:
+        itinerary = generate_itinerary_template(data["start_date"], data["end_date"])
+        if not itinerary:
+            return None, {"message": "Invalid date format"}
+
+    return {
+        "destination": data["destination"].strip(),
+        "start_date": start_date,
+        "end_date": end_date,
+        "latitude": latitude,
+        "longitude": longitude,
+        "itinerary": itinerary,
+    }, None